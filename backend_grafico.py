@@ -0,0 +1,309 @@
+"""
+Backends de dibujo usados por `dibujos.py` y `malla_carro.py`.
+
+Las funciones de dibujo no llaman a PyOpenGL directamente sino a un backend con una interfaz
+mínima (texturas, color, matrices y glDrawArrays con vertex arrays). `OpenGLBackend` la
+traduce al pipeline fijo de OpenGL y `sombreadores.ShaderBackend` a programas GLSL;
+`RecordingBackend` solo registra las llamadas y cuenta llamadas de dibujo, vértices y cambios
+de estado por frame, de modo que el coste de dibujo se puede medir y comparar con un
+presupuesto en máquinas sin GPU.
+"""
+import ctypes
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+
+# Primitivas admitidas por draw_arrays
+TRIANGLES = "triangles"
+QUADS = "quads"
+QUAD_STRIP = "quad_strip"
+LINES = "lines"
+LINE_STRIP = "line_strip"
+PRIMITIVES = (TRIANGLES, QUADS, QUAD_STRIP, LINES, LINE_STRIP)
+
+
+class RenderBackend(ABC):
+    """
+    Interfaz de los backends de dibujo.
+    """
+
+    @abstractmethod
+    def bind_texture(self, texture_id):
+        pass
+
+    @abstractmethod
+    def set_color(self, r, g, b):
+        pass
+
+    @abstractmethod
+    def set_normal(self, x, y, z):
+        pass
+
+    @abstractmethod
+    def push_matrix(self):
+        pass
+
+    @abstractmethod
+    def pop_matrix(self):
+        pass
+
+    @abstractmethod
+    def translate(self, x, y, z):
+        pass
+
+    @abstractmethod
+    def rotate(self, angle, x, y, z):
+        pass
+
+    @abstractmethod
+    def scale(self, x, y, z):
+        pass
+
+    @abstractmethod
+    def draw_arrays(self, primitive, vertices, first=0, count=None, tex_coords=None, buffer=None,
+                    normals=None):
+        """
+        Dibuja `count` vértices desde `first` de un array (n, 3) float32.
+
+        Args:
+            primitive (str): Una de PRIMITIVES.
+            vertices (np.ndarray): Posiciones de los vértices.
+            first (int): Primer vértice.
+            count (int): Número de vértices (por defecto, hasta el final del array).
+            tex_coords (np.ndarray): Coordenadas de textura (n, 2), opcionales.
+            buffer: VBO que ya contiene `vertices`; si se indica se dibuja desde la GPU.
+            normals (np.ndarray): Normales por vértice (n, 3), opcionales. Con `buffer`, el VBO
+                las contiene a continuación de las posiciones (ver malla_carro.CarMesh.upload).
+        """
+
+
+class OpenGLBackend(RenderBackend):
+    """
+    Backend que dibuja con PyOpenGL sobre el contexto actual.
+    """
+
+    def __init__(self):
+        from OpenGL import GL
+        self.gl = GL
+        self._modes = {
+            TRIANGLES: GL.GL_TRIANGLES,
+            QUADS: GL.GL_QUADS,
+            QUAD_STRIP: GL.GL_QUAD_STRIP,
+            LINES: GL.GL_LINES,
+            LINE_STRIP: GL.GL_LINE_STRIP,
+        }
+
+    def bind_texture(self, texture_id):
+        self.gl.glBindTexture(self.gl.GL_TEXTURE_2D, texture_id)
+
+    def set_color(self, r, g, b):
+        self.gl.glColor3f(r, g, b)
+
+    def set_normal(self, x, y, z):
+        self.gl.glNormal3f(x, y, z)
+
+    def push_matrix(self):
+        self.gl.glPushMatrix()
+
+    def pop_matrix(self):
+        self.gl.glPopMatrix()
+
+    def translate(self, x, y, z):
+        self.gl.glTranslatef(x, y, z)
+
+    def rotate(self, angle, x, y, z):
+        self.gl.glRotatef(angle, x, y, z)
+
+    def scale(self, x, y, z):
+        self.gl.glScalef(x, y, z)
+
+    def draw_arrays(self, primitive, vertices, first=0, count=None, tex_coords=None, buffer=None,
+                    normals=None):
+        gl = self.gl
+        if count is None:
+            count = len(vertices) - first
+        if count <= 0:
+            return
+        gl.glEnableClientState(gl.GL_VERTEX_ARRAY)
+        if buffer is not None:
+            gl.glBindBuffer(gl.GL_ARRAY_BUFFER, buffer)
+            gl.glVertexPointer(3, gl.GL_FLOAT, 0, None)
+        else:
+            gl.glVertexPointer(3, gl.GL_FLOAT, 0, vertices)
+        if normals is not None:
+            gl.glEnableClientState(gl.GL_NORMAL_ARRAY)
+            if buffer is not None:
+                gl.glNormalPointer(gl.GL_FLOAT, 0, ctypes.c_void_p(len(vertices) * 12))
+            else:
+                gl.glNormalPointer(gl.GL_FLOAT, 0, normals)
+        if tex_coords is not None:
+            gl.glEnableClientState(gl.GL_TEXTURE_COORD_ARRAY)
+            gl.glTexCoordPointer(2, gl.GL_FLOAT, 0, tex_coords)
+        gl.glDrawArrays(self._modes[primitive], first, count)
+        if tex_coords is not None:
+            gl.glDisableClientState(gl.GL_TEXTURE_COORD_ARRAY)
+        if normals is not None:
+            gl.glDisableClientState(gl.GL_NORMAL_ARRAY)
+        if buffer is not None:
+            gl.glBindBuffer(gl.GL_ARRAY_BUFFER, 0)
+        gl.glDisableClientState(gl.GL_VERTEX_ARRAY)
+
+
+class RenderBudgetExceeded(Exception):
+    """
+    Un frame superó alguno de los presupuestos de RecordingBackend.
+    """
+
+
+class FrameStats:
+    """
+    Contadores de un frame registrado por RecordingBackend.
+    """
+
+    __slots__ = ("draw_calls", "vertices", "state_changes", "by_primitive", "calls")
+
+    def __init__(self):
+        self.draw_calls = 0
+        self.vertices = 0
+        self.state_changes = 0
+        self.by_primitive = {}
+        self.calls = []
+
+    def as_dict(self):
+        return {
+            "draw_calls": self.draw_calls,
+            "vertices": self.vertices,
+            "state_changes": self.state_changes,
+            "by_primitive": dict(self.by_primitive),
+        }
+
+
+class RecordingBackend(RenderBackend):
+    """
+    Backend que no dibuja nada: registra las llamadas de cada frame y cuenta llamadas de
+    dibujo, vértices enviados y cambios de estado (textura, color, normal y matrices).
+
+    Uso:
+        backend = RecordingBackend(budgets={"draw_calls": 20, "vertices": 5000})
+        backend.begin_frame()
+        draw_track(logic, 0, backend=backend)
+        stats = backend.end_frame()  # lanza RenderBudgetExceeded si se supera un presupuesto
+    """
+
+    def __init__(self, budgets=None, record_calls=True, strict=True):
+        """
+        Args:
+            budgets (dict): Máximos por frame de "draw_calls", "vertices" y/o "state_changes".
+            record_calls (bool): Guardar la lista de llamadas de cada frame.
+            strict (bool): Lanzar RenderBudgetExceeded en end_frame si se supera un presupuesto;
+                si es False, las infracciones solo quedan en `violations`.
+        """
+        self.budgets = dict(budgets or {})
+        self.record_calls = record_calls
+        self.strict = strict
+        self.frames = []
+        self.violations = []
+        self.current = FrameStats()
+
+    def begin_frame(self):
+        self.current = FrameStats()
+
+    def end_frame(self):
+        """
+        Cierra el frame actual y comprueba los presupuestos.
+
+        Retorna:
+            FrameStats: Contadores del frame.
+        """
+        stats = self.current
+        self.frames.append(stats)
+        over = self.check_budgets(stats)
+        self.current = FrameStats()
+        if over:
+            self.violations.append((len(self.frames) - 1, over))
+            if self.strict:
+                detail = ", ".join(f"{name} {value} > {limit}" for name, value, limit in over)
+                raise RenderBudgetExceeded(f"Frame {len(self.frames) - 1} fuera de presupuesto: {detail}")
+        return stats
+
+    def check_budgets(self, stats):
+        """
+        Retorna:
+            list: (contador, valor, máximo) de cada presupuesto superado.
+        """
+        over = []
+        for name, limit in self.budgets.items():
+            value = getattr(stats, name)
+            if value > limit:
+                over.append((name, value, limit))
+        return over
+
+    def _state(self, name, *args):
+        self.current.state_changes += 1
+        if self.record_calls:
+            self.current.calls.append((name, args))
+
+    def bind_texture(self, texture_id):
+        self._state("bind_texture", texture_id)
+
+    def set_color(self, r, g, b):
+        self._state("set_color", r, g, b)
+
+    def set_normal(self, x, y, z):
+        self._state("set_normal", x, y, z)
+
+    def push_matrix(self):
+        self._state("push_matrix")
+
+    def pop_matrix(self):
+        self._state("pop_matrix")
+
+    def translate(self, x, y, z):
+        self._state("translate", x, y, z)
+
+    def rotate(self, angle, x, y, z):
+        self._state("rotate", angle, x, y, z)
+
+    def scale(self, x, y, z):
+        self._state("scale", x, y, z)
+
+    def draw_arrays(self, primitive, vertices, first=0, count=None, tex_coords=None, buffer=None,
+                    normals=None):
+        if primitive not in PRIMITIVES:
+            raise ValueError(f"Primitiva desconocida: {primitive}")
+        if count is None:
+            count = len(vertices) - first
+        if count <= 0:
+            return
+        stats = self.current
+        stats.draw_calls += 1
+        stats.vertices += count
+        stats.by_primitive[primitive] = stats.by_primitive.get(primitive, 0) + count
+        if self.record_calls:
+            stats.calls.append(("draw_arrays", (primitive, first, count)))
+
+
+_current_backend = None
+
+
+def current_backend():
+    """
+    Backend usado por las funciones de dibujo cuando no se les pasa uno (OpenGL por defecto).
+    """
+    global _current_backend
+    if _current_backend is None:
+        _current_backend = OpenGLBackend()
+    return _current_backend
+
+
+@contextmanager
+def use_backend(backend):
+    """
+    Usa `backend` como backend por defecto dentro del bloque `with`.
+    """
+    global _current_backend
+    previous = _current_backend
+    _current_backend = backend
+    try:
+        yield backend
+    finally:
+        _current_backend = previous
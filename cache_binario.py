@@ -0,0 +1,145 @@
+"""
+Formato binario de caché para recursos compilados.
+
+Un archivo de caché contiene:
+    - la firma MAGIC (8 bytes),
+    - la longitud de la cabecera (uint32, little endian),
+    - una cabecera JSON con las fuentes de las que se derivó, metadatos libres y la
+      descripción (dtype, forma, desplazamiento) de cada array,
+    - los datos crudos de cada array alineados a ALIGNMENT bytes.
+
+La lectura mapea el archivo en memoria y devuelve vistas de NumPy sin copiar los datos.
+"""
+import hashlib
+import json
+import os
+import struct
+import numpy as np
+
+MAGIC = b"JGCACHE1"
+ALIGNMENT = 64
+CACHE_SUFFIX = ".cache"
+
+
+def cache_path_for(source_path):
+    """
+    Ruta del archivo de caché asociado a un recurso (se guarda junto a él).
+    """
+    return source_path + CACHE_SUFFIX
+
+
+def _file_hash(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def describe_sources(paths):
+    """
+    Construye la clave de la caché: mtime, tamaño y hash de cada archivo fuente.
+    """
+    sources = []
+    for path in paths:
+        st = os.stat(path)
+        sources.append({
+            "path": os.path.basename(path),
+            "mtime_ns": st.st_mtime_ns,
+            "size": st.st_size,
+            "sha1": _file_hash(path),
+        })
+    return sources
+
+
+def _sources_valid(sources, directory):
+    """
+    Comprueba que las fuentes registradas no han cambiado.
+
+    Si el mtime y el tamaño coinciden se da por válida sin leer el archivo; si el mtime cambió
+    (por ejemplo tras un checkout) se compara el hash del contenido.
+    """
+    for source in sources:
+        path = os.path.join(directory, source["path"])
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        if st.st_size != source["size"]:
+            return False
+        if st.st_mtime_ns != source["mtime_ns"] and _file_hash(path) != source["sha1"]:
+            return False
+    return True
+
+
+def write_cache(cache_path, arrays, sources, meta=None):
+    """
+    Escribe un archivo de caché de forma atómica.
+
+    Args:
+        cache_path (str): Ruta del archivo de caché.
+        arrays (dict): Nombre -> np.ndarray a guardar.
+        sources (list): Resultado de describe_sources() para las fuentes del recurso.
+        meta (dict): Metadatos serializables en JSON.
+    """
+    layout = {}
+    blobs = []
+    offset = 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        offset = -(-offset // ALIGNMENT) * ALIGNMENT
+        layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        blobs.append((offset, array))
+        offset += array.nbytes
+
+    header = json.dumps({"sources": sources, "meta": meta or {}, "arrays": layout}).encode("utf-8")
+    data_start = -(-(len(MAGIC) + 4 + len(header)) // ALIGNMENT) * ALIGNMENT
+
+    tmp_path = cache_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header)))
+        f.write(header)
+        for rel_offset, array in blobs:
+            f.seek(data_start + rel_offset)
+            f.write(array.tobytes())
+        # Asegurar que el archivo llega hasta el final del último array (aunque esté vacío)
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, cache_path)
+
+
+def read_cache(cache_path):
+    """
+    Lee un archivo de caché si existe y sus fuentes no han cambiado.
+
+    Retorna:
+        tuple: (meta, arrays) con los arrays como vistas de solo lectura sobre el archivo
+        mapeado en memoria, o None si la caché no existe, está corrupta o está obsoleta.
+    """
+    try:
+        with open(cache_path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            (header_len,) = struct.unpack("<I", f.read(4))
+            header = json.loads(f.read(header_len).decode("utf-8"))
+    except (OSError, ValueError, struct.error):
+        return None
+
+    if not _sources_valid(header["sources"], os.path.dirname(os.path.abspath(cache_path))):
+        return None
+
+    data_start = -(-(len(MAGIC) + 4 + header_len) // ALIGNMENT) * ALIGNMENT
+    if os.path.getsize(cache_path) <= data_start:
+        buffer = np.zeros(0, dtype=np.uint8)
+    else:
+        buffer = np.memmap(cache_path, dtype=np.uint8, mode="r", offset=data_start)
+    arrays = {}
+    for name, info in header["arrays"].items():
+        dtype = np.dtype(info["dtype"])
+        shape = tuple(info["shape"])
+        nbytes = dtype.itemsize * int(np.prod(shape, dtype=np.int64))
+        start = info["offset"]
+        if start + nbytes > len(buffer):
+            return None
+        arrays[name] = buffer[start:start + nbytes].view(dtype).reshape(shape)
+    return header["meta"], arrays
@@ -0,0 +1,334 @@
+"""
+Captura de frames para grabar vídeo de las partidas sin bloquear el bucle de juego.
+
+La lectura de cada frame se pide a un pixel buffer object (PBO) con glReadPixels, que
+vuelve sin esperar a que la copia termine; el contenido se recoge cuando ese PBO vuelve a
+tocar en el anillo, `buffers` capturas más tarde, y la copia ya ha terminado. El frame se
+copia a un array de un conjunto fijo y pasa por una cola acotada a un hilo que lo escribe
+en disco como secuencia PNG o como vídeo en bruto. Si la cola está
+llena o no queda ningún array libre, el frame se descarta y se cuenta: la captura nunca
+frena el juego ni acumula memoria sin límite.
+
+La reducción de tamaño se hace antes de leer, copiando el frame a un framebuffer más pequeño
+con glBlitFramebuffer (filtro lineal), así que también reduce la lectura y la copia. Si el
+contexto no admite framebuffer objects, el hilo de escritura promedia bloques en la CPU.
+
+Formatos:
+    - "png": un archivo frame_000000.png por frame en el directorio de salida. La compresión
+      se hace con zlib, que libera el GIL, así que no compite con el hilo principal.
+    - "raw": un único archivo con los frames RGB de 8 bits seguidos, que se convierte con
+      ffmpeg -f rawvideo -pix_fmt rgb24 -s ANCHOxALTO -r FPS -i captura.rgb captura.mp4
+
+Uso:
+    capture = FrameCapture(900, 700, "capturas")
+    ...  # en cada frame, tras dibujar y antes de pygame.display.flip():
+    capture.capture()
+    ...
+    capture.close()
+    print(capture.format_report())
+"""
+import ctypes
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+import numpy as np
+from OpenGL.GL import *
+from OpenGL.error import GLError, NullFunctionError
+
+FORMATS = ("png", "raw")
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def _png_chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+def encode_png(rgb, level=1):
+    """
+    Codifica un array uint8 (alto, ancho, 3) como PNG RGB de 8 bits, sin filtros.
+
+    Args:
+        level (int): Nivel de compresión de zlib (1 es el más rápido).
+
+    Retorna:
+        bytes
+    """
+    height, width = rgb.shape[:2]
+    # Cada fila empieza con el byte del tipo de filtro (0: ninguno)
+    rows = np.zeros((height, width * 3 + 1), dtype=np.uint8)
+    rows[:, 1:] = rgb.reshape(height, width * 3)
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (_PNG_SIGNATURE + _png_chunk(b"IHDR", header)
+            + _png_chunk(b"IDAT", zlib.compress(rows.tobytes(), level)) + _png_chunk(b"IEND", b""))
+
+
+def downscale(rgb, factor):
+    """
+    Reduce la imagen `factor` veces en cada eje promediando bloques de factor x factor. Las
+    filas y columnas que no completan un bloque se descartan.
+    """
+    if factor == 1:
+        return rgb
+    height, width = rgb.shape[0] // factor, rgb.shape[1] // factor
+    # Suma de las factor x factor submuestras; uint16 admite factores de hasta 16
+    total = np.zeros((height, width, rgb.shape[2]), dtype=np.uint16)
+    for dy in range(factor):
+        for dx in range(factor):
+            total += rgb[dy:height * factor:factor, dx:width * factor:factor]
+    area = factor * factor
+    return ((total + area // 2) // area).astype(np.uint8)
+
+
+class FrameCapture:
+    """
+    Captura asíncrona del framebuffer con un anillo de PBO y un hilo de escritura.
+
+    Attributes:
+        frames (int): Frames presentados a capture(), capturados o no.
+        requested (int): Lecturas pedidas a la GPU (los frames que no se saltan).
+        written (int): Frames escritos en disco.
+        dropped (int): Frames leídos que se descartaron por tener la cola llena.
+        errors (int): Frames que no se pudieron escribir.
+    """
+
+    def __init__(self, width, height, output, fmt="png", every=1, scale=1, buffers=3, queue_size=8,
+                 png_level=1):
+        """
+        Args:
+            width, height (int): Tamaño del framebuffer.
+            output (str): Directorio de la secuencia PNG o archivo del vídeo en bruto.
+            fmt (str): Uno de FORMATS.
+            every (int): Capturar uno de cada `every` frames.
+            scale (int): Factor entero de reducción del tamaño (1 sin reducir).
+            buffers (int): PBO del anillo (2 para doble búfer, 3 para triple): cuántas
+                capturas tarda en recogerse cada lectura.
+            queue_size (int): Frames que pueden esperar al hilo de escritura.
+            png_level (int): Nivel de compresión de zlib para los PNG.
+        """
+        if fmt not in FORMATS:
+            raise ValueError(f"Formato de captura desconocido: {fmt}")
+        if every < 1 or not 1 <= scale <= 16 or buffers < 2 or queue_size < 1:
+            raise ValueError("every debe ser >= 1, scale estar entre 1 y 16, buffers >= 2 y "
+                             "queue_size >= 1")
+        self.width = width
+        self.height = height
+        self.output = output
+        self.format = fmt
+        self.every = every
+        self.scale = scale
+        self.png_level = png_level
+
+        self.frames = 0
+        self.requested = 0
+        self.written = 0
+        self.dropped = 0
+        self.errors = 0
+        self.capture_seconds = 0.0
+
+        if fmt == "png":
+            os.makedirs(output, exist_ok=True)
+        else:
+            directory = os.path.dirname(output)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+        # Framebuffer reducido donde se copia el frame antes de leerlo
+        self._fbo = self._renderbuffer = None
+        if scale > 1:
+            self._create_scaled_framebuffer()
+        if self._fbo is not None:
+            self.read_width, self.read_height = self.output_size
+            self._cpu_scale = 1
+        else:
+            self.read_width, self.read_height = width, height
+            self._cpu_scale = scale
+        self.frame_size = self.read_width * self.read_height * 4
+
+        # Anillo de PBO con el número de frame de la lectura pendiente de cada uno (o None)
+        ids = glGenBuffers(buffers)
+        ids = [int(i) for i in np.atleast_1d(ids)]
+        for pbo in ids:
+            glBindBuffer(GL_PIXEL_PACK_BUFFER, pbo)
+            glBufferData(GL_PIXEL_PACK_BUFFER, self.frame_size, None, GL_STREAM_READ)
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+        self._pbos = ids
+        self._pending = [None] * buffers
+        self._next = 0
+
+        # Arrays de frame reciclados entre el hilo principal y el de escritura: uno por hueco
+        # de la cola y uno que puede estar escribiéndose
+        self._free = queue.SimpleQueue()
+        for _ in range(queue_size + 1):
+            self._free.put(np.empty((self.read_height, self.read_width, 4), dtype=np.uint8))
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._writer = threading.Thread(target=self._write_loop, name="captura", daemon=True)
+        self._writer.start()
+        self._closed = False
+
+    def _create_scaled_framebuffer(self):
+        width, height = self.output_size
+        try:
+            if not bool(glGenFramebuffers) or not bool(glBlitFramebuffer):
+                return
+            fbo = glGenFramebuffers(1)
+            renderbuffer = glGenRenderbuffers(1)
+            glBindRenderbuffer(GL_RENDERBUFFER, renderbuffer)
+            glRenderbufferStorage(GL_RENDERBUFFER, GL_RGBA8, width, height)
+            glBindRenderbuffer(GL_RENDERBUFFER, 0)
+            glBindFramebuffer(GL_FRAMEBUFFER, fbo)
+            glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_RENDERBUFFER, renderbuffer)
+            complete = glCheckFramebufferStatus(GL_FRAMEBUFFER) == GL_FRAMEBUFFER_COMPLETE
+            glBindFramebuffer(GL_FRAMEBUFFER, 0)
+        except (GLError, NullFunctionError) as e:
+            print(f"Framebuffer objects no disponibles, la captura se reducirá en la CPU: {e}")
+            return
+        if not complete:
+            glDeleteFramebuffers(1, [fbo])
+            glDeleteRenderbuffers(1, [renderbuffer])
+            return
+        self._fbo = fbo
+        self._renderbuffer = renderbuffer
+
+    @property
+    def output_size(self):
+        """
+        Tamaño (ancho, alto) de los frames escritos.
+        """
+        return self.width // self.scale, self.height // self.scale
+
+    def capture(self):
+        """
+        Pide la lectura del frame actual (del buffer trasero, antes de flip) y pasa al hilo
+        de escritura la lectura más antigua que ya ha terminado.
+        """
+        frame = self.frames
+        self.frames += 1
+        if frame % self.every:
+            return
+        start = time.perf_counter()
+        slot = self._next
+        self._next = (slot + 1) % len(self._pbos)
+        pbo = self._pbos[slot]
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, pbo)
+        if self._pending[slot] is not None:
+            self._collect(slot)
+        if self._fbo is not None:
+            width, height = self.output_size
+            glBindFramebuffer(GL_DRAW_FRAMEBUFFER, self._fbo)
+            glBlitFramebuffer(0, 0, self.width, self.height, 0, 0, width, height,
+                              GL_COLOR_BUFFER_BIT, GL_LINEAR)
+            glBindFramebuffer(GL_READ_FRAMEBUFFER, self._fbo)
+        # Con un PBO enlazado, glReadPixels escribe en él y no espera a la copia
+        glReadPixels(0, 0, self.read_width, self.read_height, GL_RGBA, GL_UNSIGNED_BYTE, ctypes.c_void_p(0))
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+        if self._fbo is not None:
+            glBindFramebuffer(GL_FRAMEBUFFER, 0)
+        self._pending[slot] = frame
+        self.requested += 1
+        self.capture_seconds += time.perf_counter() - start
+
+    def _collect(self, slot):
+        """
+        Copia la lectura pendiente del PBO enlazado de `slot` y la encola para escribirla.
+        """
+        frame = self._pending[slot]
+        self._pending[slot] = None
+        try:
+            pixels = self._free.get_nowait()
+        except queue.Empty:
+            self.dropped += 1
+            return
+        address = glMapBuffer(GL_PIXEL_PACK_BUFFER, GL_READ_ONLY)
+        if not address:
+            self._free.put(pixels)
+            self.errors += 1
+            return
+        try:
+            ctypes.memmove(pixels.ctypes.data, address, self.frame_size)
+        finally:
+            glUnmapBuffer(GL_PIXEL_PACK_BUFFER)
+        try:
+            self._queue.put_nowait((frame, pixels))
+        except queue.Full:
+            self._free.put(pixels)
+            self.dropped += 1
+
+    def _write_loop(self):
+        raw = open(self.output, "wb") if self.format == "raw" else None
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    return
+                frame, pixels = item
+                try:
+                    # OpenGL entrega las filas de abajo arriba
+                    rgb = downscale(pixels[::-1, :, :3], self._cpu_scale)
+                    if raw is not None:
+                        raw.write(np.ascontiguousarray(rgb).tobytes())
+                    else:
+                        path = os.path.join(self.output, f"frame_{frame:06d}.png")
+                        with open(path, "wb") as f:
+                            f.write(encode_png(rgb, self.png_level))
+                    self.written += 1
+                except Exception as e:
+                    self.errors += 1
+                    print(f"Error escribiendo el frame {frame}: {e}")
+                finally:
+                    self._free.put(pixels)
+        finally:
+            if raw is not None:
+                raw.close()
+
+    def close(self):
+        """
+        Recoge las lecturas pendientes, espera a que el hilo escriba todo lo encolado y
+        libera los PBO. Debe llamarse con el contexto OpenGL aún activo.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        # Se recogen en el orden en que se pidieron
+        n = len(self._pbos)
+        for i in range(n):
+            slot = (self._next + i) % n
+            if self._pending[slot] is not None:
+                glBindBuffer(GL_PIXEL_PACK_BUFFER, self._pbos[slot])
+                self._collect(slot)
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+        glDeleteBuffers(n, self._pbos)
+        if self._fbo is not None:
+            glDeleteFramebuffers(1, [self._fbo])
+            glDeleteRenderbuffers(1, [self._renderbuffer])
+        self._queue.put(None)
+        self._writer.join()
+
+    def report(self):
+        """
+        Retorna:
+            dict: Contadores de la captura y milisegundos medios por captura en el hilo
+            principal.
+        """
+        return {
+            "frames": self.frames,
+            "requested": self.requested,
+            "written": self.written,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "capture_ms": self.capture_seconds / self.requested * 1000 if self.requested else 0.0,
+        }
+
+    def format_report(self):
+        r = self.report()
+        width, height = self.output_size
+        text = (f"Captura: {r['written']} frames de {width}x{height} en {self.output} "
+                f"({r['requested']} pedidos de {r['frames']}, {r['dropped']} descartados, "
+                f"{r['errors']} errores), {r['capture_ms']:.2f} ms por captura en el hilo principal")
+        if self.format == "raw":
+            text += (f"\nConvertir con: ffmpeg -f rawvideo -pix_fmt rgb24 -s {width}x{height} "
+                     f"-r FPS -i {self.output} captura.mp4")
+        return text
@@ -0,0 +1,219 @@
+"""
+Carga de recursos en segundo plano.
+
+La lectura y decodificación de archivos (modelos OBJ, imágenes) se hace en un pool de hilos;
+el hilo principal solo realiza la subida final a OpenGL, que debe ocurrir en el hilo que posee
+el contexto. Así la ventana puede abrirse y mostrar una pantalla de carga mientras tanto, y
+se pueden pedir recursos nuevos en cualquier momento de la partida.
+
+Uso:
+    loader = AssetLoader()
+    coche = loader.request("coche", MODEL, "Car.obj")
+    pista = loader.request("pista", TEXTURE, "track_texture.png")
+    ...  # crear la ventana y el contexto OpenGL
+    while not loader.done:
+        loader.poll()  # sube lo que ya esté decodificado
+    coche.value  # CarMesh subida a la GPU
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from cargar_recursos import cargar_modelo_carro
+from malla_carro import CarMesh
+from texturas import default_manager, load_texture_data
+
+# Tipos de recurso predefinidos
+MODEL = "modelo"
+TEXTURE = "textura"
+
+
+class AssetHandle:
+    """
+    Estado de un recurso pedido al AssetLoader.
+
+    Attributes:
+        value: Resultado de la subida (por ejemplo, el ID de la textura); None hasta que
+            `ready` es True o si la carga falló.
+        error (Exception): Excepción de la decodificación o de la subida, si la hubo.
+        decode_seconds (float): Tiempo de lectura y decodificación en el hilo de trabajo.
+        upload_seconds (float): Tiempo de la subida en el hilo principal.
+        wait_seconds (float): Tiempo en cola hasta que un hilo empezó a decodificarlo.
+    """
+
+    __slots__ = ("name", "kind", "path", "value", "error", "ready",
+                 "requested_at", "wait_seconds", "decode_seconds", "upload_seconds", "_future")
+
+    def __init__(self, name, kind, path):
+        self.name = name
+        self.kind = kind
+        self.path = path
+        self.value = None
+        self.error = None
+        self.ready = False
+        self.requested_at = time.perf_counter()
+        self.wait_seconds = 0.0
+        self.decode_seconds = 0.0
+        self.upload_seconds = 0.0
+        self._future = None
+
+    @property
+    def failed(self):
+        return self.error is not None
+
+
+def _decode_model(path):
+    model = cargar_modelo_carro(path)
+    if model is None:
+        raise IOError(f"No se pudo cargar el modelo {path}")
+    # Empaquetar los vértices también es trabajo de CPU; solo la subida necesita el contexto
+    return CarMesh.from_scene(model)
+
+
+def _upload_model(path, mesh):
+    mesh.upload()
+    return mesh
+
+
+class AssetLoader:
+    """
+    Pool de hilos que decodifica recursos y cola de subidas para el hilo principal.
+    """
+
+    def __init__(self, max_workers=None, texture_manager=None):
+        """
+        Args:
+            max_workers (int): Hilos de decodificación (por defecto, el de ThreadPoolExecutor).
+            texture_manager (texturas.TextureManager): Gestor donde se registran las texturas;
+                por defecto, `texturas.default_manager()`.
+        """
+        self.textures = texture_manager if texture_manager is not None else default_manager()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="carga")
+        self._kinds = {
+            MODEL: (_decode_model, _upload_model),
+            TEXTURE: (self._decode_texture, self.textures.adopt),
+        }
+        self.handles = {}
+        self._pending = []
+
+    def _decode_texture(self, path):
+        return load_texture_data(path, self.textures.use_cache, self.textures.mipmaps)
+
+    def register_kind(self, kind, decode, upload):
+        """
+        Añade un tipo de recurso.
+
+        Args:
+            kind (str): Nombre del tipo.
+            decode (callable): path -> datos; se ejecuta en un hilo de trabajo y no puede usar
+                OpenGL.
+            upload (callable): (path, datos) -> valor; se ejecuta en el hilo principal.
+        """
+        self._kinds[kind] = (decode, upload)
+
+    def request(self, name, kind, path):
+        """
+        Pide un recurso. Si ya se pidió con el mismo nombre se devuelve el mismo handle.
+
+        Retorna:
+            AssetHandle
+        """
+        handle = self.handles.get(name)
+        if handle is not None:
+            return handle
+        if kind not in self._kinds:
+            raise ValueError(f"Tipo de recurso desconocido: {kind}")
+        handle = AssetHandle(name, kind, path)
+        decode = self._kinds[kind][0]
+        handle._future = self._executor.submit(self._decode, handle, decode)
+        self.handles[name] = handle
+        self._pending.append(handle)
+        return handle
+
+    @staticmethod
+    def _decode(handle, decode):
+        start = time.perf_counter()
+        handle.wait_seconds = start - handle.requested_at
+        try:
+            return decode(handle.path)
+        finally:
+            handle.decode_seconds = time.perf_counter() - start
+
+    def poll(self, max_uploads=None, time_budget=None):
+        """
+        Sube en el hilo principal los recursos ya decodificados. Debe llamarse con el
+        contexto OpenGL activo, por ejemplo una vez por frame.
+
+        Args:
+            max_uploads (int): Máximo de subidas en esta llamada.
+            time_budget (float): Segundos tras los que no se empieza otra subida.
+
+        Retorna:
+            int: Recursos terminados (subidos o fallidos) en esta llamada.
+        """
+        start = time.perf_counter()
+        finished = 0
+        for handle in list(self._pending):
+            if max_uploads is not None and finished >= max_uploads:
+                break
+            if time_budget is not None and time.perf_counter() - start >= time_budget:
+                break
+            if not handle._future.done():
+                continue
+            self._pending.remove(handle)
+            finished += 1
+            try:
+                data = handle._future.result()
+            except Exception as e:
+                handle.error = e
+                print(f"Error cargando {handle.kind} {handle.path}: {e}")
+                continue
+            upload_start = time.perf_counter()
+            try:
+                handle.value = self._kinds[handle.kind][1](handle.path, data)
+                handle.ready = True
+            except Exception as e:
+                handle.error = e
+                print(f"Error subiendo {handle.kind} {handle.path}: {e}")
+            handle.upload_seconds = time.perf_counter() - upload_start
+        return finished
+
+    @property
+    def done(self):
+        return not self._pending
+
+    @property
+    def progress(self):
+        """
+        Fracción de recursos terminados (subidos o fallidos), entre 0 y 1.
+        """
+        total = len(self.handles)
+        return 1.0 if total == 0 else (total - len(self._pending)) / total
+
+    def wait(self):
+        """
+        Bloquea hasta que todo lo pedido esté decodificado y subido.
+        """
+        while self._pending:
+            self._pending[0]._future.exception()
+            self.poll()
+
+    def timings(self):
+        """
+        Tiempos de cada recurso en segundos.
+
+        Retorna:
+            dict: nombre -> {"wait", "decode", "upload"}.
+        """
+        return {
+            name: {"wait": h.wait_seconds, "decode": h.decode_seconds, "upload": h.upload_seconds}
+            for name, h in self.handles.items()
+        }
+
+    def format_timings(self):
+        lines = []
+        for name, t in self.timings().items():
+            lines.append(f"  {name:<16} cola {t['wait'] * 1000:7.1f} ms  decodificación "
+                         f"{t['decode'] * 1000:7.1f} ms  subida {t['upload'] * 1000:7.1f} ms")
+        return "\n".join(lines)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
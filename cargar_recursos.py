@@ -1,37 +1,185 @@
-import pygame
+import os
+import time
+import numpy as np
 from OpenGL.GL import *
 import pywavefront
+from cache_binario import cache_path_for, describe_sources, read_cache, write_cache
+
+# Número de floats de cada componente de los formatos de vértice de PyWavefront
+_FORMAT_SIZES = {"T2F": 2, "C3F": 3, "N3F": 3, "V3F": 3}
+
+# Versión del formato de la caché del modelo; cambiarla invalida las cachés existentes
+MODEL_CACHE_VERSION = 1
+
+
+def posiciones_material(material):
+    """
+    Extrae las posiciones (V3F) de los vértices intercalados de un material de PyWavefront.
+    """
+    components = material.vertex_format.split("_")
+    stride = sum(_FORMAT_SIZES[c] for c in components)
+    offset = 0
+    for c in components:
+        if c == "V3F":
+            break
+        offset += _FORMAT_SIZES[c]
+    data = np.asarray(material.vertices, dtype=np.float32).reshape(-1, stride)
+    return data[:, offset:offset + 3]
+
 
 def cargar_textura(path):
     """
     Carga una textura desde la imagen especificada en `path` y la configura para OpenGL.
+    Las texturas se comparten por ruta a través de `texturas.default_manager()`, y sus
+    niveles de mipmap se guardan en una caché binaria junto a la imagen.
     """
-    try:
-        surface = pygame.image.load(path)
-        surface = pygame.transform.flip(surface, False, True)  # Corrige la orientación de la textura
-        texture_data = pygame.image.tostring(surface, 'RGB', 1)
-        width, height = surface.get_rect().size
-
-        tex_id = glGenTextures(1)
-        glBindTexture(GL_TEXTURE_2D, tex_id)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_REPEAT)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_REPEAT)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR_MIPMAP_LINEAR)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB, width, height, 0, GL_RGB, GL_UNSIGNED_BYTE, texture_data)
-        glGenerateMipmap(GL_TEXTURE_2D)
-        return tex_id
-    except Exception as e:
-        print(f"Error cargando textura {path}: {e}")
-        return None
+    # Importación diferida: texturas depende de pygame y la carga de modelos no
+    from texturas import default_manager
+    return default_manager().acquire(path)
 
-def cargar_modelo_carro(path):
+class CompiledMaterial:
+    """
+    Material de un modelo compilado. Expone `vertices` en formato V3F para ser compatible
+    con los materiales de PyWavefront.
     """
-    Carga el modelo 3D del carro desde el archivo especificado en `path` usando PyWavefront.
+
+    vertex_format = "V3F"
+
+    def __init__(self, name, diffuse, scene_vertices, faces):
+        self.name = name
+        self.diffuse = diffuse
+        self.faces = faces
+        self._scene_vertices = scene_vertices
+
+    @property
+    def vertices(self):
+        return self._scene_vertices[self.faces].reshape(-1)
+
+
+class CompiledMesh:
+    """
+    Malla de un modelo compilado: caras (índices de vértice) y materiales.
+    """
+
+    def __init__(self, name, faces, materials):
+        self.name = name
+        self.faces = faces
+        self.materials = materials
+
+
+class CompiledModel:
+    """
+    Modelo 3D con la misma interfaz que usa el juego de una escena de PyWavefront
+    (`vertices` y `mesh_list`), respaldado por arrays de NumPy.
+    """
+
+    def __init__(self, vertices, faces, mesh_info):
+        self.vertices = vertices
+        self.mesh_list = []
+        for mesh in mesh_info:
+            materials = [
+                CompiledMaterial(m["name"], m["diffuse"], vertices, faces[m["first"]:m["first"] + m["count"]])
+                for m in mesh["materials"]
+            ]
+            first, count = mesh["first"], mesh["count"]
+            self.mesh_list.append(CompiledMesh(mesh["name"], faces[first:first + count], materials))
+
+
+def _compilar_escena(scene):
+    """
+    Convierte una escena de PyWavefront en arrays compactos.
+
+    Retorna:
+        tuple: (vertices float32 (V, 3), caras uint32 (F, 3), descripción de mallas y materiales)
+    """
+    vertices = [np.asarray(scene.vertices, dtype=np.float32)[:, :3]]
+    n_vertices = len(vertices[0])
+    faces = []
+    n_faces = 0
+    mesh_info = []
+    for mesh in scene.mesh_list:
+        mesh_faces = np.asarray(mesh.faces, dtype=np.uint32).reshape(-1, 3)
+        mesh_first = n_faces
+        materials = []
+        face_cursor = 0
+        for material in getattr(mesh, "materials", None) or []:
+            positions = posiciones_material(material)
+            count = len(positions) // 3
+            candidate = mesh_faces[face_cursor:face_cursor + count]
+            # PyWavefront guarda las caras de la malla en el orden de los materiales; si no
+            # coinciden (un material usado en varios tramos) se guardan sus vértices expandidos.
+            if len(candidate) == count and np.allclose(vertices[0][candidate].reshape(-1, 3), positions):
+                material_faces = candidate
+            else:
+                material_faces = np.arange(n_vertices, n_vertices + 3 * count, dtype=np.uint32).reshape(-1, 3)
+                vertices.append(np.asarray(positions, dtype=np.float32))
+                n_vertices += len(positions)
+            face_cursor += count
+            diffuse = getattr(material, "diffuse", None) or [1.0, 1.0, 1.0, 1.0]
+            materials.append({"name": material.name, "diffuse": [float(c) for c in diffuse],
+                              "first": n_faces, "count": len(material_faces)})
+            faces.append(material_faces)
+            n_faces += len(material_faces)
+        if not materials:
+            faces.append(mesh_faces)
+            n_faces += len(mesh_faces)
+        mesh_info.append({"name": mesh.name, "first": mesh_first, "count": n_faces - mesh_first,
+                          "materials": materials})
+
+    all_faces = np.concatenate(faces) if faces else np.zeros((0, 3), dtype=np.uint32)
+    return np.concatenate(vertices), all_faces, mesh_info
+
+
+def _fuentes_modelo(path):
+    """
+    Archivos de los que depende el modelo: el OBJ y las bibliotecas MTL que referencia.
+    """
+    paths = [path]
+    directory = os.path.dirname(path)
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if line.startswith("mtllib"):
+                mtl_path = os.path.join(directory, line.split(None, 1)[1].strip())
+                if os.path.exists(mtl_path):
+                    paths.append(mtl_path)
+    return paths
+
+
+def cargar_modelo_carro(path, usar_cache=True):
+    """
+    Carga el modelo 3D del carro desde el archivo especificado en `path`.
+
+    La primera vez el OBJ se parsea con PyWavefront y se compila a una caché binaria junto al
+    archivo (ver cache_binario). En los siguientes arranques, si el OBJ y su MTL no han cambiado,
+    el modelo se carga mapeando la caché en memoria sin volver a parsear el texto. Una caché
+    de otro tipo de recurso o de otra versión de MODEL_CACHE_VERSION se vuelve a generar.
     """
     try:
-        modelo = pywavefront.Wavefront(path, create_materials=True, collect_faces=True)
-        
+        inicio = time.perf_counter()
+        cache_path = cache_path_for(path)
+        cached = read_cache(cache_path) if usar_cache else None
+        if cached is not None:
+            meta, arrays = cached
+            # Una caché de otro tipo o de otra versión del formato se reconstruye
+            if meta.get("kind") != "car_model" or meta.get("version") != MODEL_CACHE_VERSION:
+                cached = None
+        if cached is not None:
+            modelo = CompiledModel(arrays["vertices"], arrays["faces"], meta["meshes"])
+            origen = "caché"
+        else:
+            scene = pywavefront.Wavefront(path, create_materials=True, collect_faces=True)
+            vertices, faces, mesh_info = _compilar_escena(scene)
+            if usar_cache:
+                try:
+                    write_cache(cache_path, {"vertices": vertices, "faces": faces},
+                                describe_sources(_fuentes_modelo(path)),
+                                {"kind": "car_model", "version": MODEL_CACHE_VERSION, "meshes": mesh_info})
+                except OSError as e:
+                    print(f"No se pudo escribir la caché del modelo {cache_path}: {e}")
+            modelo = CompiledModel(vertices, faces, mesh_info)
+            origen = "parseo completo"
+        print(f"Modelo {path} cargado ({origen}) en {(time.perf_counter() - inicio) * 1000:.1f} ms")
+
         # Verificar los materiales cargados:
         print("Materiales cargados:")
         for mesh in modelo.mesh_list:
@@ -43,4 +191,3 @@ def cargar_modelo_carro(path):
     except Exception as e:
         print(f"Error cargando modelo del carro {path}: {e}")
         return None
-
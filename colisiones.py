@@ -1,23 +1,26 @@
-import time
-import random
-
-def check_collisions(logic):
+def check_collisions(logic, swept=True):
     """
     Revisa las colisiones entre el coche y los obstáculos, considerando diferentes tamaños y tipos de obstáculos.
+
+    Con `swept=True` se prueba todo el recorrido del coche durante el último tick (desde
+    logic.prev_car_x/prev_car_z hasta su posición actual), de modo que a gran velocidad no
+    puede atravesar un obstáculo pequeño entre dos frames. Con `swept=False` solo se prueba
+    la posición final.
     """
     if logic.intangible:
-        if time.time() - logic.last_collision_time > 3:
+        if logic.clock() - logic.last_collision_time > 3:
             logic.intangible = False
     else:
-        for obs in logic.obstacles:
-            obs_x, obs_z = obs["x"], obs["z"]
-            obs_size = obs["size"]  # Tamaño del obstáculo
-            
-            if abs(logic.car_x - obs_x) < obs_size and abs(logic.car_z - obs_z) < obs_size:
-                logic.attempts -= 1
-                logic.last_collision_time = time.time()
-                logic.intangible = True
-                logic.car_speed_z = 0.0
-                logic.car_x += random.choice([-0.5, 0.5])
-                obs["z"] += 2
-                break
+        # Solo se examinan los obstáculos cercanos en z (búsqueda binaria en el almacén)
+        if swept:
+            slot, _ = logic.obstacles.sweep(logic.prev_car_x, logic.prev_car_z, logic.car_x, logic.car_z)
+        else:
+            slot = logic.obstacles.first_hit(logic.car_x, logic.car_z)
+        if slot >= 0:
+            obs = logic.obstacles.view(slot)
+            logic.attempts -= 1
+            logic.last_collision_time = logic.clock()
+            logic.intangible = True
+            logic.car_speed_z = 0.0
+            logic.car_x += logic.rng.choice([-0.5, 0.5])
+            obs["z"] += 2
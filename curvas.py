@@ -1,38 +1,232 @@
+from abc import ABC, abstractmethod
 import numpy as np
 
 def get_track_offset(z, segment_length=250, amplitude=2.0):
     """
     Calcula el desplazamiento lateral para la pista en función de la distancia z.
-    
+
+    Acepta tanto escalares como arrays de NumPy; con arrays todo el cálculo (segmento, signo,
+    módulo y seno) se hace con operaciones vectorizadas, sin bucles de Python.
+
     Args:
-        z (float): Distancia a lo largo de la pista (en metros).
+        z (float o np.ndarray): Distancia a lo largo de la pista (en metros).
         segment_length (float): Longitud de cada segmento de curva.
         amplitude (float): Amplitud máxima de la curva.
-        
+
     Retorna:
-        float: Desplazamiento lateral (offset) en la pista.
+        float o np.ndarray: Desplazamiento lateral (offset) en la pista.
     """
-    segment = int(z // segment_length)
-    mod_z = z % segment_length
-    sign = (-1) ** segment  # Alterna la dirección de la curva
+    z = np.asarray(z, dtype=np.float64)
+    segment = np.floor_divide(z, segment_length)
+    mod_z = z - segment * segment_length
+    sign = 1.0 - 2.0 * np.mod(segment, 2)  # Alterna la dirección de la curva: (-1) ** segment
     offset = sign * amplitude * np.sin(np.pi * mod_z / segment_length)
-    return offset
+    return offset[()] if offset.ndim == 0 else offset
 
-def generate_curve_points(track_length, resolution=1, segment_length=250, amplitude=2.0):
+def generate_curve_points(track_length, resolution=1, segment_length=250, amplitude=2.0, profile=None):
     """
     Genera puntos de la pista junto con su desplazamiento lateral.
-    
+
     Args:
         track_length (float): Longitud total de la pista en metros.
         resolution (float): Distancia entre puntos (en metros).
         segment_length (float): Longitud de cada segmento de curva.
         amplitude (float): Amplitud máxima de la curva.
-    
+        profile (CurveProfile): Perfil de curva a usar. Si es None se usa la senoidal alterna
+            definida por segment_length y amplitude.
+
     Retorna:
         tuple: Arrays (z_points, x_offsets)
     """
     z_points = np.arange(0, track_length + resolution, resolution)
-    # Vectorizamos la función para aplicar a cada valor de z
-    vectorized_offset = np.vectorize(get_track_offset, otypes=[float])
-    x_offsets = vectorized_offset(z_points, segment_length, amplitude)
+    if profile is None:
+        x_offsets = get_track_offset(z_points, segment_length, amplitude)
+    else:
+        x_offsets = profile.offset(z_points)
     return z_points, x_offsets
+
+
+class CurveProfile(ABC):
+    """
+    Perfil de curva de la pista: describe el desplazamiento lateral x(z).
+
+    Las subclases implementan `_evaluate`, que recibe un array de z y devuelve en lote el
+    desplazamiento, su primera derivada dx/dz y su segunda derivada d²x/dz².
+    """
+
+    @abstractmethod
+    def _evaluate(self, z):
+        """
+        Retorna:
+            tuple: (x, dx/dz, d²x/dz²) como arrays con la forma de z.
+        """
+
+    def evaluate(self, z):
+        """
+        Evalúa el perfil en lote.
+
+        Args:
+            z (float o np.ndarray): Distancias a lo largo de la pista.
+
+        Retorna:
+            tuple: (offset, derivada, curvatura) con la misma forma que z.
+        """
+        z = np.asarray(z, dtype=np.float64)
+        x, dx, ddx = self._evaluate(z)
+        curvature = ddx / (1.0 + dx * dx) ** 1.5
+        if z.ndim == 0:
+            return x[()], dx[()], curvature[()]
+        return x, dx, curvature
+
+    def offset(self, z):
+        """
+        Desplazamiento lateral x(z).
+        """
+        return self.evaluate(z)[0]
+
+    def derivative(self, z):
+        """
+        Primera derivada dx/dz (pendiente de la línea central).
+        """
+        return self.evaluate(z)[1]
+
+    def curvature(self, z):
+        """
+        Curvatura con signo de la línea central (1 / radio).
+        """
+        return self.evaluate(z)[2]
+
+
+class SineProfile(CurveProfile):
+    """
+    Perfil original del juego: medio seno por segmento, alternando la dirección.
+    """
+
+    def __init__(self, segment_length=250, amplitude=2.0):
+        self.segment_length = segment_length
+        self.amplitude = amplitude
+
+    def offset(self, z):
+        return get_track_offset(z, self.segment_length, self.amplitude)
+
+    def _evaluate(self, z):
+        z = np.asarray(z, dtype=np.float64)
+        segment = np.floor_divide(z, self.segment_length)
+        k = np.pi / self.segment_length
+        phase = k * (z - segment * self.segment_length)
+        a = (1.0 - 2.0 * np.mod(segment, 2)) * self.amplitude
+        s = np.sin(phase)
+        x = a * s
+        dx = a * k * np.cos(phase)
+        ddx = -x * k * k
+        return x, dx, ddx
+
+
+class SplineProfile(CurveProfile):
+    """
+    Perfil definido por puntos de control (z, x) unidos con un spline cúbico natural.
+
+    Fuera del rango de los puntos de control la pista continúa recta con la pendiente del extremo.
+    """
+
+    def __init__(self, z_knots, x_knots):
+        z_knots = np.asarray(z_knots, dtype=np.float64)
+        x_knots = np.asarray(x_knots, dtype=np.float64)
+        if z_knots.ndim != 1 or z_knots.shape != x_knots.shape or len(z_knots) < 2:
+            raise ValueError("Se necesitan al menos dos puntos de control con la misma forma")
+        if np.any(np.diff(z_knots) <= 0):
+            raise ValueError("Los valores z de los puntos de control deben ser crecientes")
+        self.z_knots = z_knots
+        self.x_knots = x_knots
+
+        # Segundas derivadas en los nodos (spline natural: M0 = Mn = 0)
+        n = len(z_knots)
+        h = np.diff(z_knots)
+        moments = np.zeros(n)
+        if n > 2:
+            system = np.zeros((n - 2, n - 2))
+            idx = np.arange(n - 2)
+            system[idx, idx] = 2.0 * (h[:-1] + h[1:])
+            system[idx[1:], idx[:-1]] = h[1:-1]
+            system[idx[:-1], idx[1:]] = h[1:-1]
+            slopes = np.diff(x_knots) / h
+            rhs = 6.0 * np.diff(slopes)
+            moments[1:-1] = np.linalg.solve(system, rhs)
+        self._h = h
+        self._moments = moments
+
+    def _evaluate(self, z):
+        zk, xk, h, m = self.z_knots, self.x_knots, self._h, self._moments
+        zc = np.clip(z, zk[0], zk[-1])
+        i = np.clip(np.searchsorted(zk, zc, side="right") - 1, 0, len(h) - 1)
+        hi = h[i]
+        a = (zk[i + 1] - zc) / hi
+        b = (zc - zk[i]) / hi
+        m0, m1 = m[i], m[i + 1]
+        x = a * xk[i] + b * xk[i + 1] + ((a ** 3 - a) * m0 + (b ** 3 - b) * m1) * hi * hi / 6.0
+        dx = (xk[i + 1] - xk[i]) / hi + ((1.0 - 3.0 * a * a) * m0 + (3.0 * b * b - 1.0) * m1) * hi / 6.0
+        ddx = a * m0 + b * m1
+
+        # Extrapolación recta fuera del rango de los puntos de control
+        outside = zc != z
+        x = np.where(outside, x + dx * (z - zc), x)
+        ddx = np.where(outside, 0.0, ddx)
+        return x, dx, ddx
+
+
+class ArcProfile(CurveProfile):
+    """
+    Perfil formado por tramos de curvatura constante (arcos de circunferencia y rectas).
+
+    Cada tramo se define como (longitud_en_z, curvatura); una curvatura 0 es una recta. Los
+    tramos se encadenan con continuidad de posición y de tangente. Como para un arco sin(θ)
+    varía linealmente con z, todo el perfil tiene forma cerrada. Antes del primer tramo y
+    tras el último la pista continúa recta.
+    """
+
+    def __init__(self, sections, start_offset=0.0, start_slope=0.0):
+        lengths = np.array([length for length, _ in sections], dtype=np.float64)
+        curvatures = np.array([curv for _, curv in sections], dtype=np.float64)
+        if len(lengths) == 0 or np.any(lengths <= 0):
+            raise ValueError("Cada tramo necesita una longitud positiva")
+
+        n = len(lengths)
+        starts = np.concatenate(([0.0], np.cumsum(lengths)))
+        sin0 = np.zeros(n + 1)
+        x0 = np.zeros(n + 1)
+        sin0[0] = start_slope / np.sqrt(1.0 + start_slope ** 2)
+        x0[0] = start_offset
+        for i in range(n):
+            s0 = sin0[i]
+            s1 = s0 + curvatures[i] * lengths[i]
+            if abs(s1) >= 1.0:
+                raise ValueError(f"El tramo {i} gira más de 90 grados respecto al eje z")
+            x0[i + 1] = x0[i] + self._delta_x(s0, s1, curvatures[i], lengths[i])
+            sin0[i + 1] = s1
+
+        self.starts = starts
+        self.curvatures = np.concatenate((curvatures, [0.0]))
+        self._sin0 = sin0
+        self._x0 = x0
+
+    @staticmethod
+    def _delta_x(s0, s1, curvature, dz):
+        """
+        Desplazamiento lateral a lo largo de un tramo (vectorizado).
+        """
+        cos0 = np.sqrt(1.0 - s0 * s0)
+        cos1 = np.sqrt(1.0 - s1 * s1)
+        safe = np.where(curvature != 0, curvature, 1.0)
+        return np.where(curvature != 0, (cos0 - cos1) / safe, s0 / cos0 * dz)
+
+    def _evaluate(self, z):
+        i = np.clip(np.searchsorted(self.starts, z, side="right") - 1, 0, len(self.starts) - 1)
+        dz = z - self.starts[i]
+        curvature = np.where(z < 0.0, 0.0, self.curvatures[i])
+        s0 = self._sin0[i]
+        s = s0 + curvature * dz
+        cos = np.sqrt(1.0 - s * s)
+        x = self._x0[i] + self._delta_x(s0, s, curvature, dz)
+        dx = s / cos
+        ddx = curvature / cos ** 3
+        return x, dx, ddx
@@ -1,207 +1,260 @@
+import math
+import numpy as np
 from OpenGL.GL import *
+from hud import GlyphAtlas, HudRenderer
+from malla_obstaculos import CUBE_LINES
+from malla_pista import TRACK_TOLERANCE
+from backend_grafico import current_backend, TRIANGLES, QUADS, QUAD_STRIP, LINES
 
-def draw_model_wavefront(scene, override_color=None):
+# Un HudRenderer por fuente para draw_text (el atlas se rasteriza una sola vez)
+_text_renderers = {}
+
+def draw_model_wavefront(scene, override_color=None, backend=None):
     """
     Dibuja un modelo 3D cargado con PyWavefront usando los valores del material
     definidos en el archivo MTL. Si se proporciona un override_color, se usará ese
     color en lugar del definido en el material.
+    Los triángulos de cada malla se envían con una llamada de dibujo.
     """
+    backend = backend or current_backend()
+    positions = np.asarray(scene.vertices, dtype=np.float32)[:, :3]
     for mesh in scene.mesh_list:
         if not hasattr(mesh, 'materials') or not mesh.materials:
-            glColor3f(1, 1, 1)
+            backend.set_color(1, 1, 1)
         else:
             mat = mesh.materials[0]
             if override_color is not None:
                 r, g, b = override_color
-                glColor3f(r, g, b)
+                backend.set_color(r, g, b)
             else:
                 try:
                     # Usamos el color difuso definido en el material (MTL)
                     r, g, b = mat.diffuse[:3]
-                    glColor3f(r, g, b)
+                    backend.set_color(r, g, b)
                 except AttributeError:
-                    glColor3f(1, 1, 1)
-        glBegin(GL_TRIANGLES)
-        for face in mesh.faces:
-            for vertex_i in face:
-                x, y, z = scene.vertices[vertex_i]
-                glVertex3f(x, y, z)
-        glEnd()
+                    backend.set_color(1, 1, 1)
+        faces = np.asarray(mesh.faces, dtype=np.int64).reshape(-1)
+        backend.draw_arrays(TRIANGLES, np.ascontiguousarray(positions[faces]))
 
 def draw_text(message, x, y, font, screen, color=(255, 255, 255)):
     """
     Dibuja un texto en la pantalla.
     Se requiere pasar el objeto font y la superficie screen de pygame.
+    El texto se dibuja con el atlas de glifos de la fuente (ver hud.HudRenderer); cada
+    posición (x, y) reutiliza su geometría mientras el texto no cambie.
     """
-    glDisable(GL_DEPTH_TEST)
-    text_surface = font.render(message, True, color)
-    screen.blit(text_surface, (x, y))
-    glEnable(GL_DEPTH_TEST)
+    renderer = _text_renderers.get(font)
+    if renderer is None:
+        width, height = screen.get_size()
+        renderer = _text_renderers[font] = HudRenderer(GlyphAtlas(font), width, height)
+    renderer.text((x, y), message, x, y, color)
+    renderer.draw_slot((x, y))
 
 
-def draw_cube():
+def draw_cube(backend=None):
     """
     Dibuja un cubo wireframe que se usa como fallback o para representar obstáculos.
     """
-    vertices = [
-        [-0.5, -0.5, -0.5],
-        [ 0.5, -0.5, -0.5],
-        [ 0.5,  0.5, -0.5],
-        [-0.5,  0.5, -0.5],
-        [-0.5, -0.5,  0.5],
-        [ 0.5, -0.5,  0.5],
-        [ 0.5,  0.5,  0.5],
-        [-0.5,  0.5,  0.5]
-    ]
-    edges = [
-        (0, 1), (1, 2), (2, 3), (3, 0),
-        (4, 5), (5, 6), (6, 7), (7, 4),
-        (0, 4), (1, 5), (2, 6), (3, 7)
-    ]
-    glBegin(GL_LINES)
-    for edge in edges:
-        glNormal3f(0, 1, 0)
-        for vertex in edge:
-            glVertex3fv(vertices[vertex])
-    glEnd()
-
-def draw_obstacles(logic):
-    """
-    Dibuja todos los obstáculos almacenados en el objeto de lógica del juego.
-    """
-    glBindTexture(GL_TEXTURE_2D, 0)
-    glColor3f(1, 0, 0)
-    for obs in logic.obstacles:
-        glPushMatrix()
-        glTranslatef(obs["x"], 0, obs["z"])  # Corregido para usar claves en el diccionario
-        glScalef(obs["size"], obs["size"], obs["size"])  # Ajusta el tamaño según el tipo de obstáculo
-        draw_cube()
-        glPopMatrix()
-
-def draw_car(logic, car_model):
-    """
-    Dibuja el coche según el estado de la lógica del juego. Si el modelo está disponible,
-    se dibuja usando PyWavefront; de lo contrario, se dibuja un cubo.
+    backend = backend or current_backend()
+    backend.set_normal(0, 1, 0)
+    backend.draw_arrays(LINES, CUBE_LINES)
+
+def draw_obstacles(logic, view_range=None, backend=None):
+    """
+    Dibuja los obstáculos almacenados en el objeto de lógica del juego.
+    Si se indica view_range (z_min, z_max), solo se dibujan los que caen dentro de esa
+    ventana (ver perspectiva.visible_z_range), localizados con búsqueda binaria.
+    Las aristas de todos los obstáculos visibles se envían en una sola llamada de dibujo
+    desde `logic.obstacle_mesh`, que solo recalcula los obstáculos modificados.
+    """
+    obstacles = logic.obstacles
+    if view_range is None:
+        lo, hi = 0, len(obstacles)
+    else:
+        z_min, z_max = view_range
+        lo, hi = obstacles.range_between(z_min - obstacles.max_size, z_max + obstacles.max_size)
+    mesh = logic.obstacle_mesh
+    count = mesh.update(lo, hi)
+    if not count:
+        return
+    backend = backend or current_backend()
+    backend.bind_texture(0)
+    backend.set_color(1, 0, 0)
+    backend.set_normal(0, 1, 0)
+    backend.draw_arrays(LINES, mesh.vertices.reshape(-1, 3), 0, count)
+
+def draw_car(logic, car_mesh, alpha=1.0, backend=None):
+    """
+    Dibuja el coche según el estado de la lógica del juego. Si la malla del coche está
+    disponible (ver malla_carro.CarMesh), se dibuja desde la GPU; de lo contrario, se dibuja un cubo.
     Se aplica un override de color si el coche es intangible.
+    La posición se interpola entre los dos últimos ticks de la simulación según `alpha`.
     """
-    glPushMatrix()
-    glTranslatef(logic.car_x, 0.0, logic.car_z)
-    glRotatef(180, 0, 1, 0)
-    glScalef(0.5, 0.5, 0.5)
-    if car_model:
+    backend = backend or current_backend()
+    car_x, car_z = logic.interpolated_position(alpha)
+    backend.push_matrix()
+    backend.translate(car_x, 0.0, car_z)
+    backend.rotate(180, 0, 1, 0)
+    backend.scale(0.5, 0.5, 0.5)
+    if car_mesh:
         if logic.intangible:
-            draw_model_wavefront(car_model, override_color=(1.0, 1.0, 0.0))
+            car_mesh.draw(override_color=(1.0, 1.0, 0.0), backend=backend)
         else:
-            draw_model_wavefront(car_model)
+            car_mesh.draw(backend=backend)
     else:
         if logic.intangible:
-            glColor3f(1, 1, 0)
+            backend.set_color(1, 1, 0)
         else:
-            glColor3f(1, 0, 0)
-        draw_cube()
-    glPopMatrix()
+            backend.set_color(1, 0, 0)
+        draw_cube(backend)
+    backend.pop_matrix()
 
-def draw_track(logic, road_texture_id, track_width=10, resolution=1, tex_scale=10):
+def draw_track(logic, road_texture_id, track_width=10, resolution=1, tex_scale=10, view_range=None, backend=None,
+               tolerance=TRACK_TOLERANCE):
     """
     Dibuja la pista curvada adaptando la textura a la curvatura real.
     
-    Para forzar que la imagen se adapte a las curvas, se calcula la longitud de arco a lo largo de
-    la pista y, además, se calcula el vector normal local para cada punto de la curva. Esto permite
-    determinar correctamente los vértices izquierdo y derecho de la pista y mapear la textura de 
-    forma que se mantenga su orientación a lo largo de las curvas.
+    La geometría (longitud de arco, vectores normales y vértices de los bordes) se mantiene en la
+    malla persistente `logic.track_mesh`, que solo calcula el tramo nuevo cuando la pista crece.
+    La pista se envía con vertex arrays en una única llamada de dibujo.
     
     Args:
         logic: Objeto de la lógica del juego, que contiene la longitud de la pista (logic.track_length).
         road_texture_id: ID de la textura cargada para la pista.
         track_width (float): Ancho total de la pista.
-        resolution (float): Distancia en metros entre puntos para generar la curva.
+        resolution (float): Distancia en metros entre puntos para generar la curva; con
+            `tolerance`, la distancia mínima.
         tex_scale (float): Factor de escala para el mapeo de la textura en el eje v.
+        view_range (tuple): Ventana (z_min, z_max) visible; si se indica, solo se envía el tramo
+            de la malla que la cubre, de modo que el número de vértices no crece con la distancia.
+        backend: Backend de dibujo (ver backend_grafico); por defecto, OpenGL.
+        tolerance (float): Error máximo en metros de los bordes respecto a la curva real; los
+            puntos se reparten según la curvatura (ver malla_pista.TrackMesh). None muestrea
+            cada `resolution` metros.
     """
-    from curvas import generate_curve_points
-    import math
+    mesh = logic.track_mesh
+    mesh.configure(track_width, resolution, tex_scale, tolerance)
+    count = mesh.update(logic.track_length + 10)
+    first = 0
+    if view_range is not None:
+        first, end = mesh.index_range(*view_range)
+        count = max(end - first, 0)
 
-    glBindTexture(GL_TEXTURE_2D, road_texture_id)
-    glColor3f(1, 1, 1)
+    backend = backend or current_backend()
+    backend.bind_texture(road_texture_id)
+    backend.set_color(1, 1, 1)
 
-    # Generar puntos de la pista
-    total_length = logic.track_length + 10
-    z_points, x_offsets = generate_curve_points(total_length, resolution=resolution)
-
-    # Calcular la longitud de arco acumulada a lo largo de la pista
-    arc_lengths = [0.0]
-    for i in range(1, len(z_points)):
-        dx = x_offsets[i] - x_offsets[i - 1]
-        dz = z_points[i] - z_points[i - 1]
-        arc_segment = math.sqrt(dx * dx + dz * dz)
-        arc_lengths.append(arc_lengths[-1] + arc_segment)
-
-    # Calcular el vector normal para cada vértice usando diferencias finitas
-    n = len(z_points)
-    normals = []
-    for i in range(n):
-        # Calculamos la derivada (tangente) en el punto i:
-        if i == 0:
-            dx = x_offsets[i+1] - x_offsets[i]
-            dz = z_points[i+1] - z_points[i]
-        elif i == n - 1:
-            dx = x_offsets[i] - x_offsets[i-1]
-            dz = z_points[i] - z_points[i-1]
-        else:
-            dx = (x_offsets[i+1] - x_offsets[i-1]) / 2.0
-            dz = (z_points[i+1] - z_points[i-1]) / 2.0
-        
-        # En nuestro sistema, el centro de la pista es: C = (x_offsets[i], -z_points[i])
-        # La tangente T = (dx, -dz) (ya que usamos -z para los vértices)
-        # Un vector normal (a la izquierda) es: N = (T_z, -T_x) = (-(-dz), -dx) = (dz, -dx)
-        length = math.sqrt(dx * dx + dz * dz)
-        if length != 0:
-            nx = dz / length
-            ny = -dx / length
-        else:
-            nx, ny = 0, 0
-        normals.append((nx, ny))
-    
     # Dibujar la pista usando GL_QUAD_STRIP con mapeo de textura basado en la longitud de arco
-    glBegin(GL_QUAD_STRIP)
-    for i, (z, arc) in enumerate(zip(z_points, arc_lengths)):
-        # Centro de la pista en coordenadas 3D (usamos -z para la profundidad)
-        center_x = x_offsets[i]
-        center_z = -z
-        
-        # Desplazar el centro usando el vector normal para obtener los bordes
-        nx, ny = normals[i]
-        left_x = center_x - (track_width / 2) * nx
-        left_z = center_z - (track_width / 2) * ny
-        right_x = center_x + (track_width / 2) * nx
-        right_z = center_z + (track_width / 2) * ny
-
-        # Asignar la coordenada de textura: u=0 para el borde izquierdo, u=1 para el derecho;
-        # v se basa en la longitud de arco
-        v_coord = arc / tex_scale
-        glTexCoord2f(0.0, v_coord)
-        glVertex3f(left_x, -0.5, left_z)
-        glTexCoord2f(1.0, v_coord)
-        glVertex3f(right_x, -0.5, right_z)
-    glEnd()
-
-def draw_barriers(logic):
+    backend.draw_arrays(QUAD_STRIP, mesh.vertices, 2 * first, 2 * count, tex_coords=mesh.tex_coords)
+
+# Vértices de un tramo de barrera (izquierda y derecha) con i = 0; z se desplaza -i por tramo
+_BARRIER_SECTION = np.array([
+    # Barrera izquierda
+    [-5.5, -0.5, -10], [-5.3, -0.5, -10], [-5.3, 0.5, 0], [-5.5, 0.5, 0],
+    # Barrera derecha
+    [5.3, -0.5, -10], [5.5, -0.5, -10], [5.5, 0.5, 0], [5.3, 0.5, 0],
+], dtype=np.float32)
+
+def draw_barriers(logic, view_range=None, backend=None):
     """
     Dibuja las barreras a lo largo de la pista.
-    Se generan en intervalos definidos por la longitud de la pista.
-    """
-    glBindTexture(GL_TEXTURE_2D, 0)
-    glColor3f(1, 0, 0)
-    glBegin(GL_QUADS)
-    for i in range(0, logic.track_length, 10):
-        glNormal3f(0, 1, 0)
-        # Barrera izquierda
-        glVertex3f(-5.5, -0.5, -i - 10)
-        glVertex3f(-5.3, -0.5, -i - 10)
-        glVertex3f(-5.3,  0.5, -i)
-        glVertex3f(-5.5,  0.5, -i)
-        # Barrera derecha
-        glVertex3f(5.3, -0.5, -i - 10)
-        glVertex3f(5.5, -0.5, -i - 10)
-        glVertex3f(5.5,  0.5, -i)
-        glVertex3f(5.3,  0.5, -i)
-    glEnd()
+    Se generan en intervalos definidos por la longitud de la pista; si se indica view_range
+    (z_min, z_max), solo los tramos que caen dentro de esa ventana. Cada vértice se desplaza
+    con la línea central a su distancia (logic.track_index), así que las barreras siguen la
+    curva de la pista. Todos los tramos se envían en una única llamada de dibujo.
+    """
+    start, stop = 0, int(logic.track_length)
+    if view_range is not None:
+        z_min, z_max = view_range
+        # Cada tramo i cubre z en [-i - 10, -i]
+        start = max(start, int(math.floor(-z_max / 10)) * 10)
+        stop = min(stop, int(math.ceil(-z_min)))
+    sections = np.arange(start, stop, 10, dtype=np.float32)
+    if not len(sections):
+        return
+    vertices = np.repeat(_BARRIER_SECTION[None], len(sections), axis=0)
+    vertices[:, :, 2] -= sections[:, None]
+    vertices[:, :, 0] += logic.track_index.offsets(-vertices[:, :, 2])
+
+    backend = backend or current_backend()
+    backend.bind_texture(0)
+    backend.set_color(1, 0, 0)
+    backend.set_normal(0, 1, 0)
+    backend.draw_arrays(QUADS, vertices.reshape(-1, 3))
+
+def draw_profiler(profiler, hud, x=10, y=80, graph_width=240, graph_height=60, budget=1 / 60):
+    """
+    Superposición del perfilador (ver perfilador.FrameProfiler): gráfica de la duración de
+    los últimos frames, con una línea de referencia en `budget` segundos, y una tabla con
+    p50/p95/p99 por fase que se refresca cuatro veces por segundo. Los textos se dejan en
+    los huecos ("perfil", i) del HUD, así que debe llamarse antes de hud.draw(). Con el
+    perfilador desactivado no se dibuja la gráfica y los textos se retiran una sola vez.
+    """
+    if not profiler.enabled and ("perfil", 0, 0) not in hud:
+        # Las filas se rellenan desde la primera, así que no queda ningún texto del perfilador
+        return
+    rows = profiler.stats_rows(max_age=0.25) if profiler.enabled else []
+    columns = (0, 160, 230, 300)
+    for i in range(profiler.max_phases + 2):
+        row_y = y + graph_height + 10 + i * hud.atlas.line_height
+        for j, column_x in enumerate(columns):
+            slot = ("perfil", i, j)
+            if i < len(rows):
+                hud.text(slot, rows[i][j], x + column_x, row_y, (255, 255, 0))
+            else:
+                hud.remove(slot)
+
+    if not profiler.enabled:
+        return
+    frame_times = profiler.frame_times()
+    if len(frame_times) > 1:
+        # La referencia queda a media altura; lo que la supera se recorta arriba
+        scale = graph_height / (2 * budget)
+        heights = np.minimum(frame_times * scale, graph_height)
+        graph = np.empty((len(frame_times), 2), dtype=np.float32)
+        graph[:, 0] = x + np.arange(len(frame_times)) * (graph_width / (profiler.history - 1))
+        graph[:, 1] = y + graph_height - heights
+        reference = np.array([[x, y + graph_height / 2], [x + graph_width, y + graph_height / 2]], dtype=np.float32)
+        hud.begin()
+        glDisable(GL_TEXTURE_2D)
+        glDisableClientState(GL_TEXTURE_COORD_ARRAY)
+        glDisableClientState(GL_COLOR_ARRAY)
+        glColor3f(1, 1, 0)
+        glVertexPointer(2, GL_FLOAT, 0, reference)
+        glDrawArrays(GL_LINES, 0, 2)
+        glColor3f(0, 1, 0)
+        glVertexPointer(2, GL_FLOAT, 0, graph)
+        glDrawArrays(GL_LINE_STRIP, 0, len(graph))
+        hud.end()
+
+def draw_loading_screen(hud, progress, message="Cargando", bar_width=400, bar_height=20):
+    """
+    Pantalla de carga: un texto y una barra de progreso centrados en la ventana.
+
+    Args:
+        hud (hud.HudRenderer): HUD usado para el texto y la proyección 2D.
+        progress (float): Fracción completada, entre 0 y 1.
+        message (str): Texto sobre la barra.
+    """
+    x = (hud.width - bar_width) / 2
+    y = (hud.height - bar_height) / 2
+    filled = bar_width * min(max(progress, 0.0), 1.0)
+    hud.text("carga", f"{message}... {progress * 100:.0f}%", x, y - hud.atlas.line_height - 8)
+    hud.draw()
+
+    # Marco de la barra y parte completada
+    frame = np.array([[x, y], [x + bar_width, y], [x + bar_width, y + bar_height], [x, y + bar_height]],
+                     dtype=np.float32)
+    fill = np.array([[x, y], [x + filled, y], [x + filled, y + bar_height], [x, y + bar_height]],
+                    dtype=np.float32)
+    hud.begin()
+    glDisable(GL_TEXTURE_2D)
+    glDisableClientState(GL_TEXTURE_COORD_ARRAY)
+    glDisableClientState(GL_COLOR_ARRAY)
+    glColor3f(0.2, 0.8, 0.2)
+    glVertexPointer(2, GL_FLOAT, 0, fill)
+    glDrawArrays(GL_QUADS, 0, 4)
+    glColor3f(1, 1, 1)
+    glVertexPointer(2, GL_FLOAT, 0, frame)
+    glDrawArrays(GL_LINE_LOOP, 0, 4)
+    hud.end()
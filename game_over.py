@@ -8,6 +8,10 @@ def handle_game_over(logic, font, screen):
         logic: Instancia de GameLogic, que debe disponer de un método restart_game().
         font: Objeto pygame.font.Font para renderizar el texto.
         screen: Superficie de pantalla de pygame.
+
+    Retorna:
+        str: "restart" si se reinició la partida o "quit" si se cerró la ventana; en ese caso
+        quien llama termina el juego con su cierre normal.
     """
     # Renderizar los textos de "GAME OVER" y "Presiona 'R' para reiniciar"
     game_over_text = font.render("GAME OVER", True, (255, 0, 0))
@@ -23,14 +27,13 @@ def handle_game_over(logic, font, screen):
     screen.blit(restart_text, restart_rect)
     pygame.display.flip()
     
-    # Esperar a que el usuario presione 'R' para reiniciar
-    waiting = True
-    while waiting:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                exit()
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_r:
-                    logic.restart_game()
-                    waiting = False
+    # Esperar a que el usuario presione 'R' para reiniciar. pygame.event.wait bloquea hasta
+    # el siguiente evento, así que la espera no consume CPU
+    while True:
+        event = pygame.event.wait()
+        if event.type == pygame.QUIT:
+            return "quit"
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_r:
+                logic.restart_game()
+                return "restart"
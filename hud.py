@@ -0,0 +1,251 @@
+import numpy as np
+import pygame
+from OpenGL.GL import *
+
+# Caracteres que se rasterizan en el atlas: ASCII imprimible y los propios del español
+DEFAULT_CHARACTERS = "".join(chr(c) for c in range(32, 127)) + "áéíóúÁÉÍÓÚñÑüÜ¿¡°"
+
+
+class GlyphAtlas:
+    """
+    Atlas de glifos de una fuente de pygame.
+
+    Cada carácter se rasteriza una sola vez, en blanco sobre fondo transparente, y todos se
+    empaquetan por filas en una superficie RGBA que se sube como una única textura. Para cada
+    glifo se guarda su cuadrilátero (en píxeles, relativo al origen del glifo), sus
+    coordenadas de textura y su avance, de modo que maquetar un texto es solo indexar arrays.
+    """
+
+    def __init__(self, font, characters=DEFAULT_CHARACTERS, max_width=512, padding=1):
+        """
+        Args:
+            font (pygame.font.Font): Fuente a rasterizar.
+            characters (str): Caracteres incluidos en el atlas.
+            max_width (int): Ancho máximo de la textura en píxeles.
+            padding (int): Separación entre glifos para evitar que se mezclen al muestrear.
+        """
+        characters = "".join(dict.fromkeys(characters))
+        glyphs = [font.render(ch, True, (255, 255, 255)) for ch in characters]
+
+        # Empaquetado por filas
+        placements = []
+        x = y = row_height = 0
+        width = 0
+        for surface in glyphs:
+            w, h = surface.get_size()
+            if x + w > max_width and x > 0:
+                x = 0
+                y += row_height + padding
+                row_height = 0
+            placements.append((x, y, w, h))
+            x += w + padding
+            width = max(width, x)
+            row_height = max(row_height, h)
+        height = y + row_height
+
+        self.surface = pygame.Surface((max(width, 1), max(height, 1)), pygame.SRCALPHA)
+        self.surface.fill((255, 255, 255, 0))
+        n = len(characters)
+        self.index = {ch: i for i, ch in enumerate(characters)}
+        self.advances = np.zeros(n, dtype=np.float32)
+        self.quads = np.zeros((n, 4, 2), dtype=np.float32)
+        self.tex_coords = np.zeros((n, 4, 2), dtype=np.float32)
+        tex_w, tex_h = self.surface.get_size()
+        for i, (surface, (gx, gy, w, h)) in enumerate(zip(glyphs, placements)):
+            self.surface.blit(surface, (gx, gy))
+            self.advances[i] = w
+            self.quads[i] = ((0, 0), (w, 0), (w, h), (0, h))
+            u0, v0 = gx / tex_w, gy / tex_h
+            u1, v1 = (gx + w) / tex_w, (gy + h) / tex_h
+            self.tex_coords[i] = ((u0, v0), (u1, v0), (u1, v1), (u0, v1))
+        self.line_height = font.get_linesize()
+        # Los caracteres que no están en el atlas se dibujan como '?'
+        self.fallback = self.index.get("?", 0)
+        self.texture = None
+
+    def upload(self):
+        """
+        Sube el atlas a una textura. Debe llamarse con el contexto OpenGL ya creado.
+        """
+        width, height = self.surface.get_size()
+        # Sin voltear: la fila 0 de la textura es la parte superior de los glifos (v=0)
+        data = pygame.image.tostring(self.surface, "RGBA", False)
+        self.texture = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, width, height, 0, GL_RGBA, GL_UNSIGNED_BYTE, data)
+        glBindTexture(GL_TEXTURE_2D, 0)
+
+    def release(self):
+        if self.texture is not None:
+            glDeleteTextures([self.texture])
+            self.texture = None
+
+    def layout(self, message, x=0.0, y=0.0):
+        """
+        Maqueta un texto en una línea con su esquina superior izquierda en (x, y).
+
+        Retorna:
+            tuple: (vertices, tex_coords), arrays float32 (4n, 2) listos para GL_QUADS.
+        """
+        get = self.index.get
+        fallback = self.fallback
+        glyph_ids = np.fromiter((get(ch, fallback) for ch in message), dtype=np.intp, count=len(message))
+        pen = np.cumsum(self.advances[glyph_ids]) - self.advances[glyph_ids]
+        vertices = self.quads[glyph_ids]
+        vertices[:, :, 0] += (pen + x)[:, None]
+        vertices[:, :, 1] += y
+        return vertices.reshape(-1, 2), self.tex_coords[glyph_ids].reshape(-1, 2)
+
+
+class _HudEntry:
+    __slots__ = ("message", "position", "color", "vertices", "tex_coords", "colors")
+
+
+class HudRenderer:
+    """
+    Textos del HUD dibujados como cuadriláteros texturizados desde un GlyphAtlas, en una
+    proyección ortográfica 2D superpuesta a la escena.
+
+    Cada texto ocupa un hueco con nombre. Mientras su contenido, posición y color no cambian
+    se reutilizan sus vértices; todos los huecos se concatenan en un único lote que solo se
+    reconstruye cuando alguno cambia y se envía con una llamada de dibujo.
+    """
+
+    def __init__(self, atlas, width, height):
+        """
+        Args:
+            atlas (GlyphAtlas): Atlas de la fuente.
+            width (int): Ancho de la ventana en píxeles.
+            height (int): Altura de la ventana en píxeles.
+        """
+        self.atlas = atlas
+        self.width = width
+        self.height = height
+        self._entries = {}
+        self._batch = None
+
+    def upload(self):
+        """
+        Sube el atlas a la GPU si aún no se ha hecho.
+        """
+        if self.atlas.texture is None:
+            self.atlas.upload()
+
+    def release(self):
+        self.atlas.release()
+
+    def text(self, slot, message, x, y, color=(255, 255, 255)):
+        """
+        Fija el contenido del hueco `slot`. Si no cambia nada no se recalcula la geometría.
+
+        Args:
+            slot: Identificador del texto (por ejemplo "distancia").
+            message (str): Texto a mostrar.
+            x, y (float): Esquina superior izquierda en píxeles (origen arriba a la izquierda,
+                como en pygame).
+            color (tuple): Color RGB o RGBA con componentes 0-255.
+        """
+        color = tuple(color) if len(color) == 4 else (*color, 255)
+        entry = self._entries.get(slot)
+        if entry is not None and entry.message == message and entry.position == (x, y) and entry.color == color:
+            return
+        if entry is None:
+            entry = self._entries[slot] = _HudEntry()
+        entry.message = message
+        entry.position = (x, y)
+        entry.color = color
+        entry.vertices, entry.tex_coords = self.atlas.layout(message, x, y)
+        entry.colors = np.empty((len(entry.vertices), 4), dtype=np.uint8)
+        entry.colors[:] = color
+        self._batch = None
+
+    def __contains__(self, slot):
+        return slot in self._entries
+
+    def remove(self, slot):
+        if self._entries.pop(slot, None) is not None:
+            self._batch = None
+
+    def clear(self):
+        self._entries.clear()
+        self._batch = None
+
+    def _build_batch(self):
+        entries = list(self._entries.values())
+        if not entries:
+            return None
+        return (
+            np.ascontiguousarray(np.concatenate([e.vertices for e in entries])),
+            np.ascontiguousarray(np.concatenate([e.tex_coords for e in entries])),
+            np.ascontiguousarray(np.concatenate([e.colors for e in entries])),
+        )
+
+    def begin(self):
+        """
+        Prepara el estado de OpenGL para dibujar en 2D sobre la escena.
+        """
+        glPushAttrib(GL_ENABLE_BIT | GL_CURRENT_BIT | GL_COLOR_BUFFER_BIT | GL_TEXTURE_BIT)
+        glPushClientAttrib(GL_CLIENT_VERTEX_ARRAY_BIT)
+        glDisable(GL_DEPTH_TEST)
+        glDisable(GL_LIGHTING)
+        glEnable(GL_BLEND)
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        glEnable(GL_TEXTURE_2D)
+        glBindTexture(GL_TEXTURE_2D, self.atlas.texture)
+        glMatrixMode(GL_PROJECTION)
+        glPushMatrix()
+        glLoadIdentity()
+        glOrtho(0, self.width, self.height, 0, -1, 1)
+        glMatrixMode(GL_MODELVIEW)
+        glPushMatrix()
+        glLoadIdentity()
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+
+    def end(self):
+        """
+        Restaura el estado guardado en begin().
+        """
+        glMatrixMode(GL_PROJECTION)
+        glPopMatrix()
+        glMatrixMode(GL_MODELVIEW)
+        glPopMatrix()
+        glPopClientAttrib()
+        glPopAttrib()
+
+    @staticmethod
+    def _submit(vertices, tex_coords, colors):
+        glVertexPointer(2, GL_FLOAT, 0, vertices)
+        glTexCoordPointer(2, GL_FLOAT, 0, tex_coords)
+        glColorPointer(4, GL_UNSIGNED_BYTE, 0, colors)
+        glDrawArrays(GL_QUADS, 0, len(vertices))
+
+    def draw(self):
+        """
+        Dibuja todos los textos en una única llamada.
+        """
+        if self._batch is None:
+            self._batch = self._build_batch()
+        if self._batch is None:
+            return
+        self.upload()
+        self.begin()
+        self._submit(*self._batch)
+        self.end()
+
+    def draw_slot(self, slot):
+        """
+        Dibuja solo el texto del hueco `slot`.
+        """
+        entry = self._entries.get(slot)
+        if entry is None or not len(entry.vertices):
+            return
+        self.upload()
+        self.begin()
+        self._submit(entry.vertices, entry.tex_coords, entry.colors)
+        self.end()
@@ -0,0 +1,189 @@
+"""
+Índice de consultas sobre la geometría de la pista.
+
+Responde "¿dónde está la pista a la distancia d?" con tablas muestreadas a paso fijo: el
+desplazamiento de la línea central y su pendiente (exactas en las muestras, evaluadas con el
+perfil de `curvas`) y la longitud de arco acumulada. Entre muestras se interpola con un
+polinomio cúbico de Hermite, así que el error es despreciable con pasos de un metro. Las
+consultas escalares son O(1) (la muestra se obtiene dividiendo por el paso) salvo la de
+distancia a partir de longitud de arco, que es una búsqueda binaria.
+
+Convención de signos: las consultas reciben la distancia a lo largo de la pista, d = -z del
+mundo (el coche avanza hacia -z). Las variantes `*_at_z` aceptan directamente la z del mundo.
+"""
+import bisect
+import math
+import numpy as np
+from curvas import SineProfile
+
+# Distancia entre muestras de las tablas
+INDEX_STEP = 1.0
+# Las tablas empiezan algo por detrás de la salida, donde está la cámara al empezar
+INDEX_ORIGIN = -64.0
+
+
+class TrackIndex:
+    """
+    Tablas de la línea central de la pista con consultas interpoladas.
+
+    Las tablas crecen bajo demanda (`ensure`) sin modificar las muestras ya calculadas, de
+    modo que pueden leerse desde otro hilo las distancias que ya cubrían al empezar la lectura.
+    """
+
+    def __init__(self, profile=None, step=INDEX_STEP, initial_length=1024.0):
+        """
+        Args:
+            profile (CurveProfile): Perfil de la línea central (por defecto, SineProfile).
+            step (float): Distancia entre muestras.
+            initial_length (float): Distancia cubierta desde el principio.
+        """
+        self.profile = profile if profile is not None else SineProfile()
+        self.step = step
+        self._inv_step = 1.0 / step
+        self.origin = INDEX_ORIGIN
+        self.count = 0
+        self.length = self.origin  # Distancia de la última muestra
+        self.offsets_table = np.zeros(0)
+        self.slopes_table = np.zeros(0)
+        self.arc_table = np.zeros(0)
+        # Copias como listas de floats: indexarlas es mucho más rápido que indexar NumPy
+        self._x = []
+        self._dx = []
+        self._arc = []
+        self.ensure(initial_length)
+
+    def ensure(self, distance):
+        """
+        Amplía las tablas hasta cubrir `distance` (al menos el doble de muestras cada vez).
+        """
+        if distance <= self.length:
+            return
+        old_n = self.count
+        needed = int(math.ceil((distance - self.origin) * self._inv_step)) + 2
+        n = max(needed, 2 * old_n)
+        d = self.origin + np.arange(old_n, n) * self.step
+        x, dx, _ = self.profile.evaluate(d)
+
+        # Longitud de arco de cada celda nueva con la regla de Simpson
+        if old_n == 0:
+            cells = np.concatenate(([0.0], self._cell_arc(d[:-1], d[1:])))
+            arc = np.cumsum(cells)
+            # Longitud de arco desde el inicio de las tablas hasta la salida (d = 0)
+            self._start_arc = float(np.interp(0.0, d, arc))
+        else:
+            previous = np.concatenate(([d[0] - self.step], d[:-1]))
+            arc = self._arc[-1] + np.cumsum(self._cell_arc(previous, d))
+
+        # Se crean arrays nuevos en lugar de ampliar en su sitio: quien ya tenga los anteriores
+        # sigue leyendo datos coherentes
+        self.offsets_table = np.concatenate((self.offsets_table, x))
+        self.slopes_table = np.concatenate((self.slopes_table, dx))
+        self.arc_table = np.concatenate((self.arc_table, arc))
+        self._x.extend(x.tolist())
+        self._dx.extend(dx.tolist())
+        self._arc.extend(arc.tolist())
+        self.count = n
+        self.length = self.origin + (n - 1) * self.step
+
+    def _cell_arc(self, d0, d1):
+        def speed(d):
+            slope = self.profile.derivative(d)
+            return np.sqrt(1.0 + slope * slope)
+
+        return (d1 - d0) / 6.0 * (speed(d0) + 4.0 * speed((d0 + d1) * 0.5) + speed(d1))
+
+    def _cell(self, distance):
+        """
+        Muestra a la izquierda de `distance` y fracción dentro de la celda.
+        """
+        u = (distance - self.origin) * self._inv_step
+        i = int(u)
+        if i >= self.count - 1:
+            self.ensure(distance + self.step)
+        elif u < 0.0:
+            raise ValueError(f"Distancia {distance} anterior al inicio del índice ({self.origin})")
+        return i, u - i
+
+    def offset(self, distance):
+        """
+        Desplazamiento lateral de la línea central a `distance` metros.
+        """
+        # Es la consulta más frecuente: la celda se calcula aquí mismo salvo en los extremos
+        u = (distance - self.origin) * self._inv_step
+        i = int(u)
+        if u < 0.0 or i >= self.count - 1:
+            i, t = self._cell(distance)
+        else:
+            t = u - i
+        x, dx, h = self._x, self._dx, self.step
+        t2 = t * t
+        t3 = t2 * t
+        return ((2.0 * t3 - 3.0 * t2 + 1.0) * x[i] + (t3 - 2.0 * t2 + t) * h * dx[i]
+                + (3.0 * t2 - 2.0 * t3) * x[i + 1] + (t3 - t2) * h * dx[i + 1])
+
+    def offset_at_z(self, world_z):
+        """
+        Desplazamiento lateral de la línea central en la coordenada z del mundo.
+        """
+        return self.offset(-world_z)
+
+    def slope(self, distance):
+        """
+        Pendiente dx/dd de la línea central.
+        """
+        i, t = self._cell(distance)
+        x, dx, inv_h = self._x, self._dx, self._inv_step
+        t2 = t * t
+        return ((6.0 * t2 - 6.0 * t) * (x[i] - x[i + 1]) * inv_h
+                + (3.0 * t2 - 4.0 * t + 1.0) * dx[i] + (3.0 * t2 - 2.0 * t) * dx[i + 1])
+
+    def tangent(self, distance):
+        """
+        Vector unitario (x, z) del mundo en la dirección de avance de la pista.
+        """
+        slope = self.slope(distance)
+        inv_length = 1.0 / math.sqrt(1.0 + slope * slope)
+        return slope * inv_length, -inv_length
+
+    def arc_length(self, distance):
+        """
+        Longitud de la línea central desde la salida (d = 0) hasta `distance`.
+        """
+        i, t = self._cell(distance)
+        arc = self._arc
+        return arc[i] + (arc[i + 1] - arc[i]) * t - self._start_arc
+
+    def distance_at_arc(self, arc_length):
+        """
+        Distancia a lo largo del eje en la que la línea central alcanza `arc_length` metros
+        desde la salida (inversa de `arc_length`, por búsqueda binaria).
+        """
+        target = arc_length + self._start_arc
+        while target > self._arc[-1]:
+            self.ensure(self.length + (target - self._arc[-1]) + self.step)
+        arc = self._arc
+        i = max(bisect.bisect_right(arc, target) - 1, 0)
+        i = min(i, self.count - 2)
+        t = (target - arc[i]) / (arc[i + 1] - arc[i])
+        return self.origin + (i + t) * self.step
+
+    def offsets(self, distances):
+        """
+        Versión vectorizada de `offset`.
+        """
+        i, t = self._cells(distances)
+        x, dx, h = self.offsets_table, self.slopes_table, self.step
+        t2 = t * t
+        t3 = t2 * t
+        return ((2.0 * t3 - 3.0 * t2 + 1.0) * x[i] + (t3 - 2.0 * t2 + t) * h * dx[i]
+                + (3.0 * t2 - 2.0 * t3) * x[i + 1] + (t3 - t2) * h * dx[i + 1])
+
+    def _cells(self, distances):
+        distances = np.asarray(distances, dtype=np.float64)
+        if distances.size and distances.max() >= self.length:
+            self.ensure(float(distances.max()) + self.step)
+        u = (distances - self.origin) * self._inv_step
+        i = np.floor(u).astype(np.intp)
+        if i.size and i.min() < 0:
+            raise ValueError(f"Distancia anterior al inicio del índice ({self.origin})")
+        return i, u - i
@@ -1,98 +1,294 @@
+import argparse
+import random
+import time
 import pygame
 from pygame.locals import *
 from OpenGL.GL import *
-import pywavefront
 
 # Importar módulos para carga de recursos, lógica del juego, iluminación, dibujos, colisiones, perspectiva y fin del juego
-from cargar_recursos import cargar_textura, cargar_modelo_carro
-from logica_juego import GameLogic
+from carga_asincrona import AssetLoader, MODEL, TEXTURE
+from logica_juego import Controls, TICK_RATE
+from repeticion import ReplayWriter, new_game, seed_argument
+from captura import FrameCapture, FORMATS as CAPTURE_FORMATS
+from temporizador import FixedTimestep, FramePacer
+from hud import GlyphAtlas, HudRenderer
+from perfilador import FrameProfiler
 from iluminacion import setup_lighting
+from backend_grafico import current_backend
+from sombreadores import ShaderBackend, ShaderError
 from dibujos import (
-    draw_model_wavefront,
-    draw_text,
-    draw_cube,
     draw_obstacles,
     draw_car,
     draw_track,
-    draw_barriers
+    draw_barriers,
+    draw_profiler,
+    draw_loading_screen
 )
 from colisiones import check_collisions
-from perspectiva import configure_perspective, update_camera_view
+from perspectiva import (
+    Camera,
+    visible_z_range,
+    DRAW_DISTANCE
+)
 from game_over import handle_game_over
 
-# CARGAR RECURSOS E INICIALIZAR LA LÓGICA DEL JUEGO
-
-car_model = cargar_modelo_carro("Car.obj")
-logic = GameLogic()
+def controls_from_keys(keys):
+    """
+    Convierte el estado del teclado de pygame en los controles que entiende GameLogic.
+    """
+    return Controls(up=bool(keys[pygame.K_UP]), left=bool(keys[pygame.K_LEFT]), right=bool(keys[pygame.K_RIGHT]))
 
 # BUCLE PRINCIPAL DEL JUEGO
 
-def main():
+# Teclas del perfilador: mostrar/ocultar la superposición y exportar lo medido
+PROFILER_TOGGLE_KEY = pygame.K_F3
+PROFILER_EXPORT_KEY = pygame.K_F4
+
+def create_window(size, vsync=False):
+    """
+    Abre la ventana OpenGL. Si se pide vsync y el controlador no lo admite, se abre sin él.
+
+    Retorna:
+        tuple: (superficie de pantalla, si vsync quedó activo).
+    """
+    flags = DOUBLEBUF | OPENGL
+    if vsync:
+        try:
+            return pygame.display.set_mode(size, flags, vsync=1), True
+        except pygame.error as e:
+            print(f"Vsync no disponible: {e}")
+    return pygame.display.set_mode(size, flags), False
+
+# Pipelines de dibujo seleccionables con --render
+RENDERERS = ("clasico", "sombreadores")
+
+def create_backend(renderer, lighting_config):
+    """
+    Backend de dibujo del pipeline pedido. Si los sombreadores no están disponibles se usa el
+    pipeline clásico.
+
+    Retorna:
+        tuple: (backend, nombre del pipeline usado).
+    """
+    if renderer == "sombreadores":
+        try:
+            return ShaderBackend(lighting_config), renderer
+        except ShaderError as e:
+            print(f"Sombreadores no disponibles, se usa el pipeline clásico: {e}")
+    return current_backend(), "clasico"
+
+def main(draw_distance=DRAW_DISTANCE, target_fps=60, vsync=False, seed=None, record_path=None,
+         renderer="clasico", capture_path=None, capture_format="png", capture_every=1, capture_scale=1,
+         capture_buffers=3):
+    """
+    Args:
+        draw_distance (float): Profundidad máxima de dibujo desde la cámara.
+        target_fps (float): Límite de FPS (0 para no limitar).
+        vsync (bool): Sincronizar con el refresco de la pantalla.
+        seed (int): Semilla de la partida; por defecto, una aleatoria.
+        record_path (str): Si se indica, se graban los controles de cada tick en este archivo
+            para reproducir la sesión sin ventana (ver repeticion.py).
+        renderer (str): Pipeline de dibujo, uno de RENDERERS: "clasico" (pipeline fijo) o
+            "sombreadores" (programas GLSL con iluminación, ver sombreadores.py).
+        capture_path (str): Si se indica, se graban los frames de la partida en este
+            directorio (PNG) o archivo (raw) sin bloquear el bucle (ver captura.py).
+        capture_format (str): "png" o "raw".
+        capture_every (int): Capturar uno de cada N frames.
+        capture_scale (int): Factor de reducción del tamaño de los frames capturados.
+        capture_buffers (int): PBO del anillo de lectura (2 o 3).
+    """
     global road_texture_id, font, screen
+    # CARGAR RECURSOS E INICIALIZAR LA LÓGICA DEL JUEGO
+    # Los archivos se decodifican en segundo plano mientras se abre la ventana; aquí solo
+    # quedarán las subidas a OpenGL
+    loader = AssetLoader()
+    car_asset = loader.request("coche", MODEL, "Car.obj")
+    road_asset = loader.request("pista", TEXTURE, "track_texture.png")
+    # La partida usa un reloj que avanza con los ticks y su propio generador aleatorio, de
+    # modo que la semilla y los controles de cada tick bastan para reproducirla
+    if seed is None:
+        seed = random.getrandbits(64)
+    logic, sim_clock = new_game(seed)
+    recorder = ReplayWriter(record_path, seed, TICK_RATE) if record_path else None
+
     pygame.init()
-    screen = pygame.display.set_mode((900, 700), DOUBLEBUF | OPENGL)
+    screen, vsync = create_window((900, 700), vsync)
     pygame.font.init()
     font = pygame.font.SysFont('Arial', 30)
 
-    # Configurar la matriz de proyección usando la nueva implementación basada en numpy
-    projection_matrix = configure_perspective(900, 700)
+    # Cámara de seguimiento: matrices en buffers de columna mayor que se cargan sin transponer
+    camera = Camera(900, 700)
     glMatrixMode(GL_PROJECTION)
-    glLoadMatrixf(projection_matrix.T)  # Transponer para columna mayor
+    glLoadMatrixf(camera.projection)
     glMatrixMode(GL_MODELVIEW)
 
     glEnable(GL_DEPTH_TEST)
     glClearColor(0.5, 0.5, 0.5, 1.0)
     glShadeModel(GL_SMOOTH)
-    glEnable(GL_NORMALIZE)
+    glEnable(GL_TEXTURE_2D)
 
-    lighting_config = setup_lighting()
+    # La configuración de iluminación solo la usa el pipeline de sombreadores, que la sube a
+    # sus programas una vez
+    backend, renderer = create_backend(renderer, setup_lighting())
+    print(f"Pipeline de dibujo: {renderer}")
 
-    # Configurar la iluminación (se puede optimizar, ya que setup_lighting se invoca dos veces)
-    setup_lighting()
-    glEnable(GL_TEXTURE_2D)
+    # Textos del HUD: la fuente se rasteriza una vez en un atlas de glifos
+    hud = HudRenderer(GlyphAtlas(font), 900, 700)
+    hud.upload()
+
+    # Ritmo de frames: límite de FPS con espera hasta el plazo (o vsync si está activo)
+    pacer = FramePacer(target_fps, vsync=vsync)
 
-    # Cargar la textura de la pista
-    road_texture_id = cargar_textura("track_texture.png")
+    # Pantalla de carga: subir los recursos a medida que los hilos terminan de decodificarlos
+    while not loader.done:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                loader.shutdown()
+                if recorder:
+                    recorder.close()
+                pygame.quit()
+                return
+        loader.poll()
+        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+        draw_loading_screen(hud, loader.progress)
+        pygame.display.flip()
+        pacer.wait()
+    hud.remove("carga")
+    print("Recursos cargados:")
+    print(loader.format_timings())
+
+    # Malla del coche ya empaquetada y subida a la GPU (o cubo si no se pudo cargar)
+    car_mesh = car_asset.value
+
+    road_texture_id = road_asset.value
     if road_texture_id is None:
         print("Error: No se pudo cargar la textura de la pista.")
         road_texture_id = 0
 
+    # Perfilador por fases; desactivado no añade coste apreciable
+    profiler = FrameProfiler()
+
+    # Captura de vídeo: lectura asíncrona del frame antes de cada flip
+    capture = None
+    if capture_path:
+        capture = FrameCapture(900, 700, capture_path, capture_format, capture_every, capture_scale,
+                               capture_buffers)
+
+    # La simulación avanza con paso fijo; el dibujo interpola entre los dos últimos ticks
+    scheduler = FixedTimestep(tick_rate=TICK_RATE, max_steps=5)
+    current_speed, distance_travelled = 0.0, 0.0
+    last_time = time.perf_counter()
+
     running = True
     while running:
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
 
         # Verificar si se terminó el juego
         if logic.attempts <= 0:
-            handle_game_over(logic, font, screen)
+            if recorder:
+                recorder.flush()
+            # Al cerrar la ventana se sale del bucle para cerrar la captura y la grabación
+            if handle_game_over(logic, font, screen) == "quit":
+                break
+            if recorder:
+                recorder.restart()
+            scheduler.reset()
+            pacer.reset()
+            camera.reset()
+            last_time = time.perf_counter()
             continue
 
+        profiler.begin_frame()
+        # Recursos pedidos durante la partida: como mucho una subida por frame
+        loader.poll(max_uploads=1)
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
+            elif event.type == pygame.KEYDOWN and event.key == PROFILER_TOGGLE_KEY:
+                profiler.toggle()
+            elif event.type == pygame.KEYDOWN and event.key == PROFILER_EXPORT_KEY:
+                profiler.export_csv("perfil_frames.csv")
+                profiler.export_chrome_trace("perfil_traza.json")
+                print("Perfil exportado a perfil_frames.csv y perfil_traza.json")
 
-        # Actualizar el estado del juego
-        keys = pygame.key.get_pressed()
-        current_speed, distance_travelled = logic.update(keys)
-        check_collisions(logic)
-
-        # Calcular y cargar la matriz de vista (lookAt) basada en la posición del coche
-        camera_position = (logic.car_x, 1.5, logic.car_z + 5.0)
-        target_position = (logic.car_x, 0.0, logic.car_z)
-        view_matrix = update_camera_view(camera_position, target_position)
-        glLoadMatrixf(view_matrix.T)  # Cargar la matriz de vista
-
-        # Dibujar los elementos del juego utilizando las funciones del módulo 'dibujos'
-        draw_track(logic, road_texture_id, track_width=10, resolution=1, tex_scale=10)
-        draw_barriers(logic)
-        draw_obstacles(logic)
-        draw_car(logic, car_model)
-        draw_text(f"Distancia: {min(distance_travelled, logic.max_distance):.1f} m", 10, 10, font, screen)
-        draw_text(f"Velocidad: {abs(current_speed):.2f} m/s", 10, 40, font, screen)
+        now = time.perf_counter()
+        frame_time = now - last_time
+        last_time = now
 
-        pygame.display.flip()
-        pygame.time.wait(10)
+        # Actualizar el estado del juego tantos ticks como correspondan al tiempo transcurrido
+        controls = controls_from_keys(pygame.key.get_pressed())
+        for _ in range(scheduler.advance(frame_time)):
+            with profiler.scope("update"):
+                current_speed, distance_travelled = logic.update(controls, scheduler.dt)
+            with profiler.scope("check_collisions"):
+                check_collisions(logic)
+            sim_clock.advance(scheduler.dt)
+            if recorder:
+                recorder.record(controls, logic)
+            if logic.attempts <= 0:
+                break
+        alpha = scheduler.alpha
+
+        # Calcular y cargar la matriz de vista (lookAt) basada en la posición interpolada del coche
+        car_x, car_z = logic.interpolated_position(alpha)
+        camera.follow(car_x, car_z, frame_time)
+        glLoadMatrixf(camera.view)
+
+        # Dibujar los elementos del juego utilizando las funciones del módulo 'dibujos',
+        # limitados a la ventana visible para que el coste no crezca con la distancia recorrida
+        view_range = visible_z_range(car_z, draw_distance)
+        with profiler.scope("draw_track"):
+            draw_track(logic, road_texture_id, track_width=10, resolution=1, tex_scale=10, view_range=view_range,
+                       backend=backend)
+        with profiler.scope("draw_barriers"):
+            draw_barriers(logic, view_range, backend=backend)
+        with profiler.scope("draw_obstacles"):
+            draw_obstacles(logic, view_range, backend=backend)
+        with profiler.scope("draw_car"):
+            draw_car(logic, car_mesh, alpha, backend=backend)
+        with profiler.scope("hud"):
+            hud.text("distancia", f"Distancia: {min(distance_travelled, logic.max_distance):.1f} m", 10, 10)
+            hud.text("velocidad", f"Velocidad: {abs(current_speed):.2f} m/s", 10, 40)
+            draw_profiler(profiler, hud)
+            hud.draw()
+        if capture:
+            with profiler.scope("capture"):
+                capture.capture()
+
+        with profiler.scope("flip"):
+            pygame.display.flip()
+        profiler.end_frame()
+        pacer.wait()
 
+    print(f"[{renderer}] {pacer.format_stats()}")
+    if capture:
+        capture.close()
+        print(capture.format_report())
+    if recorder:
+        recorder.close()
+        print(f"Sesión grabada en {record_path} ({recorder.ticks} ticks, semilla {seed})")
+    loader.shutdown()
     pygame.quit()
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Juego de carreras")
+    parser.add_argument("--fps", type=float, default=60, help="límite de FPS (0 para no limitar)")
+    parser.add_argument("--vsync", action="store_true", help="sincronizar con el refresco de la pantalla")
+    parser.add_argument("--distancia-dibujo", type=float, default=DRAW_DISTANCE)
+    parser.add_argument("--semilla", type=seed_argument, help="semilla de la partida")
+    parser.add_argument("--grabar", metavar="ARCHIVO", help="grabar la sesión para reproducirla con repeticion.py")
+    parser.add_argument("--render", choices=RENDERERS, default="clasico",
+                        help="pipeline de dibujo; los tiempos de frame se muestran al salir para compararlos")
+    parser.add_argument("--capturar", metavar="RUTA",
+                        help="capturar los frames en un directorio (png) o un archivo (raw)")
+    parser.add_argument("--capturar-formato", choices=CAPTURE_FORMATS, default="png")
+    parser.add_argument("--capturar-cada", type=int, default=1, metavar="N", help="capturar uno de cada N frames")
+    parser.add_argument("--capturar-escala", type=int, default=1, metavar="N",
+                        help="reducir los frames capturados N veces en cada eje")
+    parser.add_argument("--capturar-buffers", type=int, choices=(2, 3), default=3,
+                        help="PBO del anillo de lectura (doble o triple búfer)")
+    args = parser.parse_args()
+    main(draw_distance=args.distancia_dibujo, target_fps=args.fps, vsync=args.vsync,
+         seed=args.semilla, record_path=args.grabar, renderer=args.render,
+         capture_path=args.capturar, capture_format=args.capturar_formato, capture_every=args.capturar_cada,
+         capture_scale=args.capturar_escala, capture_buffers=args.capturar_buffers)
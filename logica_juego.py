@@ -1,115 +1,129 @@
 import time
 import random
-import pygame
-from curvas import get_track_offset
+from collections import namedtuple
+from indice_pista import TrackIndex
+from malla_pista import TrackMesh
+from mundo import WorldStream
+from obstaculos import ObstacleStore
+from malla_obstaculos import ObstacleMesh
+from perspectiva import CAMERA_OFFSET_Z
+
+# Frecuencia de la simulación (ticks por segundo)
+TICK_RATE = 60
+
+# Estado de los controles en un tick. Se construye desde el teclado en juego.py o desde
+# fuentes de entrada programadas en simulacion.py, así la lógica no depende de pygame.
+Controls = namedtuple("Controls", ["up", "left", "right"])
 
 class GameLogic:
-    def __init__(self):
+    def __init__(self, clock=time.time, rng=None):
+        # Reloj usado para la intangibilidad; inyectable para simular sin tiempo real
+        self.clock = clock
+        # Generador aleatorio propio de la partida (semillas del mundo y colisiones); con uno
+        # sembrado y un reloj simulado la partida es reproducible (ver repeticion.py)
+        self.rng = rng if rng is not None else random.Random()
+
         # Posición y velocidades del coche
         self.car_x = 0.0
         self.car_z = 0.0
         self.car_speed_x = 0.0
         self.car_speed_z = 0.0
+        self.prev_car_x = 0.0  # Posición al inicio del último tick (para colisiones continuas)
+        self.prev_car_z = 0.0
         
         # Estado de la pista y obstáculos
         self.track_length = 50
-        self.obstacles = []
+        # Consultas de la línea central (desplazamiento, tangente, longitud de arco) compartidas
+        # por la lógica, el mundo y el dibujo de las barreras
+        self.track_index = TrackIndex()
+        self.obstacles = ObstacleStore()
+        # Geometría de la pista calculada de forma incremental
+        self.track_mesh = TrackMesh(profile=self.track_index.profile)
+        self.obstacle_mesh = ObstacleMesh(self.obstacles)  # Geometría de los obstáculos por hueco
+        # Mundo generado por tramos; cada partida tiene su semilla, tomada del generador
+        self.world = WorldStream(self.rng.getrandbits(64), track=self.track_index)
         
         # Vidas y colisiones
         self.attempts = 3
         self.last_collision_time = 0
         self.intangible = False  # Indica si el coche es invulnerable tras una colisión
         
-        # Límites y ajustes de movimiento
+        # Límites y ajustes de movimiento (unidades por segundo, independientes del frame rate)
         self.max_distance = 1000
-        self.acceleration = 0.5
-        self.friction = 0.05
+        self.base_speed = -12.0  # m/s hacia delante (eje -z)
+        self.lateral_speed = 6.0  # m/s
+        self.lateral_limit = 5.0  # Distancia máxima del coche a la línea central
+        self.track_growth = 120.0  # metros de pista generados por segundo acelerando
 
-    def generate_obstacle(self):
+    def stream_world(self):
         """
-        Genera un obstáculo en la pista basado en la velocidad y distancia recorrida.
+        Pasa al almacén los obstáculos del mundo que entran en el horizonte por delante del
+        coche (ver mundo.WorldStream). El recorrido depende solo de la semilla del mundo, no
+        de cuántos ticks se mantenga pulsada la tecla ni de su duración.
         """
-        base_probability = 0.15  # Probabilidad base de generar un obstáculo
-        speed_factor = min(1.0, abs(self.car_speed_z) / 0.5)
-        distance_factor = min(1.0, self.car_z / 500)
-        
-        spawn_probability = base_probability + (speed_factor * 0.1) + (distance_factor * 0.1)
-        
-        if random.random() < spawn_probability:
-            curve_offset = get_track_offset(self.car_z - self.track_length)
-            
-            # Evitar generación de obstáculos demasiado cercanos
-            if self.obstacles and abs(self.car_z - self.obstacles[-1]["z"]) < 3:
-                return
-            
-            # Generar el obstáculo con características variadas
-            obstacle_type = random.choice(["pequeño", "grande", "movil"])
-            size = 0.5 if obstacle_type == "pequeño" else (1.0 if obstacle_type == "grande" else 0.7)
-            direction = random.choice([-0.02, 0.02]) if obstacle_type == "movil" else 0
-            
-            self.obstacles.append({
-                "x": curve_offset + random.uniform(-2, 2),
-                "z": self.car_z - self.track_length,
-                "size": size,
-                "type": obstacle_type,
-                "direction": direction
-            })
+        return self.world.advance(self.obstacles, -self.car_z, self.track_length,
+                                  -(self.car_z + CAMERA_OFFSET_Z))
 
-    def check_collisions(logic):
+    def check_collisions(self):
         """
-        Revisa las colisiones entre el coche y los obstáculos, considerando diferentes tamaños y tipos de obstáculos.
+        Revisa las colisiones entre el coche y los obstáculos (ver colisiones.check_collisions).
         """
-        if logic.intangible:
-            if time.time() - logic.last_collision_time > 3:
-                logic.intangible = False
-        else:
-            for obs in logic.obstacles:
-                obs_x, obs_z = obs["x"], obs["z"]
-                obs_size = obs["size"]  # Tamaño del obstáculo
-                
-                if abs(logic.car_x - obs_x) < obs_size and abs(logic.car_z - obs_z) < obs_size:
-                    logic.attempts -= 1
-                    logic.last_collision_time = time.time()
-                    logic.intangible = True
-                    logic.car_speed_z = 0.0
-                    logic.car_x += random.choice([-0.5, 0.5])
-                    obs["z"] += 2
-                    break
+        from colisiones import check_collisions
+        check_collisions(self)
 
-
-    def update(self, keys):
+    def update(self, controls, dt=1.0 / TICK_RATE):
         """
-        Actualiza el estado del juego basándose en las teclas presionadas.
+        Actualiza el estado del juego basándose en los controles (ver Controls).
         Calcula la velocidad y actualiza la posición del coche, así como la longitud de la pista y los obstáculos.
-        Retorna la velocidad actual y la distancia recorrida.
+        Avanza la simulación `dt` segundos (un tick del paso fijo).
+        Retorna la velocidad actual (m/s) y la distancia recorrida.
         """
-        base_speed = -0.2
         distance_travelled = abs(self.car_z)
         speed_multiplier = 1 + (distance_travelled // 40) * 0.2
-        current_speed = base_speed * speed_multiplier
+        current_speed = self.base_speed * speed_multiplier
 
         # Movimiento hacia adelante
-        if keys[pygame.K_UP] and distance_travelled < self.max_distance:
+        if controls.up and distance_travelled < self.max_distance:
             self.car_speed_z = current_speed
-            self.track_length += 2
-            self.generate_obstacle()
+            self.track_length += self.track_growth * dt
         else:
             self.car_speed_z = 0.0
 
-        # Movimiento lateral
-        if keys[pygame.K_LEFT] and self.car_x > -5:
-            self.car_speed_x = -0.1
-        elif keys[pygame.K_RIGHT] and self.car_x < 5:
-            self.car_speed_x = 0.1
+        # Movimiento lateral, limitado respecto a la línea central de la pista en la posición
+        # del coche
+        center = self.track_index.offset(-self.car_z)
+        if controls.left and self.car_x > center - self.lateral_limit:
+            self.car_speed_x = -self.lateral_speed
+        elif controls.right and self.car_x < center + self.lateral_limit:
+            self.car_speed_x = self.lateral_speed
         else:
             self.car_speed_x = 0.0
 
         # Actualización de la posición
-        self.car_x += self.car_speed_x
-        self.car_z += self.car_speed_z
+        self.prev_car_x = self.car_x
+        self.prev_car_z = self.car_z
+        self.car_x += self.car_speed_x * dt
+        self.car_z += self.car_speed_z * dt
+
+        # Cargar los obstáculos que entran por delante y descartar los que ya quedaron
+        # detrás de la cámara
+        self.stream_world()
+        self.obstacles.evict_behind(self.car_z + CAMERA_OFFSET_Z)
 
         return current_speed, distance_travelled
 
+    def interpolated_position(self, alpha):
+        """
+        Posición (x, z) del coche interpolada entre los dos últimos estados de la simulación.
+
+        Args:
+            alpha (float): Fracción del siguiente tick ya transcurrida (0 = estado anterior,
+                1 = estado actual).
+        """
+        x = self.prev_car_x + (self.car_x - self.prev_car_x) * alpha
+        z = self.prev_car_z + (self.car_z - self.prev_car_z) * alpha
+        return x, z
+
     def restart_game(self):
         """
         Reinicia el estado del juego a sus valores iniciales.
@@ -118,7 +132,11 @@ class GameLogic:
         self.car_z = 0.0
         self.car_speed_x = 0.0
         self.car_speed_z = 0.0
+        self.prev_car_x = 0.0
+        self.prev_car_z = 0.0
         self.track_length = 50
         self.obstacles.clear()
+        self.world.reset(self.rng.getrandbits(64))
+        self.track_mesh.reset()
         self.attempts = 3
         self.intangible = False
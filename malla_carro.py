@@ -0,0 +1,167 @@
+import math
+import numpy as np
+from OpenGL.GL import *
+from OpenGL.error import GLError, NullFunctionError
+from cargar_recursos import posiciones_material
+from backend_grafico import current_backend, TRIANGLES
+
+# Ángulo máximo entre dos caras que comparten un vértice para que su normal se suavice; las
+# aristas más marcadas quedan vivas
+CREASE_ANGLE = 60.0
+
+
+def vertex_normals(vertices, crease_angle=CREASE_ANGLE):
+    """
+    Normales por vértice de una lista de triángulos (tres vértices por triángulo).
+
+    Cada vértice recibe la suma, ponderada por el área, de las normales de las caras que
+    comparten su posición y forman con la suya un ángulo menor que `crease_angle`.
+
+    Args:
+        vertices (np.ndarray): Array (3 * triángulos, 3).
+        crease_angle (float): Ángulo en grados a partir del cual una arista no se suaviza.
+
+    Retorna:
+        np.ndarray: Normales unitarias (n, 3) float32; (0, 1, 0) en triángulos degenerados.
+    """
+    vertices = np.asarray(vertices, dtype=np.float32).reshape(-1, 3)
+    n = len(vertices)
+    if n == 0:
+        return np.zeros((0, 3), dtype=np.float32)
+    triangles = vertices.reshape(-1, 3, 3).astype(np.float64)
+    # El módulo del producto vectorial es el doble del área: ya viene ponderada
+    faces = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    lengths = np.linalg.norm(faces, axis=1)
+    units = faces / np.maximum(lengths, 1e-30)[:, None]
+    corner_face = np.repeat(np.arange(len(triangles)), 3)
+
+    # Pares (a, b) de vértices con la misma posición, incluido cada vértice consigo mismo
+    _, group = np.unique(vertices, axis=0, return_inverse=True)
+    group = group.reshape(-1)
+    order = np.argsort(group, kind="stable")
+    sizes = np.bincount(group)
+    group_start = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    size_of = sizes[group[order]]
+    a = np.repeat(order, size_of)
+    pair_start = np.repeat(np.cumsum(size_of) - size_of, size_of)
+    b = order[np.repeat(group_start[group[order]], size_of) + np.arange(len(a)) - pair_start]
+
+    fa, fb = corner_face[a], corner_face[b]
+    keep = np.einsum("ij,ij->i", units[fa], units[fb]) >= math.cos(math.radians(crease_angle))
+    normals = np.zeros((n, 3))
+    np.add.at(normals, a[keep], faces[fb[keep]])
+    lengths = np.linalg.norm(normals, axis=1)
+    degenerate = lengths < 1e-20
+    normals[degenerate] = (0.0, 1.0, 0.0)
+    lengths[degenerate] = 1.0
+    return (normals / lengths[:, None]).astype(np.float32)
+
+
+def _material_color(material):
+    """
+    Color difuso (r, g, b) del material; blanco si no lo define.
+    """
+    try:
+        r, g, b = material.diffuse[:3]
+        return (float(r), float(g), float(b))
+    except (AttributeError, TypeError, ValueError):
+        return (1.0, 1.0, 1.0)
+
+
+class CarMesh:
+    """
+    Malla del coche residente en la GPU.
+
+    Los triángulos de todos los materiales se empaquetan en un único array float32 que se sube
+    una sola vez a un Vertex Buffer Object; cada material ocupa un rango contiguo y se dibuja con
+    una sola llamada a glDrawArrays. Si el contexto no admite VBO se usan vertex arrays del lado
+    del cliente con el mismo array.
+
+    Las normales por vértice (ver vertex_normals) se calculan una vez al construir la malla,
+    normalmente en el hilo de carga, y se suben al mismo VBO tras las posiciones.
+    """
+
+    def __init__(self, parts):
+        """
+        Args:
+            parts (list): Lista de (nombre, color, vertices), donde vertices es un array (n, 3)
+                con tres vértices por triángulo.
+        """
+        chunks = []
+        self.ranges = []
+        first = 0
+        for name, color, vertices in parts:
+            vertices = np.asarray(vertices, dtype=np.float32).reshape(-1, 3)
+            if len(vertices) == 0:
+                continue
+            chunks.append(vertices)
+            self.ranges.append((name, color, first, len(vertices)))
+            first += len(vertices)
+        if chunks:
+            self.vertices = np.ascontiguousarray(np.concatenate(chunks))
+        else:
+            self.vertices = np.zeros((0, 3), dtype=np.float32)
+        self.normals = vertex_normals(self.vertices)
+        self.vbo = None
+
+    @classmethod
+    def from_scene(cls, scene):
+        """
+        Construye la malla a partir de una escena cargada con PyWavefront.
+        """
+        scene_vertices = np.asarray(scene.vertices, dtype=np.float32)[:, :3]
+        parts = []
+        for mesh in scene.mesh_list:
+            if not getattr(mesh, "materials", None):
+                faces = np.asarray(mesh.faces, dtype=np.int64).reshape(-1)
+                parts.append((mesh.name, (1.0, 1.0, 1.0), scene_vertices[faces]))
+                continue
+            for material in mesh.materials:
+                parts.append((material.name, _material_color(material), posiciones_material(material)))
+        return cls(parts)
+
+    @property
+    def vertex_count(self):
+        return len(self.vertices)
+
+    def upload(self):
+        """
+        Sube los vértices y, tras ellos, las normales a un VBO. Debe llamarse con el contexto
+        OpenGL ya creado.
+
+        Retorna:
+            bool: True si se usa un VBO, False si se recurre a vertex arrays del cliente.
+        """
+        try:
+            if not bool(glGenBuffers):
+                return False
+            vbo = glGenBuffers(1)
+            glBindBuffer(GL_ARRAY_BUFFER, vbo)
+            glBufferData(GL_ARRAY_BUFFER, self.vertices.nbytes + self.normals.nbytes, None, GL_STATIC_DRAW)
+            glBufferSubData(GL_ARRAY_BUFFER, 0, self.vertices.nbytes, self.vertices)
+            glBufferSubData(GL_ARRAY_BUFFER, self.vertices.nbytes, self.normals.nbytes, self.normals)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+        except (GLError, NullFunctionError) as e:
+            print(f"VBO no disponible, se usarán vertex arrays: {e}")
+            return False
+        self.vbo = vbo
+        return True
+
+    def release(self):
+        """
+        Libera el VBO si se creó.
+        """
+        if self.vbo is not None:
+            glDeleteBuffers(1, [self.vbo])
+            self.vbo = None
+
+    def draw(self, override_color=None, backend=None):
+        """
+        Dibuja el coche. Si se proporciona override_color, se usa ese color en todos los
+        materiales sin modificar los datos subidos.
+        """
+        backend = backend or current_backend()
+        for _, color, first, count in self.ranges:
+            r, g, b = override_color if override_color is not None else color
+            backend.set_color(r, g, b)
+            backend.draw_arrays(TRIANGLES, self.vertices, first, count, buffer=self.vbo, normals=self.normals)
@@ -0,0 +1,72 @@
+import numpy as np
+
+# Aristas de un cubo unitario centrado en el origen, como pares de vértices para GL_LINES
+_CUBE_CORNERS = np.array([
+    [-0.5, -0.5, -0.5],
+    [ 0.5, -0.5, -0.5],
+    [ 0.5,  0.5, -0.5],
+    [-0.5,  0.5, -0.5],
+    [-0.5, -0.5,  0.5],
+    [ 0.5, -0.5,  0.5],
+    [ 0.5,  0.5,  0.5],
+    [-0.5,  0.5,  0.5]
+], dtype=np.float32)
+_CUBE_EDGES = [
+    (0, 1), (1, 2), (2, 3), (3, 0),
+    (4, 5), (5, 6), (6, 7), (7, 4),
+    (0, 4), (1, 5), (2, 6), (3, 7)
+]
+CUBE_LINES = _CUBE_CORNERS[np.array(_CUBE_EDGES).reshape(-1)]
+VERTICES_PER_OBSTACLE = len(CUBE_LINES)
+
+
+class ObstacleMesh:
+    """
+    Geometría de los obstáculos para dibujarlos todos en una sola llamada.
+
+    Guarda, para cada hueco del `ObstacleStore`, las aristas del cubo ya escaladas y
+    trasladadas. Solo se recalculan los huecos marcados como modificados en `store.dirty`
+    (obstáculos nuevos, movidos o reordenados), y para dibujar se copian los huecos visibles,
+    en orden, a un buffer preasignado con la capacidad del almacén.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        capacity = store.capacity
+        self.lines = np.zeros((capacity, VERTICES_PER_OBSTACLE, 3), dtype=np.float32)
+        self.vertices = np.zeros((capacity, VERTICES_PER_OBSTACLE, 3), dtype=np.float32)
+        self.count = 0
+
+    def refresh(self):
+        """
+        Recalcula la geometría de los huecos modificados y limpia sus marcas.
+
+        Retorna:
+            int: Número de huecos recalculados.
+        """
+        store = self.store
+        slots = np.flatnonzero(store.dirty)
+        if len(slots):
+            size = store.size[slots, None, None]
+            self.lines[slots] = CUBE_LINES * size
+            self.lines[slots, :, 0] += store.x[slots, None]
+            self.lines[slots, :, 2] += store.z[slots, None]
+            store.dirty[slots] = False
+        return len(slots)
+
+    def update(self, lo=0, hi=None):
+        """
+        Prepara en `vertices` la geometría de los obstáculos con índice lógico en [lo, hi).
+
+        Retorna:
+            int: Número de vértices a dibujar con GL_LINES.
+        """
+        store = self.store
+        if hi is None:
+            hi = len(store)
+        self.refresh()
+        n = max(hi - lo, 0)
+        if n:
+            np.take(self.lines, store.slots(lo, hi), axis=0, out=self.vertices[:n])
+        self.count = n
+        return n * VERTICES_PER_OBSTACLE
@@ -0,0 +1,239 @@
+import math
+import numpy as np
+from curvas import SineProfile
+from perspectiva import screen_tolerance
+
+# Error máximo por defecto entre los bordes de la malla y la curva real: un píxel visto a la
+# distancia más corta posible de la cámara
+TRACK_TOLERANCE = screen_tolerance(1.0)
+
+# Longitud máxima de un tramo de la malla adaptativa, para que el recorte por ventana visible
+# no envíe tramos largos fuera de pantalla
+MAX_STEP = 20.0
+
+# Posiciones relativas dentro de un tramo donde se busca la curvatura máxima
+_PROBES = np.linspace(0.0, 1.0, 5)
+
+
+class TrackMesh:
+    """
+    Malla persistente de la pista.
+
+    Guarda la línea central, la longitud de arco acumulada, los vectores normales y los
+    vértices de los bordes ya calculados. Cuando la pista crece solo se calcula el tramo
+    nuevo, de modo que el coste por frame no depende de la distancia recorrida. Las normales
+    se obtienen de la derivada analítica del perfil de curva (ver `curvas.CurveProfile`).
+
+    Con `tolerance` los puntos se colocan según la curvatura: cada tramo es tan largo como
+    permite que la cuerda de los bordes no se separe de la curva más de `tolerance` metros
+    (la flecha de un arco de curvatura k y cuerda L es k·L²/8), entre `resolution` y
+    `max_step`. Las rectas quedan con pocos puntos y las curvas cerradas con muchos. La
+    longitud de arco se integra sobre la curva real y no sobre la poligonal, así que la
+    coordenada v de la textura en un punto no depende de dónde caigan las muestras.
+    """
+
+    def __init__(self, track_width=10, resolution=1, tex_scale=10, profile=None, initial_capacity=1024,
+                 tolerance=TRACK_TOLERANCE, max_step=MAX_STEP):
+        """
+        Args:
+            track_width (float): Ancho total de la pista.
+            resolution (float): Distancia entre puntos sin `tolerance`; con ella, la mínima.
+            tex_scale (float): Metros de longitud de arco por repetición de la textura.
+            profile (CurveProfile): Perfil de la línea central (por defecto, SineProfile).
+            initial_capacity (int): Puntos reservados al empezar.
+            tolerance (float): Error máximo en metros de los bordes respecto a la curva, o
+                None para muestrear cada `resolution` metros.
+            max_step (float): Distancia máxima entre puntos con `tolerance`.
+        """
+        self.profile = profile if profile is not None else SineProfile()
+        self.track_width = track_width
+        self.resolution = resolution
+        self.tex_scale = tex_scale
+        self.tolerance = tolerance
+        self.max_step = max_step
+        self._initial_capacity = initial_capacity
+        self.reset()
+
+    def reset(self):
+        """
+        Descarta toda la geometría calculada (se usa al reiniciar el juego).
+        """
+        self.count = 0
+        self._allocate(self._initial_capacity)
+
+    def configure(self, track_width, resolution, tex_scale, tolerance=TRACK_TOLERANCE):
+        """
+        Ajusta los parámetros de la malla. Si alguno cambia, la malla se reconstruye.
+        """
+        params = (track_width, resolution, tex_scale, tolerance)
+        if params != (self.track_width, self.resolution, self.tex_scale, self.tolerance):
+            self.track_width, self.resolution, self.tex_scale, self.tolerance = params
+            self.reset()
+
+    def _allocate(self, capacity):
+        """
+        Reserva (o amplía) los arrays de la malla conservando los datos ya calculados.
+        """
+        n = self.count
+        z_points = np.zeros(capacity, dtype=np.float64)
+        x_offsets = np.zeros(capacity, dtype=np.float64)
+        arc_lengths = np.zeros(capacity, dtype=np.float64)
+        normals = np.zeros((capacity, 2), dtype=np.float64)
+        # Dos vértices (izquierdo y derecho) por punto, en el orden que espera GL_QUAD_STRIP
+        vertices = np.zeros((2 * capacity, 3), dtype=np.float32)
+        tex_coords = np.zeros((2 * capacity, 2), dtype=np.float32)
+        if n:
+            z_points[:n] = self.z_points[:n]
+            x_offsets[:n] = self.x_offsets[:n]
+            arc_lengths[:n] = self.arc_lengths[:n]
+            normals[:n] = self.normals[:n]
+            vertices[:2 * n] = self.vertices[:2 * n]
+            tex_coords[:2 * n] = self.tex_coords[:2 * n]
+        self.z_points = z_points
+        self.x_offsets = x_offsets
+        self.arc_lengths = arc_lengths
+        self.normals = normals
+        self.vertices = vertices
+        self.tex_coords = tex_coords
+        self.capacity = capacity
+
+    def update(self, total_length):
+        """
+        Extiende la malla hasta cubrir `total_length` metros calculando solo los puntos nuevos.
+
+        Args:
+            total_length (float): Longitud de pista que debe quedar cubierta.
+
+        Retorna:
+            int: Número de puntos de la malla.
+        """
+        old_n = self.count
+        if self.tolerance is None:
+            res = self.resolution
+            # Mismo número de puntos que np.arange(0, total_length + res, res)
+            needed = int(math.ceil((total_length + res) / res))
+            if needed <= old_n:
+                return old_n
+            new_z = np.arange(old_n, needed) * res
+        else:
+            if old_n and self.z_points[old_n - 1] >= total_length:
+                return old_n
+            new_z = self._adaptive_points(total_length)
+            needed = old_n + len(new_z)
+        if needed > self.capacity:
+            self._allocate(max(2 * self.capacity, needed))
+
+        # Puntos nuevos de la línea central
+        new_x, new_slopes, _ = self.profile.evaluate(new_z)
+        self.z_points[old_n:needed] = new_z
+        self.x_offsets[old_n:needed] = new_x
+
+        # Longitud de arco acumulada del tramo nuevo
+        if old_n == 0:
+            self.arc_lengths[0] = 0.0
+            start = 1
+        else:
+            start = old_n
+        z = self.z_points
+        seg = self._arc_length(z[start - 1:needed - 1], z[start:needed])
+        self.arc_lengths[start:needed] = self.arc_lengths[start - 1] + np.cumsum(seg)
+
+        # En nuestro sistema, el centro de la pista es: C = (x, -z) y la tangente T = (x', -1),
+        # por lo que la normal (a la izquierda) es N = (1, -x') / |T|
+        inv_length = 1.0 / np.sqrt(1.0 + new_slopes * new_slopes)
+        self.normals[old_n:needed, 0] = inv_length
+        self.normals[old_n:needed, 1] = -new_slopes * inv_length
+
+        self._compute_vertices(old_n, needed)
+        self.count = needed
+        return needed
+
+    def _adaptive_points(self, total_length):
+        """
+        Valores z de los puntos nuevos, con la distancia entre ellos según la curvatura, hasta
+        pasar de `total_length`. La secuencia solo depende del último punto, no de cuánto se
+        pida en cada llamada.
+        """
+        if self.count == 0:
+            z = 0.0
+            points = [z]
+        else:
+            z = float(self.z_points[self.count - 1])
+            points = []
+        while z < total_length:
+            z += self._step(z)
+            points.append(z)
+        return np.array(points)
+
+    def _step(self, z):
+        """
+        Longitud del tramo que empieza en `z` para que sus bordes cumplan la tolerancia.
+        """
+        half_width = self.track_width / 2
+        step = self.max_step
+        for _ in range(4):
+            curvature = float(np.max(np.abs(self.profile.curvature(z + step * _PROBES))))
+            # El borde interior de una curva tiene radio r - w/2, así que se curva más
+            curvature /= max(1.0 - curvature * half_width, 1e-6)
+            if curvature == 0.0:
+                break
+            limit = math.sqrt(8.0 * self.tolerance / curvature)
+            if limit >= step:
+                break
+            step = max(limit, self.resolution)
+            if step == self.resolution:
+                break
+        return step
+
+    def _arc_length(self, z0, z1):
+        """
+        Longitud de la línea central entre cada z0 y z1, integrando sqrt(1 + x'²) con la
+        regla de Simpson.
+        """
+        def speed(z):
+            slope = self.profile.derivative(z)
+            return np.sqrt(1.0 + slope * slope)
+
+        return (z1 - z0) / 6.0 * (speed(z0) + 4.0 * speed((z0 + z1) * 0.5) + speed(z1))
+
+    def index_range(self, z_min, z_max):
+        """
+        Puntos de la malla que cubren la ventana del mundo [z_min, z_max].
+
+        Incluye el punto anterior y el posterior a la ventana para que los cuadriláteros de
+        los extremos queden completos.
+
+        Retorna:
+            tuple: Índices de punto [inicio, fin), listos para glDrawArrays(2 * inicio, ...).
+        """
+        # La pista avanza hacia -z: la distancia a lo largo del eje es -z
+        z_points = self.z_points[:self.count]
+        lo = int(np.searchsorted(z_points, -z_max, side="right")) - 1
+        hi = int(np.searchsorted(z_points, -z_min, side="left")) + 1
+        return max(lo, 0), min(hi, self.count)
+
+    def _compute_vertices(self, lo, hi):
+        """
+        Calcula los vértices de los bordes y las coordenadas de textura de los puntos [lo, hi).
+        """
+        half_width = self.track_width / 2
+        center_x = self.x_offsets[lo:hi]
+        center_z = -self.z_points[lo:hi]
+        nx = self.normals[lo:hi, 0]
+        ny = self.normals[lo:hi, 1]
+
+        left = self.vertices[2 * lo:2 * hi:2]
+        right = self.vertices[2 * lo + 1:2 * hi:2]
+        left[:, 0] = center_x - half_width * nx
+        left[:, 1] = -0.5
+        left[:, 2] = center_z - half_width * ny
+        right[:, 0] = center_x + half_width * nx
+        right[:, 1] = -0.5
+        right[:, 2] = center_z + half_width * ny
+
+        # u=0 para el borde izquierdo, u=1 para el derecho; v se basa en la longitud de arco
+        v_coords = self.arc_lengths[lo:hi] / self.tex_scale
+        self.tex_coords[2 * lo:2 * hi:2, 0] = 0.0
+        self.tex_coords[2 * lo + 1:2 * hi:2, 0] = 1.0
+        self.tex_coords[2 * lo:2 * hi:2, 1] = v_coords
+        self.tex_coords[2 * lo + 1:2 * hi:2, 1] = v_coords
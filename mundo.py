@@ -0,0 +1,220 @@
+"""
+Generación del mundo por tramos a partir de una semilla.
+
+La pista se divide en tramos de longitud fija. Cada tramo (muestras de la línea central y
+obstáculos) se construye solo a partir de la semilla del mundo y de su índice, así que una
+semilla produce siempre el mismo recorrido sin importar la duración de los frames ni cuándo
+se genere cada tramo. Los tramos se construyen por adelantado en un hilo de trabajo; en cada
+tick el hilo principal solo pasa al almacén los obstáculos que entran en el horizonte por
+delante del coche y descarta los tramos que quedaron detrás de la cámara, con un coste
+acotado que no depende de la distancia recorrida.
+
+Uso:
+    world = WorldStream(seed)
+    world.advance(logic.obstacles, distance, horizon)  # en cada tick
+"""
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+import numpy as np
+from indice_pista import TrackIndex
+from obstaculos import TYPE_NAMES
+
+# Longitud de cada tramo y distancia por delante del coche a la que sus obstáculos entran en
+# el almacén (mayor que lo que alcanza a verse, para que no aparezcan de golpe)
+CHUNK_LENGTH = 50.0
+WORLD_LOOKAHEAD = 300.0
+# Distancia entre muestras de la línea central de cada tramo
+CENTERLINE_STEP = 1.0
+
+# Reparto de obstáculos: sin obstáculos en la salida, separación mínima entre dos seguidos y
+# separación media que baja de la inicial a la final a lo largo de DENSITY_RAMP metros
+START_CLEARANCE = 30.0
+MIN_GAP = 3.0
+MEAN_GAP_START = 14.0
+MEAN_GAP_END = 8.0
+DENSITY_RAMP = 500.0
+LATERAL_SPREAD = 2.0
+TYPE_SIZES = {"pequeño": 0.5, "grande": 1.0, "movil": 0.7}
+MOVING_DIRECTIONS = (-0.02, 0.02)
+
+
+class WorldChunk:
+    """
+    Tramo del mundo entre las distancias `start` y `end` a lo largo de la pista.
+
+    Attributes:
+        centerline_z (np.ndarray): Distancias de las muestras de la línea central.
+        centerline_x (np.ndarray): Desplazamiento lateral de la línea central en cada muestra.
+        obstacles (list): Obstáculos ({"x", "z", "size", "type", "direction"}) ordenados de
+            más cercano a más lejano; z es la coordenada del mundo (-distancia).
+    """
+
+    __slots__ = ("index", "start", "end", "centerline_z", "centerline_x", "obstacles")
+
+    def __init__(self, index, start, end, centerline_z, centerline_x, obstacles):
+        self.index = index
+        self.start = start
+        self.end = end
+        self.centerline_z = centerline_z
+        self.centerline_x = centerline_x
+        self.obstacles = obstacles
+
+
+def build_chunk(seed, index, chunk_length=CHUNK_LENGTH, track=None):
+    """
+    Construye el tramo `index` del mundo de semilla `seed`. Solo lee el índice de la pista,
+    así que puede ejecutarse en cualquier hilo y en cualquier orden si el índice ya cubre el
+    tramo (ver TrackIndex.ensure).
+
+    Args:
+        track (TrackIndex): Índice de la pista (por defecto, uno nuevo del perfil senoidal).
+
+    Retorna:
+        WorldChunk
+    """
+    track = track if track is not None else TrackIndex()
+    rng = np.random.default_rng([seed, index])
+    start = index * chunk_length
+    end = start + chunk_length
+    centerline_z = np.arange(start, end + CENTERLINE_STEP, CENTERLINE_STEP)
+    centerline_x = track.offsets(centerline_z)
+
+    # Distancias de los obstáculos: huecos de MIN_GAP más una parte exponencial. Se deja medio
+    # hueco mínimo en cada extremo para que la separación se cumpla también entre tramos
+    distances = []
+    distance = start + MIN_GAP / 2
+    while True:
+        ramp = min(distance / DENSITY_RAMP, 1.0)
+        mean_gap = MEAN_GAP_START + (MEAN_GAP_END - MEAN_GAP_START) * ramp
+        distance += rng.exponential(mean_gap - MIN_GAP)
+        if distance > end - MIN_GAP / 2:
+            break
+        if distance >= START_CLEARANCE:
+            distances.append(distance)
+        distance += MIN_GAP
+
+    n = len(distances)
+    distances = np.array(distances)
+    types = rng.integers(0, len(TYPE_NAMES), n)
+    lateral = rng.uniform(-LATERAL_SPREAD, LATERAL_SPREAD, n)
+    directions = rng.choice(MOVING_DIRECTIONS, n)
+    # Los obstáculos se colocan sobre la línea central que se dibuja (ver malla_pista)
+    x = track.offsets(distances) + lateral
+    obstacles = []
+    for i in range(n):
+        obstacle_type = TYPE_NAMES[types[i]]
+        obstacles.append({
+            "x": float(x[i]),
+            "z": -float(distances[i]),
+            "size": TYPE_SIZES[obstacle_type],
+            "type": obstacle_type,
+            "direction": float(directions[i]) if obstacle_type == "movil" else 0,
+        })
+    return WorldChunk(index, start, end, centerline_z, centerline_x, obstacles)
+
+
+_executor = None
+
+
+def _worker():
+    """
+    Hilo compartido por todos los mundos para construir tramos en segundo plano.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mundo")
+    return _executor
+
+
+class WorldStream:
+    """
+    Flujo de tramos del mundo por delante del coche.
+
+    Mantiene pedidos al hilo de trabajo los `prefetch` tramos siguientes al último cargado.
+    Un tramo se carga cuando el horizonte llega a él; sus obstáculos pasan al almacén uno a
+    uno según el horizonte avanza. Si el hilo aún no terminó el tramo que se necesita, se
+    espera a que termine: el momento en que un obstáculo entra en el almacén depende solo del
+    estado de la partida.
+    """
+
+    def __init__(self, seed, chunk_length=CHUNK_LENGTH, lookahead=WORLD_LOOKAHEAD, prefetch=2,
+                 track=None, background=True):
+        """
+        Args:
+            seed (int): Semilla del mundo.
+            chunk_length (float): Longitud de cada tramo en metros.
+            lookahead (float): Distancia por delante del coche hasta la que se cargan obstáculos.
+            prefetch (int): Tramos pedidos por adelantado.
+            track (TrackIndex): Índice de la pista (por defecto, uno nuevo del perfil senoidal).
+            background (bool): Construir los tramos en el hilo de trabajo; si es False se
+                construyen en el hilo principal al pedirlos.
+        """
+        self.chunk_length = chunk_length
+        self.lookahead = lookahead
+        self.prefetch = prefetch
+        self.track = track if track is not None else TrackIndex()
+        self.background = background
+        self.reset(seed)
+
+    def reset(self, seed):
+        """
+        Empieza un mundo nuevo con otra semilla.
+        """
+        self.seed = seed
+        self.chunks = deque()  # Tramos cargados que aún no quedaron detrás de la cámara
+        self._requested = deque()
+        self._next_request = 0
+        self._pending = deque()  # Obstáculos de tramos cargados que no han entrado aún
+        self.loaded_until = 0.0
+        for _ in range(self.prefetch):
+            self._request()
+
+    def _request(self):
+        index = self._next_request
+        self._next_request += 1
+        # El índice solo crece en este hilo; el de trabajo lee lo que ya cubre
+        self.track.ensure((index + 1) * self.chunk_length + CENTERLINE_STEP)
+        if self.background:
+            future = _worker().submit(build_chunk, self.seed, index, self.chunk_length, self.track)
+        else:
+            future = Future()
+            future.set_result(build_chunk(self.seed, index, self.chunk_length, self.track))
+        self._requested.append(future)
+
+    def advance(self, store, distance, frontier=None, camera_distance=None):
+        """
+        Carga los tramos y obstáculos que entran en el horizonte y descarta los tramos que
+        quedaron detrás de la cámara.
+
+        Args:
+            store (ObstacleStore): Almacén donde se añaden los obstáculos.
+            distance (float): Distancia recorrida por el coche.
+            frontier (float): Longitud de pista generada; el horizonte no la supera.
+            camera_distance (float): Distancia de la cámara; los tramos que terminan antes se
+                descartan (por defecto, la del coche).
+
+        Retorna:
+            int: Obstáculos añadidos al almacén.
+        """
+        horizon = distance + self.lookahead
+        if frontier is not None:
+            horizon = min(horizon, frontier)
+        while self.loaded_until < horizon:
+            chunk = self._requested.popleft().result()
+            self._request()
+            self.chunks.append(chunk)
+            self._pending.extend(chunk.obstacles)
+            self.loaded_until = chunk.end
+
+        added = 0
+        pending = self._pending
+        while pending and -pending[0]["z"] < horizon:
+            store.append(pending.popleft())
+            added += 1
+
+        if camera_distance is None:
+            camera_distance = distance
+        chunks = self.chunks
+        while chunks and chunks[0].end < camera_distance:
+            chunks.popleft()
+        return added
@@ -0,0 +1,298 @@
+import bisect
+import numpy as np
+
+# Tipos de obstáculo y su código numérico dentro del almacén
+TYPE_NAMES = ("pequeño", "grande", "movil")
+TYPE_CODES = {name: code for code, name in enumerate(TYPE_NAMES)}
+
+_FIELDS = ("x", "z", "size", "type", "direction")
+
+
+class ObstacleView:
+    """
+    Vista de un obstáculo del almacén que se comporta como el diccionario usado antes
+    ({"x", "z", "size", "type", "direction"}). Leer o asignar una clave lee o escribe
+    directamente en los arrays del almacén, por lo que `obs["z"] += 2` sigue funcionando.
+    """
+
+    __slots__ = ("_store", "slot")
+
+    def __init__(self, store, slot):
+        self._store = store
+        self.slot = slot
+
+    def __getitem__(self, key):
+        store = self._store
+        if key == "type":
+            return TYPE_NAMES[store.type_code[self.slot]]
+        if key == "size":
+            return float(store.size[self.slot])
+        if key == "direction":
+            return float(store.direction[self.slot])
+        if key == "x":
+            return float(store.x[self.slot])
+        if key == "z":
+            return float(store.z[self.slot])
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        store = self._store
+        if key == "type":
+            store.type_code[self.slot] = TYPE_CODES[value]
+        elif key == "z":
+            # Cambiar z puede mover el obstáculo dentro del orden; la vista lo sigue
+            self.slot = store.set_z(self.slot, value)
+        elif key in ("x", "size", "direction"):
+            getattr(store, key)[self.slot] = value
+            if key == "size":
+                store.max_size = max(store.max_size, float(value))
+        else:
+            raise KeyError(key)
+        store.mark_dirty(self.slot)
+
+    def __contains__(self, key):
+        return key in _FIELDS
+
+    def get(self, key, default=None):
+        return self[key] if key in _FIELDS else default
+
+    def keys(self):
+        return _FIELDS
+
+    def to_dict(self):
+        return {key: self[key] for key in _FIELDS}
+
+
+class ObstacleStore:
+    """
+    Almacén de obstáculos con estructura de arrays (x, z, tamaño, tipo y dirección) sobre un
+    buffer circular de capacidad fija.
+
+    Los obstáculos se mantienen ordenados por z de forma descendente (del más cercano a la
+    cámara al más lejano), que coincide con el orden de aparición porque se generan siempre por
+    delante del coche. Así los que quedan detrás de la cámara están al principio del buffer y se
+    descartan en O(1) cada uno, y las consultas por intervalo de z se resuelven con búsqueda
+    binaria. La memoria y el coste por tick quedan acotados por la capacidad, sin importar la
+    distancia recorrida.
+    """
+
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self.x = np.zeros(capacity, dtype=np.float64)
+        self.z = np.zeros(capacity, dtype=np.float64)
+        self.size = np.zeros(capacity, dtype=np.float64)
+        self.type_code = np.zeros(capacity, dtype=np.int8)
+        self.direction = np.zeros(capacity, dtype=np.float64)
+        # Marca los huecos cuyo contenido ha cambiado (útil para cachés de geometría)
+        self.dirty = np.zeros(capacity, dtype=bool)
+        self._head = 0
+        self._count = 0
+        self.dropped = 0  # Obstáculos descartados por falta de capacidad
+        self.max_size = 0.0  # Mayor tamaño guardado, para ensanchar las consultas por z
+        self._neg_z = _NegatedZ(self)
+
+    def __len__(self):
+        return self._count
+
+    def _slot(self, index):
+        """
+        Convierte un índice lógico (admite negativos) en un hueco del buffer.
+        """
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("índice de obstáculo fuera de rango")
+        return (self._head + index) % self.capacity
+
+    def __getitem__(self, index):
+        return ObstacleView(self, self._slot(index))
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield ObstacleView(self, (self._head + i) % self.capacity)
+
+    def view(self, slot):
+        """
+        Vista compatible con diccionario del obstáculo guardado en el hueco `slot`.
+        """
+        return ObstacleView(self, slot)
+
+    def segments(self):
+        """
+        Rangos de huecos ocupados en orden lógico (uno, o dos si el buffer da la vuelta).
+        """
+        end = self._head + self._count
+        if end <= self.capacity:
+            return (slice(self._head, end),)
+        return (slice(self._head, self.capacity), slice(0, end - self.capacity))
+
+    def slots(self, lo=0, hi=None):
+        """
+        Array con los huecos de los índices lógicos [lo, hi) (por defecto, todos los ocupados).
+        """
+        if hi is None:
+            hi = self._count
+        return (self._head + np.arange(lo, hi)) % self.capacity
+
+    def mark_dirty(self, slot):
+        self.dirty[slot] = True
+
+    def append(self, obstacle):
+        """
+        Añade un obstáculo ({"x", "z", "size", "type", "direction"}). Si el buffer está lleno
+        se descarta el más antiguo.
+        """
+        if self._count == self.capacity:
+            self._head = (self._head + 1) % self.capacity
+            self._count -= 1
+            self.dropped += 1
+        slot = (self._head + self._count) % self.capacity
+        self.x[slot] = obstacle["x"]
+        self.z[slot] = obstacle["z"]
+        self.size[slot] = obstacle["size"]
+        self.type_code[slot] = TYPE_CODES[obstacle["type"]]
+        self.direction[slot] = obstacle.get("direction", 0)
+        self.dirty[slot] = True
+        self.max_size = max(self.max_size, float(obstacle["size"]))
+        self._count += 1
+        return self._restore_order(self._count - 1)
+
+    def clear(self):
+        self._head = 0
+        self._count = 0
+        self.max_size = 0.0
+
+    def _swap(self, a, b):
+        for field in (self.x, self.z, self.size, self.type_code, self.direction):
+            field[a], field[b] = field[b], field[a]
+        self.dirty[a] = self.dirty[b] = True
+
+    def _restore_order(self, index):
+        """
+        Desplaza el obstáculo del índice lógico `index` hasta su posición en el orden por z.
+
+        Retorna:
+            int: Hueco donde queda el obstáculo.
+        """
+        cap = self.capacity
+        slot = (self._head + index) % cap
+        while index > 0:
+            prev = (self._head + index - 1) % cap
+            if self.z[prev] >= self.z[slot]:
+                break
+            self._swap(prev, slot)
+            index -= 1
+            slot = prev
+        while index < self._count - 1:
+            nxt = (self._head + index + 1) % cap
+            if self.z[nxt] <= self.z[slot]:
+                break
+            self._swap(nxt, slot)
+            index += 1
+            slot = nxt
+        return slot
+
+    def set_z(self, slot, z):
+        """
+        Cambia la z de un obstáculo manteniendo el orden del almacén.
+
+        Retorna:
+            int: Nuevo hueco del obstáculo.
+        """
+        self.z[slot] = z
+        self.dirty[slot] = True
+        return self._restore_order((slot - self._head) % self.capacity)
+
+    def range_between(self, z_min, z_max):
+        """
+        Búsqueda binaria del intervalo de obstáculos con z_min <= z <= z_max.
+
+        Retorna:
+            tuple: Índices lógicos [inicio, fin).
+        """
+        # El orden es descendente en z, es decir, ascendente en -z
+        lo = bisect.bisect_left(self._neg_z, -z_max)
+        hi = bisect.bisect_right(self._neg_z, -z_min, lo)
+        return lo, hi
+
+    def evict_behind(self, z_limit):
+        """
+        Descarta los obstáculos que han quedado completamente detrás de `z_limit`
+        (normalmente la posición z de la cámara).
+
+        Retorna:
+            int: Número de obstáculos descartados.
+        """
+        evicted = 0
+        while self._count and self.z[self._head] - self.size[self._head] > z_limit:
+            self._head = (self._head + 1) % self.capacity
+            self._count -= 1
+            evicted += 1
+        if not self._count:
+            self._head = 0
+        return evicted
+
+    def sweep(self, x0, z0, x1, z1):
+        """
+        Colisión continua del segmento recorrido por el coche, de (x0, z0) a (x1, z1), contra
+        las cajas de los obstáculos (semiancho `size` en x y en z).
+
+        Solo se examinan los obstáculos cuyo z cae en el intervalo barrido (ampliado con el
+        mayor tamaño), localizados con búsqueda binaria; sobre ellos se aplica el método de
+        los "slabs" de forma vectorizada.
+
+        Retorna:
+            tuple: (hueco, t) del primer obstáculo que toca el segmento, con t en [0, 1] la
+            fracción del recorrido en la que entra; (-1, None) si no hay colisión.
+        """
+        lo, hi = self.range_between(min(z0, z1) - self.max_size, max(z0, z1) + self.max_size)
+        if lo >= hi:
+            return -1, None
+        slots = (self._head + np.arange(lo, hi)) % self.capacity
+        size = self.size[slots]
+        t_enter = np.zeros(len(slots))
+        t_exit = np.ones(len(slots))
+        hit = np.ones(len(slots), dtype=bool)
+        for p0, p1, centers in ((x0, x1, self.x[slots]), (z0, z1, self.z[slots])):
+            d = p1 - p0
+            if d == 0:
+                hit &= np.abs(p0 - centers) < size
+            else:
+                t_a = (centers - size - p0) / d
+                t_b = (centers + size - p0) / d
+                np.maximum(t_enter, np.minimum(t_a, t_b), out=t_enter)
+                np.minimum(t_exit, np.maximum(t_a, t_b), out=t_exit)
+        # Las cajas son abiertas (|d| < size), igual que la prueba puntual
+        hit &= t_enter < t_exit
+        found = np.flatnonzero(hit)
+        if not found.size:
+            return -1, None
+        first = found[np.argmin(t_enter[found])]
+        return int(slots[first]), float(t_enter[first])
+
+    def first_hit(self, x, z):
+        """
+        Prueba AABB del punto (x, z) contra los obstáculos cercanos en z.
+
+        Retorna:
+            int: Hueco del primer obstáculo (en orden lógico) que contiene el punto, o -1.
+        """
+        return self.sweep(x, z, x, z)[0]
+
+
+class _NegatedZ:
+    """
+    Secuencia de -z en orden lógico, para usar `bisect` sobre el almacén sin copiar arrays.
+    """
+
+    __slots__ = ("_store",)
+
+    def __init__(self, store):
+        self._store = store
+
+    def __len__(self):
+        return len(self._store)
+
+    def __getitem__(self, index):
+        store = self._store
+        return -store.z[(store._head + index) % store.capacity]
@@ -0,0 +1,240 @@
+"""
+Perfilador por fases de cada frame.
+
+Mide con ámbitos con nombre (`with profiler.scope("draw_track"): ...`) cuánto tarda cada fase
+del frame y guarda los últimos frames en buffers circulares de tamaño fijo. Desactivado, cada
+ámbito es un contexto nulo compartido, así que puede quedarse en el código del juego.
+
+Uso:
+    profiler = FrameProfiler(enabled=True)
+    profiler.begin_frame()
+    with profiler.scope("update"):
+        ...
+    profiler.end_frame()
+    profiler.stats()  # p50/p95/p99 por fase
+    profiler.export_csv("perfil.csv")
+    profiler.export_chrome_trace("perfil.json")  # abrir en chrome://tracing o Perfetto
+"""
+import csv
+import json
+import time
+from contextlib import nullcontext
+import numpy as np
+
+_NULL_SCOPE = nullcontext()
+
+
+class _Scope:
+    """
+    Ámbito reutilizable de una fase; se crea una vez por nombre.
+    """
+
+    __slots__ = ("_profiler", "_index", "_start")
+
+    def __init__(self, profiler, index):
+        self._profiler = profiler
+        self._index = index
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = self._profiler.clock()
+        return self
+
+    def __exit__(self, *exc):
+        profiler = self._profiler
+        profiler._record(self._index, self._start, profiler.clock())
+        return False
+
+
+class FrameProfiler:
+    """
+    Tiempos por fase de los últimos `history` frames.
+
+    Por cada frame se guarda su duración total y el tiempo acumulado de cada fase (una fase
+    puede ejecutarse varias veces por frame, como los ticks de la simulación). Además, cada
+    ejecución de un ámbito se guarda como evento individual para exportarlo como traza.
+    """
+
+    def __init__(self, history=240, max_phases=32, max_events=8192, enabled=False, clock=time.perf_counter):
+        """
+        Args:
+            history (int): Número de frames recientes que se conservan.
+            max_phases (int): Número máximo de fases distintas.
+            max_events (int): Número de ámbitos individuales recientes que se conservan.
+            enabled (bool): Si se empieza midiendo.
+            clock (callable): Reloj en segundos.
+        """
+        self.history = history
+        self.max_phases = max_phases
+        self.clock = clock
+        self.enabled = enabled
+        self._active = False
+
+        self.phases = []
+        self._scopes = {}
+        self.frame = 0  # Número de frames medidos
+        self._row = 0
+        self.frame_start = np.zeros(history)
+        self.frame_time = np.zeros(history)
+        self.durations = np.zeros((history, max_phases))
+
+        self.max_events = max_events
+        self._event_count = 0
+        self.event_phase = np.zeros(max_events, dtype=np.int16)
+        self.event_start = np.zeros(max_events)
+        self.event_duration = np.zeros(max_events)
+        self._stats_rows = []
+        self._stats_time = None
+
+    def toggle(self):
+        """
+        Activa o desactiva la medición; el cambio se aplica al empezar el siguiente frame.
+        """
+        self.enabled = not self.enabled
+        return self.enabled
+
+    def reset(self):
+        """
+        Descarta todos los frames y eventos guardados.
+        """
+        self.frame = 0
+        self._event_count = 0
+        self.durations[:] = 0.0
+        self.frame_time[:] = 0.0
+
+    def begin_frame(self):
+        self._active = self.enabled
+        if not self._active:
+            return
+        self._row = self.frame % self.history
+        self.durations[self._row] = 0.0
+        self.frame_start[self._row] = self.clock()
+
+    def end_frame(self):
+        if not self._active:
+            return
+        self.frame_time[self._row] = self.clock() - self.frame_start[self._row]
+        self.frame += 1
+        self._active = False
+
+    def scope(self, name):
+        """
+        Contexto que mide la fase `name` dentro del frame actual.
+        """
+        if not self._active:
+            return _NULL_SCOPE
+        scope = self._scopes.get(name)
+        if scope is None:
+            if len(self.phases) == self.max_phases:
+                raise ValueError(f"Demasiadas fases en el perfilador (máximo {self.max_phases})")
+            scope = self._scopes[name] = _Scope(self, len(self.phases))
+            self.phases.append(name)
+        return scope
+
+    def _record(self, index, start, end):
+        duration = end - start
+        self.durations[self._row, index] += duration
+        e = self._event_count % self.max_events
+        self.event_phase[e] = index
+        self.event_start[e] = start
+        self.event_duration[e] = duration
+        self._event_count += 1
+
+    def _recent_rows(self):
+        """
+        Filas del buffer de frames en orden cronológico.
+        """
+        n = min(self.frame, self.history)
+        return (self.frame - n + np.arange(n)) % self.history
+
+    def _recent_events(self):
+        n = min(self._event_count, self.max_events)
+        return (self._event_count - n + np.arange(n)) % self.max_events
+
+    def frame_times(self):
+        """
+        Duraciones en segundos de los frames guardados, en orden cronológico.
+        """
+        return self.frame_time[self._recent_rows()]
+
+    def stats(self, percentiles=(50, 95, 99)):
+        """
+        Percentiles de la duración del frame y de cada fase sobre los frames guardados.
+
+        Retorna:
+            dict: {"frame": {"p50": s, ...}, fase: {...}, ...} en segundos, en orden de
+            aparición de las fases. Vacío si aún no hay frames.
+        """
+        rows = self._recent_rows()
+        if not len(rows):
+            return {}
+        names = ["frame"] + self.phases
+        data = np.column_stack([self.frame_time[rows], self.durations[rows, :len(self.phases)]])
+        values = np.percentile(data, percentiles, axis=0)
+        means = data.mean(axis=0)
+        result = {}
+        for column, name in enumerate(names):
+            entry = {f"p{p}": float(values[i, column]) for i, p in enumerate(percentiles)}
+            entry["mean"] = float(means[column])
+            result[name] = entry
+        return result
+
+    def export_csv(self, path):
+        """
+        Escribe un CSV con una fila por frame guardado y una columna por fase, en milisegundos.
+        """
+        rows = self._recent_rows()
+        first_frame = self.frame - len(rows)
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame", "frame_ms"] + [f"{name}_ms" for name in self.phases])
+            for i, row in enumerate(rows):
+                durations = self.durations[row, :len(self.phases)] * 1000
+                writer.writerow([first_frame + i, f"{self.frame_time[row] * 1000:.4f}"]
+                                + [f"{d:.4f}" for d in durations])
+
+    def export_chrome_trace(self, path):
+        """
+        Escribe los frames y ámbitos guardados en formato Trace Event de Chrome (JSON), que
+        puede abrirse en chrome://tracing o en Perfetto.
+        """
+        rows = self._recent_rows()
+        events = self._recent_events()
+        starts = np.concatenate([self.frame_start[rows], self.event_start[events]])
+        origin = starts.min() if len(starts) else 0.0
+        trace = []
+        for row in rows:
+            trace.append({
+                "name": "frame", "ph": "X", "pid": 0, "tid": 0,
+                "ts": (self.frame_start[row] - origin) * 1e6,
+                "dur": self.frame_time[row] * 1e6,
+            })
+        for e in events:
+            trace.append({
+                "name": self.phases[self.event_phase[e]], "ph": "X", "pid": 0, "tid": 0,
+                "ts": (self.event_start[e] - origin) * 1e6,
+                "dur": self.event_duration[e] * 1e6,
+            })
+        with open(path, "w") as f:
+            json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, f)
+
+    def stats_rows(self, max_age=0.0):
+        """
+        Tabla de texto con p50/p95/p99 por fase en milisegundos (para la superposición).
+
+        Args:
+            max_age (float): Segundos durante los que se reutiliza la última tabla calculada,
+                para no recalcular percentiles ni cambiar el texto en cada frame.
+
+        Retorna:
+            list: Filas [fase, p50, p95, p99] como cadenas, empezando por la cabecera.
+        """
+        now = self.clock()
+        if self._stats_time is not None and now - self._stats_time < max_age:
+            return self._stats_rows
+        self._stats_time = now
+        rows = [["fase", "p50", "p95", "p99 ms"]]
+        for name, entry in self.stats().items():
+            rows.append([name] + [f"{entry[key] * 1000:.2f}" for key in ("p50", "p95", "p99")])
+        self._stats_rows = rows
+        return rows
@@ -1,6 +1,24 @@
+import math
+import struct
 import numpy as np
 
-def configure_perspective(width, height, fov=45, near=0.1, far=100.0):
+# Posición de la cámara de seguimiento respecto al coche
+CAMERA_HEIGHT = 1.5
+CAMERA_OFFSET_Z = 5.0
+
+# Campo de visión vertical, planos de recorte de la proyección y distancia de dibujo por defecto
+FOV = 45
+NEAR_PLANE = 0.1
+FAR_PLANE = 100.0
+DRAW_DISTANCE = FAR_PLANE
+
+# Constante de tiempo (s) con la que la cámara sigue lateralmente al coche; 0 la fija a él
+CAMERA_SMOOTHING = 0.08
+
+# Empaqueta 16 floats en un buffer float32 sin crear arrays intermedios
+_MATRIX = struct.Struct("16f")
+
+def configure_perspective(width, height, fov=FOV, near=NEAR_PLANE, far=FAR_PLANE):
     """
     Crea una matriz de proyección perspectiva utilizando numpy.
 
@@ -60,3 +78,167 @@ def update_camera_view(camera_position, target_position, up_vector=(0.0, 1.0, 0.
     view_matrix[1, 3] = -np.dot(up_corrected, eye)
     view_matrix[2, 3] = np.dot(forward, eye)
     return view_matrix
+
+def screen_tolerance(pixels, viewport_height=700, fov=FOV, distance=CAMERA_HEIGHT):
+    """
+    Error geométrico en metros que se ve como `pixels` píxeles a `distance` de la cámara.
+
+    Por defecto se usa la altura de la cámara como distancia: ningún punto de la pista queda
+    más cerca, así que es una cota conservadora para toda la escena.
+
+    Args:
+        pixels (float): Error admitido en pantalla.
+        viewport_height (int): Altura del viewport en píxeles.
+        fov (float): Campo de visión vertical en grados.
+        distance (float): Distancia de la cámara a la que se mide el error.
+
+    Retorna:
+        float: Error admitido en metros.
+    """
+    return pixels * distance * 2.0 * math.tan(math.radians(fov) / 2.0) / viewport_height
+
+def visible_z_range(car_z, draw_distance=DRAW_DISTANCE, fov=FOV, near=NEAR_PLANE, far=FAR_PLANE):
+    """
+    Intervalo de z del mundo que puede verse desde la cámara de seguimiento.
+
+    La cámara está CAMERA_OFFSET_Z por detrás del coche, a CAMERA_HEIGHT de altura, y mira al
+    coche, es decir, hacia -z inclinada hacia abajo. Nada con z mayor que la cámara es visible.
+    Por delante, el plano lejano (o la distancia de dibujo, si es menor) se mide a lo largo de
+    la dirección de la vista, así que su borde superior llega algo más lejos en z.
+
+    Args:
+        car_z (float): Posición z del coche.
+        draw_distance (float): Profundidad máxima de dibujo desde la cámara.
+        fov (float): Campo de visión vertical en grados.
+        near (float): Plano cercano de la proyección.
+        far (float): Plano lejano de la proyección.
+
+    Retorna:
+        tuple: (z_min, z_max) de la ventana visible.
+    """
+    camera_z = car_z + CAMERA_OFFSET_Z
+    depth = max(near, min(draw_distance, far))
+    pitch = np.arctan2(CAMERA_HEIGHT, CAMERA_OFFSET_Z)
+    reach = depth * (np.cos(pitch) + np.tan(np.radians(fov) / 2.0) * np.sin(pitch))
+    return camera_z - float(reach), camera_z
+
+
+class Camera:
+    """
+    Cámara de seguimiento con las matrices de vista y proyección en buffers preasignados.
+
+    Las matrices se guardan como arrays float32 de 16 elementos en orden de columna mayor,
+    listos para glLoadMatrixf sin transponer. La vista se recalcula cada frame con aritmética
+    de floats de Python y se escribe en su buffer con struct (sin crear arrays de NumPy); la
+    proyección solo se recalcula cuando cambia el viewport.
+
+    Uso:
+        camera = Camera(900, 700)
+        glMatrixMode(GL_PROJECTION)
+        glLoadMatrixf(camera.projection)
+        ...
+        camera.follow(car_x, car_z, frame_time)
+        glLoadMatrixf(camera.view)
+    """
+
+    def __init__(self, width, height, fov=FOV, near=NEAR_PLANE, far=FAR_PLANE, smoothing=CAMERA_SMOOTHING):
+        """
+        Args:
+            width (int): Ancho del viewport.
+            height (int): Altura del viewport.
+            fov (float): Campo de visión vertical en grados.
+            near (float): Plano cercano.
+            far (float): Plano lejano.
+            smoothing (float): Constante de tiempo en segundos con la que la posición lateral
+                de la cámara alcanza la del coche; con 0 la cámara va fija tras el coche.
+        """
+        self.fov = fov
+        self.near = near
+        self.far = far
+        self.smoothing = smoothing
+        self.view = np.zeros(16, dtype=np.float32)
+        self.projection = np.zeros(16, dtype=np.float32)
+        self._viewport = None
+        self.eye = None
+        self.target = None
+        self.resize(width, height)
+
+    def resize(self, width, height):
+        """
+        Recalcula la proyección si el viewport cambió.
+
+        Retorna:
+            bool: True si la proyección cambió (y hay que volver a cargarla en OpenGL).
+        """
+        if self._viewport == (width, height):
+            return False
+        self._viewport = (width, height)
+        # La proyección en columna mayor es la traspuesta de configure_perspective
+        f = 1.0 / math.tan(math.radians(self.fov) / 2.0)
+        near, far = self.near, self.far
+        _MATRIX.pack_into(
+            self.projection, 0,
+            f / (width / height), 0.0, 0.0, 0.0,
+            0.0, f, 0.0, 0.0,
+            0.0, 0.0, (far + near) / (near - far), -1.0,
+            0.0, 0.0, (2 * far * near) / (near - far), 0.0,
+        )
+        return True
+
+    def look_at(self, eye, target, up=(0.0, 1.0, 0.0)):
+        """
+        Escribe en `view` la matriz lookAt de `update_camera_view`.
+
+        Args:
+            eye (tuple): Posición de la cámara.
+            target (tuple): Punto al que mira.
+            up (tuple): Vector 'up' de referencia.
+        """
+        ex, ey, ez = eye
+        fx, fy, fz = target[0] - ex, target[1] - ey, target[2] - ez
+        n = math.sqrt(fx * fx + fy * fy + fz * fz)
+        fx, fy, fz = fx / n, fy / n, fz / n
+        ux, uy, uz = up
+        # side = forward x up
+        sx, sy, sz = fy * uz - fz * uy, fz * ux - fx * uz, fx * uy - fy * ux
+        n = math.sqrt(sx * sx + sy * sy + sz * sz)
+        sx, sy, sz = sx / n, sy / n, sz / n
+        # up corregido = side x forward
+        ux, uy, uz = sy * fz - sz * fy, sz * fx - sx * fz, sx * fy - sy * fx
+        _MATRIX.pack_into(
+            self.view, 0,
+            sx, ux, -fx, 0.0,
+            sy, uy, -fy, 0.0,
+            sz, uz, -fz, 0.0,
+            -(sx * ex + sy * ey + sz * ez), -(ux * ex + uy * ey + uz * ez), fx * ex + fy * ey + fz * ez, 1.0,
+        )
+
+    def follow(self, car_x, car_z, dt=0.0):
+        """
+        Coloca la cámara CAMERA_OFFSET_Z por detrás del coche y CAMERA_HEIGHT por encima,
+        mirando al coche, y actualiza `view`.
+
+        La posición lateral se acerca a la del coche con un suavizado exponencial que no
+        depende de la tasa de frames; la altura y la distancia son fijas, de modo que la
+        inclinación de la cámara (y por tanto visible_z_range) no cambia.
+
+        Args:
+            car_x (float): Posición x (interpolada) del coche.
+            car_z (float): Posición z (interpolada) del coche.
+            dt (float): Segundos desde el frame anterior.
+        """
+        if self.eye is None or self.smoothing <= 0.0:
+            eye_x = car_x
+        else:
+            k = 1.0 - math.exp(-dt / self.smoothing)
+            eye_x = self.eye[0] + (car_x - self.eye[0]) * k
+        self.eye = (eye_x, CAMERA_HEIGHT, car_z + CAMERA_OFFSET_Z)
+        self.target = (car_x, 0.0, car_z)
+        self.look_at(self.eye, self.target)
+
+    def reset(self):
+        """
+        Olvida la posición suavizada; el siguiente `follow` coloca la cámara sin retraso.
+        """
+        self.eye = None
+        self.target = None
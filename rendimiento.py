@@ -0,0 +1,686 @@
+"""
+Pruebas de rendimiento de las funciones críticas del juego.
+
+Uso:
+    python rendimiento.py curvas [--puntos N]
+    python rendimiento.py modelo [--ruta Car.obj]
+    python rendimiento.py render [--distancias 100 900]
+    python rendimiento.py camara [--frames N]
+    python rendimiento.py indice [--consultas N]
+    python rendimiento.py pipeline [--frames N] [--distancia D]
+    python rendimiento.py suite [--salida base.json] [--casos caso ...] [--rapida]
+    python rendimiento.py comparar base.json [--actual actual.json] [--umbral 0.1]
+"""
+import argparse
+import contextlib
+import gc
+import io
+import itertools
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+import numpy as np
+from curvas import get_track_offset, SineProfile
+
+
+def medir(func, repeticiones=3):
+    """
+    Ejecuta `func` varias veces y retorna el mejor tiempo en segundos.
+    """
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        func()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def _get_track_offset_escalar(z, segment_length=250, amplitude=2.0):
+    """
+    Implementación escalar anterior de `curvas.get_track_offset`, usada como referencia.
+    """
+    segment = int(z // segment_length)
+    mod_z = z % segment_length
+    sign = (-1) ** segment
+    return sign * amplitude * np.sin(np.pi * mod_z / segment_length)
+
+
+def benchmark_curvas(puntos=1_000_000):
+    """
+    Compara la ruta anterior con np.vectorize contra la evaluación vectorizada de curvas.
+
+    Retorna:
+        dict: Tiempos en segundos de cada variante.
+    """
+    z = np.linspace(0.0, 10_000.0, puntos)
+    vectorizada = np.vectorize(_get_track_offset_escalar, otypes=[float])
+    perfil = SineProfile()
+
+    referencia = vectorizada(z)
+    if not np.allclose(referencia, get_track_offset(z)):
+        raise AssertionError("get_track_offset no coincide con la implementación escalar")
+
+    resultados = {
+        "np.vectorize": medir(lambda: vectorizada(z), repeticiones=1),
+        "get_track_offset": medir(lambda: get_track_offset(z)),
+        "SineProfile.evaluate": medir(lambda: perfil.evaluate(z)),
+    }
+    base = resultados["np.vectorize"]
+    print(f"Curvas: {puntos} puntos")
+    for nombre, segundos in resultados.items():
+        print(f"  {nombre:<22} {segundos * 1000:10.2f} ms  x{base / segundos:8.1f}")
+    return resultados
+
+
+def benchmark_modelo(ruta="Car.obj", repeticiones=5):
+    """
+    Compara el parseo completo del OBJ con la carga desde la caché binaria.
+
+    Retorna:
+        dict: Tiempos en segundos de cada variante.
+    """
+    import logging
+    from cache_binario import cache_path_for
+    from cargar_recursos import cargar_modelo_carro
+
+    logging.getLogger("pywavefront").setLevel(logging.ERROR)
+    cache_path = cache_path_for(ruta)
+
+    def carga_en_frio():
+        if os.path.exists(cache_path):
+            os.remove(cache_path)
+        cargar_modelo_carro(ruta)
+
+    resultados = {
+        "parseo completo": medir(carga_en_frio, repeticiones),
+        "caché": medir(lambda: cargar_modelo_carro(ruta), repeticiones),
+    }
+    base = resultados["parseo completo"]
+    print(f"Modelo: {ruta}")
+    for nombre, segundos in resultados.items():
+        print(f"  {nombre:<22} {segundos * 1000:10.2f} ms  x{base / segundos:8.1f}")
+    return resultados
+
+
+# Presupuesto por frame de la escena (pista, barreras, obstáculos y coche)
+PRESUPUESTO_RENDER = {"draw_calls": 8, "vertices": 2000, "state_changes": 20}
+
+
+def _logica_en(distancia, semilla=0):
+    """
+    GameLogic tras acelerar en línea recta hasta recorrer `distancia` metros, con un reloj
+    simulado y el generador de la partida sembrado para que la escena sea reproducible.
+    """
+    from logica_juego import GameLogic, Controls, TICK_RATE
+    from simulacion import SimulatedClock
+
+    clock = SimulatedClock()
+    logic = GameLogic(clock=clock, rng=random.Random(semilla))
+    acelerar = Controls(True, False, False)
+    dt = 1.0 / TICK_RATE
+    while -logic.car_z < distancia:
+        logic.update(acelerar, dt)
+        clock.advance(dt)
+    return logic
+
+
+def benchmark_render(distancias=(100, 900), presupuesto=None):
+    """
+    Dibuja la escena a varias distancias con el backend de grabación (sin GPU) y comprueba
+    que cada frame cumple el presupuesto y que la geometría de la pista y las barreras no
+    crece con la distancia: ningún frame envía más vértices de ese tipo que el de la primera
+    distancia (salvo el redondeo de la ventana a los puntos de la malla y a los tramos de
+    barrera), que debe ser suficiente para que la pista ya llene la ventana visible. Los
+    obstáculos visibles dependen de la partida y solo se limitan con el presupuesto.
+
+    Retorna:
+        dict: Contadores de cada distancia (ver backend_grafico.FrameStats.as_dict).
+    """
+    from backend_grafico import RecordingBackend, QUAD_STRIP, QUADS
+    from dibujos import draw_track, draw_barriers, draw_obstacles, draw_car
+    from perspectiva import visible_z_range
+
+    backend = RecordingBackend(budgets=presupuesto or PRESUPUESTO_RENDER, record_calls=False)
+    resultados = {}
+    for distancia in distancias:
+        logic = _logica_en(distancia)
+        view_range = visible_z_range(logic.car_z)
+        backend.begin_frame()
+        draw_track(logic, 0, view_range=view_range, backend=backend)
+        draw_barriers(logic, view_range, backend=backend)
+        draw_obstacles(logic, view_range, backend=backend)
+        draw_car(logic, None, backend=backend)
+        resultados[distancia] = backend.end_frame().as_dict()
+
+    print(f"Render (presupuesto: {backend.budgets})")
+    for distancia, cuenta in resultados.items():
+        print(f"  {distancia:>6} m  llamadas {cuenta['draw_calls']:3d}  vértices {cuenta['vertices']:6d}  "
+              f"cambios de estado {cuenta['state_changes']:3d}")
+    def vertices_pista(cuenta):
+        return sum(cuenta["by_primitive"].get(primitiva, 0) for primitiva in (QUAD_STRIP, QUADS))
+
+    # Redondeo de la ventana: un punto más de la malla (2 vértices) en cada extremo y un
+    # tramo de barrera (8 vértices)
+    margen = 2 * 2 + 8
+    referencia = vertices_pista(resultados[distancias[0]])
+    for distancia, cuenta in resultados.items():
+        if vertices_pista(cuenta) > referencia + margen:
+            raise AssertionError(f"A {distancia} m la pista y las barreras envían {vertices_pista(cuenta)} "
+                                 f"vértices, frente a {referencia} a {distancias[0]} m")
+    return resultados
+
+
+def benchmark_camara(frames=20_000):
+    """
+    Coste por frame de las matrices de la cámara: update_camera_view más la trasposición
+    para glLoadMatrixf frente a Camera.follow, y configure_perspective frente a la proyección
+    en caché de Camera.resize. Comprueba antes que las matrices coinciden.
+
+    Retorna:
+        dict: Microsegundos por llamada de cada variante.
+    """
+    from perspectiva import (Camera, configure_perspective, update_camera_view,
+                             CAMERA_HEIGHT, CAMERA_OFFSET_Z)
+
+    rng = np.random.default_rng(0)
+    xs = rng.uniform(-3.0, 3.0, frames).tolist()
+    zs = np.linspace(0.0, -5000.0, frames).tolist()
+    camera = Camera(900, 700, smoothing=0.0)
+
+    for x, z in zip(xs[:100], zs[:100]):
+        camera.follow(x, z)
+        referencia = update_camera_view((x, CAMERA_HEIGHT, z + CAMERA_OFFSET_Z), (x, 0.0, z))
+        if not np.allclose(camera.view, referencia.T.ravel(), atol=1e-4):
+            raise AssertionError("Camera.view no coincide con update_camera_view")
+    if not np.allclose(camera.projection, configure_perspective(900, 700).T.ravel()):
+        raise AssertionError("Camera.projection no coincide con configure_perspective")
+
+    def vista_anterior():
+        for x, z in zip(xs, zs):
+            # glLoadMatrixf necesita la traspuesta contigua: es la copia que hace PyOpenGL
+            np.ascontiguousarray(update_camera_view((x, CAMERA_HEIGHT, z + CAMERA_OFFSET_Z), (x, 0.0, z)).T)
+
+    def vista_camara():
+        follow = camera.follow
+        for x, z in zip(xs, zs):
+            follow(x, z, 1 / 60)
+
+    def proyeccion_anterior():
+        for _ in range(frames):
+            np.ascontiguousarray(configure_perspective(900, 700).T)
+
+    def proyeccion_camara():
+        resize = camera.resize
+        for _ in range(frames):
+            resize(900, 700)
+
+    resultados = {
+        "update_camera_view": medir(vista_anterior) / frames * 1e6,
+        "Camera.follow": medir(vista_camara) / frames * 1e6,
+        "configure_perspective": medir(proyeccion_anterior) / frames * 1e6,
+        "Camera.resize": medir(proyeccion_camara) / frames * 1e6,
+    }
+    print(f"Cámara: {frames} frames")
+    for nombre, microsegundos in resultados.items():
+        print(f"  {nombre:<22} {microsegundos:8.2f} us/frame")
+    return resultados
+
+
+def benchmark_indice(consultas=100_000):
+    """
+    Consultas escalares de la línea central: get_track_offset frente a TrackIndex (desplazamiento,
+    pendiente y longitud de arco). Comprueba antes el error del índice
+    frente al perfil analítico.
+
+    Retorna:
+        dict: Microsegundos por consulta de cada variante.
+    """
+    from indice_pista import TrackIndex
+
+    indice = TrackIndex()
+    perfil = indice.profile
+    distancias = np.random.default_rng(0).uniform(0.0, 1000.0, consultas).tolist()
+    x, pendiente, _ = perfil.evaluate(np.array(distancias))
+    error = max(np.abs(indice.offsets(distancias) - x).max(),
+                max(abs(indice.slope(d) - p) for d, p in zip(distancias[:1000], pendiente[:1000])))
+    if error > 1e-6:
+        raise AssertionError(f"TrackIndex se separa del perfil en {error}")
+
+    def bucle(consulta):
+        return lambda: [consulta(d) for d in distancias]
+
+    resultados = {
+        "get_track_offset": medir(bucle(get_track_offset), repeticiones=1) / consultas * 1e6,
+        "TrackIndex.offset": medir(bucle(indice.offset)) / consultas * 1e6,
+        "TrackIndex.slope": medir(bucle(indice.slope)) / consultas * 1e6,
+        "TrackIndex.arc_length": medir(bucle(indice.arc_length)) / consultas * 1e6,
+    }
+    print(f"Índice de pista: {consultas} consultas (error máximo {error:.1e} m)")
+    for nombre, microsegundos in resultados.items():
+        print(f"  {nombre:<22} {microsegundos:8.2f} us/consulta")
+    return resultados
+
+
+def benchmark_pipeline(frames=200, distancia=300.0, ancho=900, alto=700):
+    """
+    Tiempo por frame de la escena del juego con el pipeline clásico y con el de sombreadores
+    (ver sombreadores.ShaderBackend), en una ventana oculta. Cada frame termina con glFinish,
+    así que el tiempo incluye el trabajo de la GPU (o de Mesa llvmpipe en máquinas sin ella).
+
+    Retorna:
+        dict: Pipeline -> {"media", "p95"} en milisegundos por frame.
+    """
+    import pygame
+    from OpenGL.GL import (glClear, glClearColor, glEnable, glFinish, glLoadMatrixf, glMatrixMode,
+                           GL_COLOR_BUFFER_BIT, GL_DEPTH_BUFFER_BIT, GL_DEPTH_TEST, GL_MODELVIEW,
+                           GL_PROJECTION, GL_TEXTURE_2D)
+    from backend_grafico import OpenGLBackend
+    from cargar_recursos import cargar_modelo_carro
+    from dibujos import draw_track, draw_barriers, draw_obstacles, draw_car
+    from iluminacion import setup_lighting
+    from malla_carro import CarMesh
+    from perspectiva import Camera, visible_z_range
+    from sombreadores import ShaderBackend
+    from texturas import default_manager
+
+    pygame.init()
+    pygame.display.set_mode((ancho, alto), pygame.OPENGL | pygame.DOUBLEBUF | pygame.HIDDEN)
+    camera = Camera(ancho, alto)
+    glMatrixMode(GL_PROJECTION)
+    glLoadMatrixf(camera.projection)
+    glMatrixMode(GL_MODELVIEW)
+    glEnable(GL_DEPTH_TEST)
+    glEnable(GL_TEXTURE_2D)
+    glClearColor(0.5, 0.5, 0.5, 1.0)
+
+    modelo = cargar_modelo_carro("Car.obj")
+    car_mesh = CarMesh.from_scene(modelo) if modelo is not None else None
+    if car_mesh is not None:
+        car_mesh.upload()
+    textura = default_manager().acquire("track_texture.png") or 0
+    logic = _logica_en(distancia)
+    camera.follow(logic.car_x, logic.car_z, 1.0)
+    view_range = visible_z_range(logic.car_z)
+
+    backends = {"clasico": OpenGLBackend(), "sombreadores": ShaderBackend(setup_lighting())}
+    resultados = {}
+    try:
+        for nombre, backend in backends.items():
+            tiempos = []
+            for frame in range(frames + 10):
+                inicio = time.perf_counter()
+                glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+                glLoadMatrixf(camera.view)
+                draw_track(logic, textura, view_range=view_range, backend=backend)
+                draw_barriers(logic, view_range, backend=backend)
+                draw_obstacles(logic, view_range, backend=backend)
+                draw_car(logic, car_mesh, backend=backend)
+                glFinish()
+                # Los primeros frames compilan y calientan cachés
+                if frame >= 10:
+                    tiempos.append(time.perf_counter() - inicio)
+            tiempos = np.array(tiempos) * 1000
+            resultados[nombre] = {"media": float(tiempos.mean()), "p95": float(np.percentile(tiempos, 95))}
+    finally:
+        backends["sombreadores"].release()
+        if car_mesh is not None:
+            car_mesh.release()
+        pygame.quit()
+
+    print(f"Pipeline: {frames} frames de {ancho}x{alto} a {distancia:.0f} m")
+    for nombre, tiempos in resultados.items():
+        print(f"  {nombre:<14} media {tiempos['media']:7.2f} ms/frame  p95 {tiempos['p95']:7.2f} ms")
+    return resultados
+
+
+# SUITE: funciones críticas con tamaños de problema parametrizados. Cada caso recibe el tamaño
+# y devuelve la función sin argumentos que se mide; la preparación no entra en la medida
+
+# Longitudes de pista (m) y número de obstáculos de los casos parametrizados
+LONGITUDES = (50, 500, 2000, 10_000)
+OBSTACULOS = (10, 100, 1000, 10_000, 100_000)
+# Versión del formato de los archivos de la suite
+SUITE_VERSION = 1
+
+
+def _caso_generate_curve_points(longitud):
+    from curvas import generate_curve_points
+    return lambda: generate_curve_points(longitud)
+
+
+def _caso_get_track_offset(longitud):
+    z = np.arange(0.0, longitud, 1.0)
+    return lambda: get_track_offset(z)
+
+
+def _caso_draw_track(longitud):
+    """
+    Geometría de la pista desde cero (malla de `longitud` metros) enviada a un backend de
+    grabación, sin GPU.
+    """
+    from types import SimpleNamespace
+    from backend_grafico import RecordingBackend
+    from dibujos import draw_track
+    from malla_pista import TrackMesh
+
+    backend = RecordingBackend(record_calls=False)
+
+    def dibujar():
+        logic = SimpleNamespace(track_mesh=TrackMesh(), track_length=longitud)
+        draw_track(logic, 0, backend=backend)
+        backend.end_frame()
+        backend.frames.clear()
+
+    return dibujar
+
+
+def _caso_check_collisions(obstaculos):
+    """
+    Un tick de check_collisions con `obstaculos` obstáculos repartidos como en la partida (uno
+    cada 8 m de media). El coche recorre la pista lejos de ellos, así que ningún tick choca y
+    el estado no cambia entre repeticiones.
+    """
+    from colisiones import check_collisions
+    from logica_juego import GameLogic
+    from obstaculos import ObstacleStore, TYPE_NAMES
+    from simulacion import SimulatedClock
+
+    rng = np.random.default_rng(0)
+    logic = GameLogic(clock=SimulatedClock(), rng=random.Random(0))
+    store = ObstacleStore(capacity=obstaculos)
+    distancias = np.sort(rng.uniform(30.0, 30.0 + 8.0 * obstaculos, obstaculos))
+    for distancia in distancias:
+        store.append({"x": rng.uniform(-2.0, 2.0), "z": -distancia, "size": 1.0,
+                      "type": TYPE_NAMES[0], "direction": 0})
+    logic.obstacles = store
+    logic.car_x = logic.prev_car_x = 50.0
+    # Cada tick prueba un tramo distinto de la pista
+    recorrido = itertools.cycle([-float(d) for d in rng.choice(distancias, 64)])
+    paso = 30.0 / 60  # lo que avanza el coche en un tick a 30 m/s
+
+    def tick():
+        z = next(recorrido)
+        logic.prev_car_z = z
+        logic.car_z = z - paso
+        check_collisions(logic)
+
+    return tick
+
+
+def _caso_update_camera_view(_):
+    from perspectiva import update_camera_view
+    return lambda: update_camera_view((0.0, 5.0, 10.0), (0.0, 0.0, -10.0))
+
+
+def _caso_camera_follow(_):
+    from perspectiva import Camera
+    camera = Camera(900, 700)
+    return lambda: camera.follow(1.0, -100.0, 1 / 60)
+
+
+def _caso_cargar_modelo_carro(variante):
+    import logging
+    from cargar_recursos import cargar_modelo_carro
+
+    logging.getLogger("pywavefront").setLevel(logging.ERROR)
+    usar_cache = variante == "cache"
+
+    def cargar():
+        # cargar_modelo_carro informa de cada material; la salida no entra en la medida
+        with contextlib.redirect_stdout(io.StringIO()):
+            cargar_modelo_carro("Car.obj", usar_cache=usar_cache)
+
+    if usar_cache:
+        cargar()  # deja la caché al día
+
+    return cargar
+
+
+# Caso -> (tamaños, preparación)
+SUITE = {
+    "generate_curve_points": (LONGITUDES, _caso_generate_curve_points),
+    "get_track_offset": (LONGITUDES, _caso_get_track_offset),
+    "draw_track": (LONGITUDES, _caso_draw_track),
+    "check_collisions": (OBSTACULOS, _caso_check_collisions),
+    "update_camera_view": ((1,), _caso_update_camera_view),
+    "Camera.follow": ((1,), _caso_camera_follow),
+    "cargar_modelo_carro": (("parseo", "cache"), _caso_cargar_modelo_carro),
+}
+
+
+def medir_caso(func, tiempo_minimo=0.05, repeticiones=5):
+    """
+    Mide `func` como timeit: se calibra cuántas llamadas seguidas duran al menos
+    `tiempo_minimo` segundos y se repite esa tanda `repeticiones` veces, con el recolector de
+    basura desactivado. Después se ejecuta una vez más con tracemalloc para obtener el pico de
+    memoria de una llamada.
+
+    Retorna:
+        dict: "segundos" (mejor tiempo por llamada), "mediana" (por llamada), "llamadas" (por
+        tanda) y "pico_memoria" (bytes reservados por encima de lo que ya había).
+    """
+    perf = time.perf_counter
+    gc_activo = gc.isenabled()
+    gc.disable()
+    try:
+        llamadas = 1
+        while True:
+            inicio = perf()
+            for _ in range(llamadas):
+                func()
+            if perf() - inicio >= tiempo_minimo:
+                break
+            llamadas *= 2
+        tiempos = []
+        for _ in range(repeticiones):
+            inicio = perf()
+            for _ in range(llamadas):
+                func()
+            tiempos.append((perf() - inicio) / llamadas)
+    finally:
+        if gc_activo:
+            gc.enable()
+
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        func()
+        pico = tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+    return {"segundos": min(tiempos), "mediana": float(np.median(tiempos)), "llamadas": llamadas,
+            "pico_memoria": max(pico, 0)}
+
+
+def _nombre(caso, tamano):
+    return f"{caso}[{tamano}]"
+
+
+def ejecutar_suite(casos=None, rapida=False, repeticiones=5):
+    """
+    Ejecuta los casos de SUITE con todos sus tamaños.
+
+    Args:
+        casos (list): Nombres de los casos a ejecutar (por defecto, todos).
+        rapida (bool): Menos repeticiones y tandas más cortas, para comprobar que la suite
+            funciona; los tiempos son menos estables.
+        repeticiones (int): Tandas medidas por caso y tamaño; en máquinas compartidas, más
+            tandas dan un mejor tiempo más estable.
+
+    Retorna:
+        dict: Informe con el entorno y "resultados": "caso[tamaño]" -> medidas de medir_caso.
+    """
+    casos = list(SUITE) if not casos else casos
+    desconocidos = [caso for caso in casos if caso not in SUITE]
+    if desconocidos:
+        raise ValueError(f"Casos desconocidos: {', '.join(desconocidos)}")
+    opciones = {"tiempo_minimo": 0.01, "repeticiones": 2} if rapida else {"repeticiones": repeticiones}
+    resultados = {}
+    for caso in casos:
+        tamanos, preparar = SUITE[caso]
+        for tamano in tamanos:
+            medida = medir_caso(preparar(tamano), **opciones)
+            resultados[_nombre(caso, tamano)] = medida
+            print(f"  {_nombre(caso, tamano):<34} {_formato_tiempo(medida['segundos'])}  "
+                  f"pico {_formato_bytes(medida['pico_memoria'])}")
+    return {
+        "version": SUITE_VERSION,
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "plataforma": platform.platform(),
+        "procesador": platform.processor() or platform.machine(),
+        "resultados": resultados,
+    }
+
+
+def _formato_tiempo(segundos):
+    for unidad, factor in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if segundos >= factor:
+            return f"{segundos / factor:9.2f} {unidad:<2}"
+    return f"{segundos / 1e-9:9.2f} ns"
+
+
+def _formato_bytes(cantidad):
+    for unidad, factor in (("MB", 1 << 20), ("KB", 1 << 10)):
+        if cantidad >= factor:
+            return f"{cantidad / factor:8.1f} {unidad}"
+    return f"{cantidad:8d} B "
+
+
+def guardar_suite(informe, ruta):
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(informe, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+def cargar_suite(ruta):
+    with open(ruta, encoding="utf-8") as f:
+        informe = json.load(f)
+    if informe.get("version") != SUITE_VERSION:
+        raise ValueError(f"{ruta}: versión de la suite no soportada ({informe.get('version')})")
+    return informe
+
+
+def comparar_suites(base, actual, umbral=0.10, umbral_memoria=0.10):
+    """
+    Compara dos informes de ejecutar_suite caso a caso.
+
+    Se comparan los mejores tiempos, que son los menos sensibles a la carga de la máquina;
+    aun así, en máquinas virtuales compartidas conviene un umbral mayor que el 10% por defecto.
+    Un caso empeora si su mejor tiempo supera al de la base en más de `umbral` (fracción) o si
+    su pico de memoria la supera en más de `umbral_memoria` y en más de 4 KB (por debajo, las
+    diferencias son ruido de tracemalloc). Los casos que solo están en uno de los informes se
+    listan aparte.
+
+    Retorna:
+        dict: "filas" (caso, tiempo base, actual, relación, memoria base, actual, estado),
+        "regresiones" (nombres de casos) y "sin_pareja" (casos en uno solo de los informes).
+    """
+    antes, despues = base["resultados"], actual["resultados"]
+    filas = []
+    regresiones = []
+    for nombre in antes:
+        if nombre not in despues:
+            continue
+        a, d = antes[nombre], despues[nombre]
+        relacion = d["segundos"] / a["segundos"] if a["segundos"] > 0 else float("inf")
+        memoria = d["pico_memoria"] - a["pico_memoria"]
+        estado = "igual"
+        if relacion > 1 + umbral:
+            estado = "MÁS LENTO"
+        elif relacion < 1 / (1 + umbral):
+            estado = "más rápido"
+        if memoria > 4096 and memoria > umbral_memoria * a["pico_memoria"]:
+            estado = "MÁS MEMORIA" if estado == "igual" else estado + ", MÁS MEMORIA"
+        if "MÁS" in estado:
+            regresiones.append(nombre)
+        filas.append((nombre, a["segundos"], d["segundos"], relacion, a["pico_memoria"], d["pico_memoria"], estado))
+    sin_pareja = sorted(set(antes) ^ set(despues))
+    return {"filas": filas, "regresiones": regresiones, "sin_pareja": sin_pareja}
+
+
+def imprimir_comparacion(comparacion, umbral):
+    print(f"{'caso':<34} {'base':>12} {'actual':>12} {'relación':>9} {'pico base':>11} {'pico actual':>11}")
+    for nombre, t_base, t_actual, relacion, m_base, m_actual, estado in comparacion["filas"]:
+        print(f"{nombre:<34} {_formato_tiempo(t_base)} {_formato_tiempo(t_actual)} {relacion:8.2f}x "
+              f"{_formato_bytes(m_base)} {_formato_bytes(m_actual)}  {estado}")
+    for nombre in comparacion["sin_pareja"]:
+        print(f"{nombre:<34} (solo en uno de los informes)")
+    regresiones = comparacion["regresiones"]
+    if regresiones:
+        print(f"{len(regresiones)} regresiones por encima del {umbral:.0%}: {', '.join(regresiones)}")
+    else:
+        print(f"Sin regresiones por encima del {umbral:.0%}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pruebas de rendimiento del juego")
+    sub = parser.add_subparsers(dest="prueba", required=True)
+    p_curvas = sub.add_parser("curvas", help="get_track_offset vectorizado frente a np.vectorize")
+    p_curvas.add_argument("--puntos", type=int, default=1_000_000)
+    p_modelo = sub.add_parser("modelo", help="parseo del OBJ frente a la caché binaria")
+    p_modelo.add_argument("--ruta", default="Car.obj")
+    p_render = sub.add_parser("render", help="geometría enviada por frame frente al presupuesto")
+    p_render.add_argument("--distancias", type=float, nargs="+", default=[100, 900])
+    p_camara = sub.add_parser("camara", help="matrices de la cámara por frame")
+    p_camara.add_argument("--frames", type=int, default=20_000)
+    p_indice = sub.add_parser("indice", help="consultas de la línea central con TrackIndex")
+    p_indice.add_argument("--consultas", type=int, default=100_000)
+    p_pipeline = sub.add_parser("pipeline", help="tiempo por frame del pipeline clásico frente a sombreadores")
+    p_pipeline.add_argument("--frames", type=int, default=200)
+    p_pipeline.add_argument("--distancia", type=float, default=300.0)
+    p_suite = sub.add_parser("suite", help="todos los casos parametrizados, con tiempo y pico de memoria")
+    p_suite.add_argument("--salida", help="guardar el informe JSON (por ejemplo, como base)")
+    p_suite.add_argument("--casos", nargs="+", choices=list(SUITE), help="casos a ejecutar (por defecto, todos)")
+    p_suite.add_argument("--rapida", action="store_true", help="menos repeticiones, para probar la suite")
+    p_suite.add_argument("--repeticiones", type=int, default=5, help="tandas medidas por caso")
+    p_comparar = sub.add_parser("comparar", help="comparar con un informe base y señalar regresiones")
+    p_comparar.add_argument("base", help="informe JSON de referencia")
+    p_comparar.add_argument("--actual", help="informe JSON a comparar (por defecto, se ejecuta la suite)")
+    p_comparar.add_argument("--umbral", type=float, default=0.10, help="empeoramiento de tiempo tolerado (fracción)")
+    p_comparar.add_argument("--umbral-memoria", type=float, default=0.10,
+                            help="aumento del pico de memoria tolerado (fracción)")
+    p_comparar.add_argument("--rapida", action="store_true", help="menos repeticiones al ejecutar la suite")
+    p_comparar.add_argument("--repeticiones", type=int, default=5, help="tandas medidas por caso")
+    args = parser.parse_args(argv)
+
+    if args.prueba == "curvas":
+        benchmark_curvas(args.puntos)
+    elif args.prueba == "modelo":
+        benchmark_modelo(args.ruta)
+    elif args.prueba == "render":
+        benchmark_render(args.distancias)
+    elif args.prueba == "camara":
+        benchmark_camara(args.frames)
+    elif args.prueba == "indice":
+        benchmark_indice(args.consultas)
+    elif args.prueba == "pipeline":
+        benchmark_pipeline(args.frames, args.distancia)
+    elif args.prueba == "suite":
+        print("Suite de rendimiento")
+        informe = ejecutar_suite(args.casos, args.rapida, args.repeticiones)
+        if args.salida:
+            guardar_suite(informe, args.salida)
+            print(f"Informe guardado en {args.salida}")
+    elif args.prueba == "comparar":
+        base = cargar_suite(args.base)
+        if args.actual:
+            actual = cargar_suite(args.actual)
+        else:
+            # Solo los casos de la base, para que la comparación no tarde más de lo necesario
+            casos = sorted({nombre.split("[")[0] for nombre in base["resultados"]} & set(SUITE))
+            print("Suite de rendimiento")
+            actual = ejecutar_suite(casos, args.rapida, args.repeticiones)
+        comparacion = comparar_suites(base, actual, args.umbral, args.umbral_memoria)
+        imprimir_comparacion(comparacion, args.umbral)
+        return 1 if comparacion["regresiones"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,345 @@
+"""
+Grabación de partidas y reproducción sin ventana.
+
+Una partida queda determinada por la semilla de su generador aleatorio (GameLogic.rng), el
+reloj simulado que avanza un paso fijo por tick y los controles de cada tick. El archivo de
+repetición guarda solo eso, más una suma de comprobación (CRC32) del estado tras cada tick
+para detectar a partir de qué tick una reproducción se separa de la original.
+
+Formato (little endian):
+    - cabecera: MAGIC (4 bytes), versión (uint16), ticks por segundo (uint16), semilla
+      (uint64) e intervalo de sumas de comprobación en ticks (uint16),
+    - bloques de hasta `block_ticks` ticks: número de ticks y de sumas (uint32 cada uno), los
+      controles empaquetados a 4 bits por tick (arriba, izquierda, derecha y reinicio) y las
+      sumas (uint32).
+
+Los bloques se escriben a medida que se llenan, así que una grabación en curso puede leerse
+hasta su último bloque completo y una partida larga no se acumula en memoria.
+
+Uso:
+    python repeticion.py grabar partida.rep [--ticks N] [--semilla S]
+    python repeticion.py reproducir partida.rep [--sin-comprobar]
+"""
+import argparse
+import random
+import struct
+import time
+import zlib
+import numpy as np
+from colisiones import check_collisions
+from logica_juego import GameLogic, Controls, TICK_RATE
+from simulacion import SimulatedClock, RandomInput
+
+MAGIC = b"JGRP"
+VERSION = 3
+_HEADER = struct.Struct("<4sHHQH")
+_BLOCK = struct.Struct("<II")
+_STATE = struct.Struct("<6dii?")
+BITS_PER_TICK = 4
+# Las semillas se guardan en la cabecera como uint64
+MAX_SEED = 2 ** 64 - 1
+
+# Los 8 estados posibles de los controles, indexados por sus bits (arriba, izquierda, derecha)
+_CONTROLS = [Controls(bool(code & 4), bool(code & 2), bool(code & 1)) for code in range(8)]
+
+
+class ReplayDesync(Exception):
+    """
+    El estado reproducido no coincide con la suma de comprobación grabada.
+    """
+
+    def __init__(self, tick, expected, actual):
+        super().__init__(f"La repetición se separa de la grabación en el tick {tick} "
+                         f"(esperado {expected:08x}, obtenido {actual:08x})")
+        self.tick = tick
+        self.expected = expected
+        self.actual = actual
+
+
+def seed_argument(text):
+    """
+    Tipo de argparse para --semilla: un entero entre 0 y MAX_SEED, lo que cabe en la cabecera.
+    """
+    seed = int(text)
+    if not 0 <= seed <= MAX_SEED:
+        raise argparse.ArgumentTypeError(f"la semilla debe estar entre 0 y {MAX_SEED}")
+    return seed
+
+
+def state_checksum(logic):
+    """
+    CRC32 del estado de la partida que influye en los ticks siguientes: coche, pista, vidas,
+    intangibilidad y obstáculos vivos.
+    """
+    crc = zlib.crc32(_STATE.pack(
+        logic.car_x, logic.car_z, logic.car_speed_x, logic.car_speed_z,
+        logic.track_length, logic.last_collision_time,
+        logic.attempts, len(logic.obstacles), logic.intangible,
+    ))
+    store = logic.obstacles
+    slots = store.slots()
+    for column in (store.x, store.z, store.size, store.direction):
+        crc = zlib.crc32(column[slots].tobytes(), crc)
+    return crc
+
+
+def new_game(seed):
+    """
+    GameLogic con reloj simulado y generador sembrado, como la que se graba en juego.py.
+
+    Retorna:
+        tuple: (GameLogic, SimulatedClock)
+    """
+    clock = SimulatedClock()
+    return GameLogic(clock=clock, rng=random.Random(seed)), clock
+
+
+def simulate_tick(logic, clock, controls, dt):
+    """
+    Un tick completo de la simulación, en el mismo orden que el bucle de juego.py.
+
+    Retorna:
+        tuple: (velocidad actual, distancia recorrida) de GameLogic.update.
+    """
+    result = logic.update(controls, dt)
+    check_collisions(logic)
+    clock.advance(dt)
+    return result
+
+
+class ReplayWriter:
+    """
+    Graba los controles de cada tick y las sumas de comprobación del estado.
+
+    Uso:
+        with ReplayWriter("partida.rep", seed) as writer:
+            ...  # tras cada tick:
+            writer.record(controls, logic)
+            ...  # antes del primer tick de una partida reiniciada:
+            writer.restart()
+    """
+
+    def __init__(self, path, seed, tick_rate=TICK_RATE, checksum_interval=1, block_ticks=1024):
+        """
+        Args:
+            path (str): Archivo de salida.
+            seed (int): Semilla del generador de la partida (entero de 64 bits sin signo).
+            tick_rate (int): Ticks por segundo de la simulación.
+            checksum_interval (int): Cada cuántos ticks se guarda una suma de comprobación.
+            block_ticks (int): Ticks por bloque escrito.
+        """
+        if not 0 <= seed <= MAX_SEED:
+            raise ValueError(f"La semilla debe estar entre 0 y {MAX_SEED}")
+        self.path = path
+        self.seed = seed
+        self.tick_rate = tick_rate
+        self.checksum_interval = checksum_interval
+        self.block_ticks = block_ticks
+        self.ticks = 0
+        self._file = open(path, "wb")
+        self._file.write(_HEADER.pack(MAGIC, VERSION, tick_rate, seed, checksum_interval))
+        self._bits = np.zeros((block_ticks, BITS_PER_TICK), dtype=np.uint8)
+        self._checksums = []
+        self._count = 0
+        self._restart = False
+
+    def restart(self):
+        """
+        Marca que el siguiente tick empieza con GameLogic.restart_game().
+        """
+        self._restart = True
+
+    def record(self, controls, logic):
+        """
+        Registra un tick ya simulado con `controls`.
+        """
+        bits = self._bits[self._count]
+        bits[0] = controls.up
+        bits[1] = controls.left
+        bits[2] = controls.right
+        bits[3] = self._restart
+        self._restart = False
+        if self.ticks % self.checksum_interval == 0:
+            self._checksums.append(state_checksum(logic))
+        self._count += 1
+        self.ticks += 1
+        if self._count == self.block_ticks:
+            self.flush()
+
+    def flush(self):
+        """
+        Escribe los ticks pendientes como un bloque.
+        """
+        if not self._count:
+            return
+        f = self._file
+        f.write(_BLOCK.pack(self._count, len(self._checksums)))
+        f.write(np.packbits(self._bits[:self._count]).tobytes())
+        f.write(np.array(self._checksums, dtype="<u4").tobytes())
+        f.flush()
+        self._checksums.clear()
+        self._count = 0
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class ReplayReader:
+    """
+    Lee un archivo de repetición bloque a bloque.
+
+    Iterar sobre él produce (tick, controls, restart, checksum) por tick, con checksum None
+    en los ticks sin suma de comprobación.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            header = f.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            raise ValueError(f"{path} no es un archivo de repetición")
+        magic, version, self.tick_rate, self.seed, self.checksum_interval = _HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError(f"{path} no es un archivo de repetición")
+        if version != VERSION:
+            raise ValueError(f"Versión de repetición no soportada: {version}")
+
+    def blocks(self):
+        """
+        Genera (códigos de control, reinicios, sumas) por bloque, donde los códigos son
+        índices de 0 a 7 (arriba, izquierda, derecha como bits) y los reinicios un array bool.
+        Un bloque incompleto al final del archivo (grabación en curso) se ignora.
+        """
+        with open(self.path, "rb") as f:
+            f.seek(_HEADER.size)
+            while True:
+                head = f.read(_BLOCK.size)
+                if len(head) < _BLOCK.size:
+                    return
+                count, n_checksums = _BLOCK.unpack(head)
+                packed_size = (count * BITS_PER_TICK + 7) // 8
+                packed = f.read(packed_size)
+                raw_checksums = f.read(4 * n_checksums)
+                if len(packed) < packed_size or len(raw_checksums) < 4 * n_checksums:
+                    return
+                bits = np.unpackbits(np.frombuffer(packed, dtype=np.uint8),
+                                     count=count * BITS_PER_TICK).reshape(count, BITS_PER_TICK)
+                codes = bits[:, 0] * 4 + bits[:, 1] * 2 + bits[:, 2]
+                yield codes, bits[:, 3].astype(bool), np.frombuffer(raw_checksums, dtype="<u4")
+
+    def __iter__(self):
+        tick = 0
+        interval = self.checksum_interval
+        for codes, restarts, checksums in self.blocks():
+            checksums = checksums.tolist()
+            c = 0
+            for code, restart in zip(codes.tolist(), restarts.tolist()):
+                checksum = None
+                if tick % interval == 0:
+                    checksum = checksums[c]
+                    c += 1
+                yield tick, _CONTROLS[code], restart, checksum
+                tick += 1
+
+
+def record_headless(path, ticks, input_source, seed=0, checksum_interval=1):
+    """
+    Graba una sesión simulada sin ventana: `ticks` ticks con controles de `input_source`
+    (ver simulacion.RandomInput), reiniciando la partida cada vez que se acaban las vidas.
+
+    Retorna:
+        int: Número de ticks grabados.
+    """
+    logic, clock = new_game(seed)
+    dt = 1.0 / TICK_RATE
+    with ReplayWriter(path, seed, TICK_RATE, checksum_interval) as writer:
+        for tick in range(ticks):
+            if logic.attempts <= 0:
+                logic.restart_game()
+                writer.restart()
+            controls = input_source(tick)
+            simulate_tick(logic, clock, controls, dt)
+            writer.record(controls, logic)
+    return ticks
+
+
+def play(path, verify=True):
+    """
+    Reproduce una grabación sin ventana, tan rápido como sea posible.
+
+    Args:
+        path (str): Archivo de repetición.
+        verify (bool): Comparar el estado con las sumas grabadas; lanza ReplayDesync en el
+            primer tick que no coincida.
+
+    Retorna:
+        dict: Informe con ticks, tiempo, ticks por segundo, veces el tiempo real, partidas,
+        sumas comprobadas, distancia final y la GameLogic resultante.
+    """
+    reader = ReplayReader(path)
+    logic, clock = new_game(reader.seed)
+    dt = 1.0 / reader.tick_rate
+    perf = time.perf_counter
+    ticks = verified = 0
+    games = 1
+    start = perf()
+    for tick, controls, restart, expected in reader:
+        if restart:
+            logic.restart_game()
+            games += 1
+        simulate_tick(logic, clock, controls, dt)
+        if verify and expected is not None:
+            actual = state_checksum(logic)
+            if actual != expected:
+                raise ReplayDesync(tick, expected, actual)
+            verified += 1
+        ticks += 1
+    elapsed = perf() - start
+    ticks_per_second = ticks / elapsed if elapsed > 0 else float("inf")
+    return {
+        "ticks": ticks,
+        "seconds": elapsed,
+        "ticks_per_second": ticks_per_second,
+        "realtime_factor": ticks_per_second / reader.tick_rate,
+        "games": games,
+        "verified": verified,
+        "distance": -logic.car_z,
+        "logic": logic,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Grabación y reproducción de partidas")
+    sub = parser.add_subparsers(dest="accion", required=True)
+    p_grabar = sub.add_parser("grabar", help="grabar una sesión simulada con entrada aleatoria")
+    p_grabar.add_argument("archivo")
+    p_grabar.add_argument("--ticks", type=int, default=36_000)
+    p_grabar.add_argument("--semilla", type=seed_argument, default=0)
+    p_grabar.add_argument("--intervalo", type=int, default=1, help="ticks entre sumas de comprobación")
+    p_reproducir = sub.add_parser("reproducir", help="reproducir una grabación sin ventana")
+    p_reproducir.add_argument("archivo")
+    p_reproducir.add_argument("--sin-comprobar", action="store_true", help="no comprobar las sumas")
+    args = parser.parse_args(argv)
+
+    if args.accion == "grabar":
+        record_headless(args.archivo, args.ticks, RandomInput(seed=args.semilla), args.semilla, args.intervalo)
+        print(f"{args.ticks} ticks grabados en {args.archivo}")
+    else:
+        report = play(args.archivo, verify=not args.sin_comprobar)
+        print(f"{report['ticks']} ticks ({report['games']} partidas) en {report['seconds']:.2f} s: "
+              f"{report['ticks_per_second']:.0f} ticks/s, x{report['realtime_factor']:.0f} tiempo real")
+        print(f"Sumas comprobadas: {report['verified']}  Distancia final: {report['distance']:.1f} m")
+
+
+if __name__ == "__main__":
+    main()
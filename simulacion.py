@@ -0,0 +1,182 @@
+"""
+Simulación sin ventana de la lógica del juego y medición de su rendimiento.
+
+Ejecuta GameLogic, la generación del mundo y check_collisions con entradas programadas o
+aleatorias y un reloj simulado, sin pygame ni OpenGL, tan rápido como sea posible.
+
+Uso:
+    python simulacion.py [--ticks N] [--entrada aleatoria|acelerar] [--semilla S] [--sin-memoria]
+"""
+import argparse
+import random
+import time
+import tracemalloc
+from colisiones import check_collisions
+from logica_juego import GameLogic, Controls, TICK_RATE
+
+
+class SimulatedClock:
+    """
+    Reloj inyectable que avanza solo cuando la simulación lo indica.
+    """
+
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, dt):
+        self.now += dt
+
+
+class ScriptedInput:
+    """
+    Fuente de entrada programada: repite cíclicamente una secuencia de Controls.
+    """
+
+    def __init__(self, sequence):
+        self.sequence = list(sequence)
+        if not self.sequence:
+            raise ValueError("La secuencia de entrada no puede estar vacía")
+
+    def __call__(self, tick):
+        return self.sequence[tick % len(self.sequence)]
+
+
+class RandomInput:
+    """
+    Fuente de entrada aleatoria y reproducible. Cada combinación de teclas se mantiene
+    durante varios ticks, como haría un jugador.
+    """
+
+    def __init__(self, seed=None, p_up=0.9, p_left=0.2, p_right=0.2, hold_ticks=10):
+        self.rng = random.Random(seed)
+        self.p_up = p_up
+        self.p_left = p_left
+        self.p_right = p_right
+        self.hold_ticks = hold_ticks
+        self._current = Controls(False, False, False)
+
+    def __call__(self, tick):
+        if tick % self.hold_ticks == 0:
+            rng = self.rng
+            self._current = Controls(rng.random() < self.p_up, rng.random() < self.p_left, rng.random() < self.p_right)
+        return self._current
+
+
+# Entrada que solo mantiene pulsada la flecha hacia arriba
+ACCELERATE = ScriptedInput([Controls(True, False, False)])
+
+
+def run_headless(ticks, input_source, tick_rate=TICK_RATE, seed=None, track_memory=True, swept=True):
+    """
+    Ejecuta `ticks` ticks de simulación sin ventana y mide su rendimiento.
+
+    Cuando una partida termina se reinicia automáticamente, de modo que siempre se ejecutan
+    todos los ticks pedidos.
+
+    Args:
+        ticks (int): Número de ticks a simular.
+        input_source: Callable tick -> Controls (ScriptedInput, RandomInput...).
+        tick_rate (float): Ticks por segundo de la simulación.
+        seed (int): Semilla del generador de la partida (obstáculos y colisiones).
+        track_memory (bool): Medir el pico de memoria con tracemalloc (ralentiza la ejecución).
+        swept (bool): Modo de colisión continuo (ver colisiones.check_collisions).
+
+    Retorna:
+        dict: Informe con ticks por segundo, tiempo por fase y pico de memoria.
+    """
+    dt = 1.0 / tick_rate
+    clock = SimulatedClock()
+    logic = GameLogic(clock=clock, rng=random.Random(seed))
+    perf = time.perf_counter
+
+    # Medir stream_world por separado envolviéndolo en la instancia
+    phase_time = {"update": 0.0, "stream_world": 0.0, "check_collisions": 0.0}
+    stream_world = logic.stream_world
+
+    def timed_stream_world():
+        start = perf()
+        added = stream_world()
+        phase_time["stream_world"] += perf() - start
+        return added
+
+    logic.stream_world = timed_stream_world
+
+    games = 1
+    max_distance = 0.0
+    if track_memory:
+        tracemalloc.start()
+    start_run = perf()
+    for tick in range(ticks):
+        controls = input_source(tick)
+        t0 = perf()
+        logic.update(controls, dt)
+        t1 = perf()
+        check_collisions(logic, swept=swept)
+        t2 = perf()
+        phase_time["update"] += t1 - t0
+        phase_time["check_collisions"] += t2 - t1
+        clock.advance(dt)
+        max_distance = max(max_distance, -logic.car_z)
+        if logic.attempts <= 0:
+            logic.restart_game()
+            games += 1
+    elapsed = perf() - start_run
+    peak_memory = None
+    if track_memory:
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    # stream_world se ejecuta dentro de update; se descuenta para no contarlo dos veces
+    phase_time["update"] -= phase_time["stream_world"]
+    return {
+        "ticks": ticks,
+        "seconds": elapsed,
+        "ticks_per_second": ticks / elapsed if elapsed > 0 else float("inf"),
+        "simulated_seconds": ticks * dt,
+        "phases": phase_time,
+        "peak_memory_bytes": peak_memory,
+        "games": games,
+        "max_distance": max_distance,
+        "obstacles_alive": len(logic.obstacles),
+    }
+
+
+def format_report(report):
+    """
+    Texto legible de un informe de run_headless.
+    """
+    lines = [
+        f"Ticks: {report['ticks']} ({report['simulated_seconds']:.0f} s simulados) en {report['seconds']:.2f} s",
+        f"Ticks por segundo: {report['ticks_per_second']:.0f}",
+        f"Partidas: {report['games']}  Distancia máxima: {report['max_distance']:.1f} m  "
+        f"Obstáculos activos: {report['obstacles_alive']}",
+        "Tiempo por fase:",
+    ]
+    for name, seconds in report["phases"].items():
+        per_tick = seconds / report["ticks"] * 1e6 if report["ticks"] else 0.0
+        lines.append(f"  {name:<18} {seconds:8.3f} s  {per_tick:8.2f} us/tick")
+    if report["peak_memory_bytes"] is not None:
+        lines.append(f"Pico de memoria: {report['peak_memory_bytes'] / 1024:.1f} KiB")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulación sin ventana de la lógica del juego")
+    parser.add_argument("--ticks", type=int, default=100_000)
+    parser.add_argument("--entrada", choices=["aleatoria", "acelerar"], default="aleatoria")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--sin-memoria", action="store_true", help="no medir memoria con tracemalloc")
+    parser.add_argument("--discreta", action="store_true", help="colisión solo en la posición final")
+    args = parser.parse_args(argv)
+
+    source = RandomInput(seed=args.semilla) if args.entrada == "aleatoria" else ACCELERATE
+    report = run_headless(args.ticks, source, seed=args.semilla,
+                          track_memory=not args.sin_memoria, swept=not args.discreta)
+    print(format_report(report))
+
+
+if __name__ == "__main__":
+    main()
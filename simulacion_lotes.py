@@ -0,0 +1,510 @@
+"""
+Simulación vectorizada de miles de partidas independientes para ajustar la dificultad.
+
+Cada partida es una fila de arrays de NumPy (posición, vidas, intangibilidad y su fila de
+obstáculos), y un único `step(actions)` avanza todas a la vez con las mismas reglas que
+GameLogic.update + colisiones.check_collisions.
+
+Con esas reglas la posición en z del coche, su velocidad, la longitud de la pista y los límites
+laterales dependen solo de cuántos ticks lleva acelerando (un choque anula la velocidad del
+tick, pero después de moverse), así que se calculan una vez en tablas indexadas por ese
+contador. Los obstáculos de
+cada partida se generan por adelantado, tramo a tramo como mundo.build_chunk: el horizonte de
+WorldStream.advance va siempre más de 50 m por delante del coche, así que este nunca alcanza
+uno que todavía no habría entrado. Los números aleatorios salen de un generador de NumPy, así
+que las partidas no reproducen las de GameLogic.
+
+En cada tick solo el movimiento lateral recorre todas las partidas. Cada partida guarda el
+tick (contado en ticks acelerando) en que alcanza su primer obstáculo o la meta, y los
+descartes, las colisiones y la llegada se resuelven únicamente para las que lo alcanzan.
+
+Uso:
+    python simulacion_lotes.py [--partidas N] [--semilla S]
+"""
+import argparse
+import math
+import time
+import numpy as np
+from indice_pista import TrackIndex
+from logica_juego import TICK_RATE
+from mundo import (CHUNK_LENGTH, DENSITY_RAMP, LATERAL_SPREAD, MEAN_GAP_END, MEAN_GAP_START,
+                   MIN_GAP, START_CLEARANCE)
+from mundo import TYPE_SIZES as WORLD_TYPE_SIZES
+from obstaculos import TYPE_NAMES
+
+# Bits de la acción de cada partida en step()
+UP = 1
+LEFT = 2
+RIGHT = 4
+
+# Tamaño de cada tipo de obstáculo (mismo orden que obstaculos.TYPE_NAMES)
+TYPE_SIZES = np.array([WORLD_TYPE_SIZES[name] for name in TYPE_NAMES])
+
+# Las partidas terminadas nunca vuelven a alcanzar un evento
+_NEVER = np.iinfo(np.int64).max
+
+
+def _segment_entry(x0, z0, x1, z1, x, z, size):
+    """
+    Método de los "slabs" de ObstacleStore.sweep para un solo obstáculo.
+
+    Retorna:
+        float: Fracción del recorrido de (x0, z0) a (x1, z1) en la que entra en la caja
+        abierta de centro (x, z) y semiancho `size`, o None si no la toca.
+    """
+    t_enter, t_exit = 0.0, 1.0
+    for p0, d, center in ((x0, x1 - x0, x), (z0, z1 - z0, z)):
+        if d == 0:
+            if abs(p0 - center) >= size:
+                return None
+            continue
+        t_a = (center - size - p0) / d
+        t_b = (center + size - p0) / d
+        if t_a > t_b:
+            t_a, t_b = t_b, t_a
+        if t_a > t_enter:
+            t_enter = t_a
+        if t_b < t_exit:
+            t_exit = t_b
+    return t_enter if t_enter < t_exit else None
+
+
+class BatchSimulation:
+    """
+    N partidas independientes avanzadas en lote.
+
+    Los obstáculos de cada partida están en arrays (N, K) por campo (obs_x, obs_z, obs_size,
+    obs_type y la extensión en z de la caja, obs_lo y obs_hi), con cada fila ordenada por z
+    descendente como en ObstacleStore. `obs_head` es el primero que no ha quedado detrás
+    del coche.
+    """
+
+    def __init__(self, n_games, seed=None, tick_rate=TICK_RATE, swept=True):
+        """
+        Args:
+            n_games (int): Número de partidas.
+            seed (int): Semilla del generador aleatorio.
+            tick_rate (float): Ticks por segundo de la simulación.
+            swept (bool): Colisión continua sobre el recorrido del tick o solo en la posición final.
+        """
+        self.n = n_games
+        self.rng = np.random.default_rng(seed)
+        self.dt = 1.0 / tick_rate
+        self.swept = swept
+
+        # Mismos parámetros que GameLogic
+        self.max_distance = 1000.0
+        self.base_speed = -12.0
+        self.lateral_speed = 6.0
+        self.lateral_limit = 5.0
+        self.track_growth = 120.0
+        self.intangible_time = 3.0
+        self.max_attempts = 3
+        self._lateral_step = self.lateral_speed * self.dt
+        self.track_index = TrackIndex()
+
+        n = n_games
+        self.car_x = np.zeros(n)
+        self._spare_x = np.zeros(n)  # Posición lateral del tick anterior (colisión continua)
+        self.moving_ticks = np.zeros(n, dtype=np.int64)  # Ticks acelerando; fija car_z
+        self._moving = np.zeros(n, dtype=bool)  # Si aceleró en el último tick
+        self.collisions = np.zeros(n, dtype=np.int64)
+        self.last_collision_time = np.full(n, -np.inf)  # -inf: nunca ha chocado
+        self._hit_tick = np.full(n, -1, dtype=np.int64)
+        # Empujón lateral de cada choque posible (uno por intento)
+        self._pushes = self.rng.choice([-0.5, 0.5], (n, self.max_attempts))
+        self.time = 0.0
+        self._previous_time = 0.0  # Tiempo del último tick simulado
+        self.ticks = 0
+
+        # Estadísticas
+        self.done = np.zeros(n, dtype=bool)
+        self.active = np.ones(n, dtype=bool)  # ~done
+        self._n_active = n
+        self.finished = np.zeros(n, dtype=bool)  # Llegaron a max_distance
+        self._end_tick = np.zeros(n, dtype=np.int64)
+
+        self._build_tables()
+        self._build_course()
+        # Tick acelerando en que cada partida alcanza su primer obstáculo o la meta
+        self._event_tick = self._reach_tick(self.obs_hi[:, 0])
+
+    def _build_tables(self):
+        """
+        Tablas indexadas por el número de ticks acelerando, calculadas con las mismas
+        operaciones que GameLogic.update. Los límites laterales son los del tick que empieza
+        con ese número, centrados en la línea central en la posición del coche.
+        """
+        dt = self.dt
+        z = 0.0
+        track_length = 50.0
+        positions, speeds, lengths = [z], [0.0], [track_length]
+        while abs(z) < self.max_distance:
+            speed = self.base_speed * (1 + (abs(z) // 40) * 0.2)
+            track_length += self.track_growth * dt
+            z += speed * dt
+            positions.append(z)
+            speeds.append(speed)
+            lengths.append(track_length)
+
+        self._z_table = np.array(positions)
+        self._neg_z_table = -self._z_table  # Creciente, para searchsorted
+        self._speed_table = np.array(speeds)
+        self._track_table = np.array(lengths)
+        centers = [self.track_index.offset(-z) for z in positions]
+        self._left_bound = np.array([center - self.lateral_limit for center in centers])
+        self._right_bound = np.array([center + self.lateral_limit for center in centers])
+        # Al llegar a este número de ticks acelerando el coche alcanza max_distance
+        self._finish_tick = len(positions) - 1
+
+    def _build_course(self):
+        """
+        Genera los obstáculos de todas las partidas tramo a tramo, con los huecos de
+        mundo.build_chunk: MIN_GAP más una parte exponencial cuya media depende de la
+        distancia, y medio hueco mínimo en cada extremo del tramo.
+
+        Solo se generan los tramos que el coche puede llegar a tocar antes de la meta.
+        """
+        n = self.n
+        max_size = TYPE_SIZES.max()
+        limit = -self._z_table[-1] + max_size
+        columns = []
+        for index in range(math.ceil(limit / CHUNK_LENGTH)):
+            start = index * CHUNK_LENGTH
+            end = start + CHUNK_LENGTH
+            distance = np.full(n, start + MIN_GAP / 2)
+            open_rows = np.ones(n, dtype=bool)
+            while open_rows.any():
+                ramp = np.minimum(distance / DENSITY_RAMP, 1.0)
+                mean_gap = MEAN_GAP_START + (MEAN_GAP_END - MEAN_GAP_START) * ramp
+                distance = distance + self.rng.exponential(mean_gap - MIN_GAP)
+                open_rows &= distance <= end - MIN_GAP / 2
+                columns.append(np.where(open_rows & (distance >= START_CLEARANCE), distance, np.inf))
+                distance = distance + MIN_GAP
+        distances = np.stack(columns, axis=1)
+        present = distances < limit
+        rows, slots = present.nonzero()
+        distances = distances[rows, slots]
+        counts = present.sum(axis=1)
+        columns = np.arange(len(rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+
+        # Ventana de colisión: obstáculos examinados por partida en un tick a partir del
+        # primero que no ha quedado detrás del coche. Dos obstáculos seguidos están separados
+        # al menos MIN_GAP en z y un tick avanza como mucho max_step, así que el que está
+        # `window` posiciones más allá queda fuera de alcance si
+        # window * MIN_GAP >= max_step + 2 * max_size (un choque solo acerca al coche el
+        # obstáculo chocado, que ya está a su altura).
+        max_step = np.diff(self._neg_z_table).max()
+        self.window = max(1, math.ceil((max_step + 2 * max_size) / MIN_GAP))
+
+        # Tras el último obstáculo quedan `window` huecos vacíos (z = -inf) para que la
+        # ventana nunca se salga de la fila
+        shape = n, counts.max(initial=0) + self.window
+        types = self.rng.integers(0, len(TYPE_SIZES), len(rows))
+        lateral = self.rng.uniform(-LATERAL_SPREAD, LATERAL_SPREAD, len(rows))
+        self.obs_type = np.zeros(shape, dtype=np.int8)
+        self.obs_type[rows, columns] = types
+        self.obs_x = np.zeros(shape)
+        # Sobre la línea central que se dibuja, como en build_chunk
+        self.obs_x[rows, columns] = self.track_index.offsets(distances) + lateral
+        self.obs_z = np.full(shape, -np.inf)
+        self.obs_z[rows, columns] = -distances
+        self.obs_size = TYPE_SIZES[self.obs_type]
+        self.obs_lo = self.obs_z - self.obs_size
+        self.obs_hi = self.obs_z + self.obs_size
+
+        # Vistas aplanadas de cada campo, para leer de varias partidas con un solo índice
+        # (fila * K + columna)
+        self._flat_x, self._flat_z, self._flat_size, self._flat_type, self._flat_lo, self._flat_hi = (
+            column.reshape(-1) for column in
+            (self.obs_x, self.obs_z, self.obs_size, self.obs_type, self.obs_lo, self.obs_hi))
+        self._row_start = np.arange(n) * shape[1]
+        self._head = self._row_start.copy()  # Índice aplanado de obs_head
+
+    @property
+    def obs_head(self):
+        return self._head - self._row_start
+
+    @property
+    def car_z(self):
+        return self._z_table[self.moving_ticks]
+
+    @property
+    def car_speed_z(self):
+        """
+        Velocidad en z del último tick: la de su tramo si aceleró, 0 si no o si chocó.
+        """
+        speed = np.where(self._moving, self._speed_table[self.moving_ticks], 0.0)
+        speed[self._hit_tick == self.ticks] = 0.0
+        return speed
+
+    @property
+    def track_length(self):
+        return self._track_table[self.moving_ticks]
+
+    @property
+    def attempts(self):
+        return self.max_attempts - self.collisions
+
+    @property
+    def intangible(self):
+        # Como en check_collisions, la intangibilidad se quita en el primer tick en que han
+        # pasado más de intangible_time segundos desde el choque
+        return self._previous_time - self.last_collision_time <= self.intangible_time
+
+    @property
+    def ticks_alive(self):
+        return np.where(self.done, self._end_tick, self.ticks)
+
+    def _reach_tick(self, hi):
+        """
+        Primer número de ticks acelerando con el que el coche llega a z <= hi, limitado a la meta.
+        """
+        return np.minimum(np.searchsorted(self._neg_z_table, -hi), self._finish_tick)
+
+    def _action_flags(self, actions):
+        """
+        Arrays (arriba, izquierda, derecha) de `actions`, ya a False en las partidas terminadas.
+        """
+        actions = np.asarray(actions)
+        if actions.ndim == 2:
+            flags = actions[:, 0], actions[:, 1], actions[:, 2]
+        else:
+            flags = actions & UP, actions & LEFT, actions & RIGHT
+        return [np.logical_and(flag, self.active) for flag in flags]
+
+    def step(self, actions):
+        """
+        Avanza un tick todas las partidas que no han terminado.
+
+        Args:
+            actions (np.ndarray): Array (N, 3) de booleanos (arriba, izquierda, derecha) o
+                array (N,) de bits UP | LEFT | RIGHT.
+        """
+        up, left, right = self._action_flags(actions)
+
+        # Movimiento lateral. Como en GameLogic.update, la izquierda tiene prioridad
+        prev_x, car_x = self.car_x, self._spare_x
+        go_left = prev_x > self._left_bound[self.moving_ticks]
+        go_left &= left
+        go_right = prev_x < self._right_bound[self.moving_ticks]
+        go_right &= right
+        steer = np.where(go_left, -self._lateral_step, go_right * self._lateral_step)
+        np.add(prev_x, steer, out=car_x)
+        self.car_x, self._spare_x = car_x, prev_x
+
+        # Las partidas activas están siempre antes de max_distance, así que avanzan si aceleran
+        self.moving_ticks += up
+        self._moving = up
+        self.ticks += 1
+
+        g = (self.moving_ticks >= self._event_tick).nonzero()[0]
+        if len(g):
+            self._events(g, prev_x)
+        self._previous_time = self.time
+        self.time += self.dt
+
+    def _events(self, g, prev_x):
+        """
+        Colisiones, descartes y llegada a la meta de las partidas `g`, cuyo coche alcanzó en
+        este tick el primer obstáculo de su fila o max_distance.
+        """
+        head = self._head[g]
+        moving_ticks = self.moving_ticks[g]
+        z = self._z_table[moving_ticks]
+
+        # Fase amplia: el primer obstáculo está al alcance en x (el coche se desplaza como
+        # mucho _lateral_step por tick, más un margen para el redondeo) o el coche llega a la
+        # z de otro de la ventana. Como en check_collisions, no se comprueba en el tick en
+        # que expira la intangibilidad
+        near = np.abs(self.car_x[g] - self._flat_x[head]) < self._flat_size[head] + (self._lateral_step + 1e-3)
+        for offset in range(1, self.window):
+            near |= self._flat_hi[head + offset] > z
+        near &= self._previous_time - self.last_collision_time[g] > self.intangible_time
+        candidates = near.nonzero()[0]
+        lost = ()
+        if len(candidates):
+            c = g[candidates]
+            prev_z = self._z_table[moving_ticks[candidates] - self._moving[c]]
+            lost = self._collide(c, head[candidates], prev_x[c], prev_z, z[candidates])
+
+        # Descartar los obstáculos que ya quedaron completamente detrás del coche (solo avanza
+        # en -z, así que nunca podrá volver a tocarlos). Se leen después de los choques, que
+        # pueden haber reordenado la fila
+        passed = z <= self._flat_lo[head]
+        popped = g[passed]
+        if len(popped):
+            p, head, z_p = popped, head[passed] + 1, z[passed]
+            while len(p):
+                self._head[p] = head
+                more = z_p <= self._flat_lo[head]
+                p, head, z_p = p[more], head[more] + 1, z_p[more]
+            self._event_tick[popped] = self._reach_tick(self._flat_hi[self._head[popped]])
+
+        # Las partidas terminan después de los descartes, que no deben devolverles un evento
+        if len(lost):
+            self._finish(lost)
+        # Meta, que ninguna partida alcanza antes de haber acelerado _finish_tick ticks (las
+        # que perdieron la última vida en este tick ya no están activas)
+        if self.ticks >= self._finish_tick:
+            finished = g[moving_ticks >= self._finish_tick]
+            finished = finished[self.active[finished]]
+            if len(finished):
+                self.finished[finished] = True
+                self._finish(finished)
+
+    def _collide(self, g, head, x0s, z0s, z1s):
+        """
+        Colisión de las partidas `g` con la ventana de obstáculos que empieza en `head` (índice
+        aplanado), sobre el recorrido del tick de (x0s, z0s) a la posición actual.
+
+        Llegan pocas partidas por tick, así que cada una se prueba por separado, como hace
+        check_collisions en el juego, y los efectos de los choques se aplican juntos.
+
+        Retorna:
+            np.ndarray: Partidas que perdieron su último intento; las termina quien llama.
+        """
+        x1s = self.car_x[g].tolist()
+        z1s = z1s.tolist()
+        if self.swept:
+            x0s, z0s = x0s.tolist(), z0s.tolist()
+        else:
+            x0s, z0s = x1s, z1s
+        window = head[:, None] + np.arange(self.window)
+        columns = zip(self._flat_x[window].tolist(), self._flat_z[window].tolist(),
+                      self._flat_size[window].tolist(), self._flat_hi[window].tolist())
+        games, slots = [], []
+        for game, first, x0, z0, x1, z1, (xs, zs, sizes, his) in zip(
+                g.tolist(), head.tolist(), x0s, z0s, x1s, z1s, columns):
+            # Como ObstacleStore.sweep, choca con el obstáculo en el que entra antes. El coche
+            # nunca retrocede en z, así que solo puede tocar los que tienen z + size por
+            # encima de su posición final
+            hit, entry = -1, 2.0
+            for offset, hi in enumerate(his):
+                if z1 >= hi:
+                    continue
+                t = _segment_entry(x0, z0, x1, z1, xs[offset], zs[offset], sizes[offset])
+                if t is not None and t < entry:
+                    hit, entry = first + offset, t
+            if hit >= 0:
+                games.append(game)
+                slots.append(hit)
+        if not games:
+            return []
+
+        # Efectos del choque, cada partida en su propia fila
+        games = np.array(games)
+        collision = self.collisions[games]
+        self.collisions[games] = collision + 1
+        self.last_collision_time[games] = self.time
+        self._hit_tick[games] = self.ticks
+        self.car_x[games] += self._pushes[games, collision]
+        # El obstáculo retrocede como con obs["z"] += 2 y su caja con él
+        for column in (self._flat_z, self._flat_lo, self._flat_hi):
+            column[slots] += 2
+        for first, slot in zip(self._head[games].tolist(), slots):
+            self._restore_order(first, slot)
+        return games[collision + 1 >= self.max_attempts]
+
+    def _swap(self, a, b):
+        for column in (self._flat_x, self._flat_z, self._flat_size, self._flat_type,
+                       self._flat_lo, self._flat_hi):
+            column[a], column[b] = column[b], column[a]
+
+    def _restore_order(self, head, slot):
+        """
+        Devuelve el obstáculo `slot` (índice aplanado), cuya z ha aumentado, a su posición en
+        el orden por z descendente de la fila, como ObstacleStore._restore_order. Al aumentar
+        la z solo puede avanzar hacia `head`.
+        """
+        while slot > head and self._flat_z[slot - 1] < self._flat_z[slot]:
+            self._swap(slot - 1, slot)
+            slot -= 1
+
+    def _finish(self, g):
+        self.done[g] = True
+        self.active[g] = False
+        self._n_active = int(np.count_nonzero(self.active))
+        self._event_tick[g] = _NEVER
+        self._end_tick[g] = self.ticks
+
+    def run(self, policy=None, max_ticks=1_000_000):
+        """
+        Avanza hasta que todas las partidas terminan (o hasta max_ticks).
+
+        Args:
+            policy: Callable sim -> acciones. Por defecto se acelera siempre y se gira al azar.
+        """
+        if policy is None:
+            policy = random_steering_policy()
+        ticks = 0
+        while self._n_active and ticks < max_ticks:
+            self.step(policy(self))
+            ticks += 1
+        return ticks
+
+    def statistics(self):
+        """
+        Estadísticas agregadas de distancia de supervivencia y colisiones.
+        """
+        distance = np.minimum(np.abs(self.car_z), self.max_distance)
+        km = np.maximum(distance.sum() / 1000.0, 1e-9)
+        # Obstáculos que alcanzó cada coche
+        passed = np.count_nonzero(self.obs_z >= -distance[:, None])
+        return {
+            "games": self.n,
+            "done": int(self.done.sum()),
+            "finished": int(self.finished.sum()),
+            "distance_mean": float(distance.mean()),
+            "distance_p10": float(np.percentile(distance, 10)),
+            "distance_p50": float(np.percentile(distance, 50)),
+            "distance_p90": float(np.percentile(distance, 90)),
+            "collisions_mean": float(self.collisions.mean()),
+            "collisions_per_km": float(self.collisions.sum() / km),
+            "obstacles_per_km": float(passed / km),
+            "ticks_mean": float(self.ticks_alive.mean()),
+        }
+
+
+def random_steering_policy(p_left=0.2, p_right=0.2, hold_ticks=10, seed=None):
+    """
+    Política vectorizada: acelera siempre y cambia de dirección al azar cada hold_ticks ticks.
+    """
+    rng = np.random.default_rng(seed)
+    state = {"tick": 0, "actions": None}
+
+    def policy(sim):
+        if state["tick"] % hold_ticks == 0 or state["actions"] is None:
+            r = rng.random(sim.n)
+            # Por columnas, para que step lea cada una de forma contigua
+            actions = np.empty((sim.n, 3), dtype=bool, order="F")
+            actions[:, 0] = True
+            actions[:, 1] = r < p_left
+            actions[:, 2] = (r >= p_left) & (r < p_left + p_right)
+            state["actions"] = actions
+        state["tick"] += 1
+        return state["actions"]
+
+    return policy
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulación en lote para ajustar la dificultad")
+    parser.add_argument("--partidas", type=int, default=10_000)
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    sim = BatchSimulation(args.partidas, seed=args.semilla)
+    start = time.perf_counter()
+    ticks = sim.run(random_steering_policy(seed=args.semilla))
+    elapsed = time.perf_counter() - start
+    stats = sim.statistics()
+    game_ticks = int(sim.ticks_alive.sum())
+    print(f"{args.partidas} partidas, {ticks} ticks en {elapsed:.2f} s")
+    print(f"Partidas por segundo: {args.partidas / elapsed:.0f}  Ticks de partida por segundo: {game_ticks / elapsed:.0f}")
+    for name, value in stats.items():
+        print(f"  {name:<18} {value:.2f}" if isinstance(value, float) else f"  {name:<18} {value}")
+
+
+if __name__ == "__main__":
+    main()
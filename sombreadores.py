@@ -0,0 +1,297 @@
+"""
+Pipeline programable: backend de dibujo con programas GLSL.
+
+`ShaderBackend` implementa la misma interfaz que `backend_grafico.OpenGLBackend`, así que
+las funciones de `dibujos.py` y `malla_carro.py` dibujan con él sin cambios. Las diferencias
+con el pipeline clásico:
+
+    - La geometría se lee siempre de buffer objects: la del coche del VBO que crea
+      CarMesh.upload (posiciones y normales) y la que llega como array del cliente (pista,
+      barreras, obstáculos) se copia por llamada a un VBO de streaming, solo el rango que se
+      dibuja.
+    - El color de cada fragmento se calcula con programas GLSL 1.20: uno para la pista
+      (textura e iluminación difusa), uno para el coche (difusa y especular con las normales
+      por vértice de la malla) y uno de color plano para obstáculos, barreras y el cubo de
+      reserva, que no tienen normales propias.
+    - La configuración de `iluminacion.setup_lighting` se sube como uniforms una sola vez, al
+      crear los programas. La posición de la luz está en coordenadas de cámara, como quedaría
+      con glLightfv llamada con la matriz de modelo-vista identidad.
+
+Las matrices siguen en la pila de OpenGL (gl_ModelViewMatrix, gl_ProjectionMatrix), que los
+programas leen en un contexto de compatibilidad, y GLSL 1.20 lo admite cualquier OpenGL 2.1,
+incluidos Mesa llvmpipe y OSMesa.
+
+Uso:
+    backend = ShaderBackend(setup_lighting())
+    draw_track(logic, road_texture_id, backend=backend)
+"""
+import ctypes
+import numpy as np
+from backend_grafico import OpenGLBackend
+from iluminacion import setup_lighting
+
+# Exponente del brillo especular del coche
+SHININESS = 32.0
+
+# Posiciones fijas de los atributos en todos los programas
+POSITION = 0
+NORMAL = 1
+TEX_COORD = 2
+
+_VERTEX_SOURCE = """
+attribute vec3 position;
+attribute vec3 normal;
+attribute vec2 tex_coord;
+varying vec3 v_position;
+varying vec3 v_normal;
+varying vec2 v_tex_coord;
+
+void main() {
+    vec4 eye = gl_ModelViewMatrix * vec4(position, 1.0);
+    v_position = eye.xyz;
+    v_normal = gl_NormalMatrix * normal;
+    v_tex_coord = tex_coord;
+    gl_Position = gl_ProjectionMatrix * eye;
+}
+"""
+
+_FRAGMENT_SOURCE = """
+uniform vec3 u_color;
+uniform sampler2D u_texture;
+uniform vec4 u_ambient;
+uniform vec4 u_diffuse;
+uniform vec4 u_specular;
+uniform vec4 u_light_position;
+uniform float u_shininess;
+varying vec3 v_position;
+varying vec3 v_normal;
+varying vec2 v_tex_coord;
+
+void main() {
+    vec3 color = u_color;
+#ifdef TEXTURED
+    color *= texture2D(u_texture, v_tex_coord).rgb;
+#endif
+#ifdef LIT
+    // La normal se normaliza aquí: la interpolación y el escalado del coche la acortan
+    vec3 n = normalize(v_normal);
+    if (!gl_FrontFacing) {
+        n = -n;
+    }
+    vec3 l = normalize(u_light_position.xyz - v_position * u_light_position.w);
+    float diffuse = max(dot(n, l), 0.0);
+    vec3 lit = color * (u_ambient.rgb + u_diffuse.rgb * diffuse);
+#ifdef SPECULAR
+    if (diffuse > 0.0) {
+        vec3 h = normalize(l - normalize(v_position));
+        lit += u_specular.rgb * pow(max(dot(n, h), 0.0), u_shininess);
+    }
+#endif
+    color = lit;
+#endif
+    gl_FragColor = vec4(color, 1.0);
+}
+"""
+
+# Variantes de programa: nombre -> macros definidas al compilar
+PROGRAMS = {
+    "pista": ("TEXTURED", "LIT"),
+    "pista_sin_textura": ("LIT",),
+    "coche": ("LIT", "SPECULAR"),
+    "plano": (),
+}
+
+_UNIFORMS = ("u_color", "u_texture", "u_ambient", "u_diffuse", "u_specular", "u_light_position",
+             "u_shininess")
+
+
+class ShaderError(Exception):
+    """
+    Un programa GLSL no compiló o no enlazó, o el contexto no admite sombreadores.
+    """
+
+
+def _compile_shader(gl, kind, source):
+    shader = gl.glCreateShader(kind)
+    gl.glShaderSource(shader, source)
+    gl.glCompileShader(shader)
+    if not gl.glGetShaderiv(shader, gl.GL_COMPILE_STATUS):
+        log = gl.glGetShaderInfoLog(shader)
+        gl.glDeleteShader(shader)
+        raise ShaderError(log.decode(errors="replace") if isinstance(log, bytes) else str(log))
+    return shader
+
+
+def build_program(gl, defines=()):
+    """
+    Compila y enlaza un programa con los fuentes de este módulo y las macros `defines`.
+
+    Retorna:
+        int: ID del programa.
+    """
+    header = "#version 120\n" + "".join(f"#define {name}\n" for name in defines)
+    vertex = _compile_shader(gl, gl.GL_VERTEX_SHADER, header + _VERTEX_SOURCE)
+    try:
+        fragment = _compile_shader(gl, gl.GL_FRAGMENT_SHADER, header + _FRAGMENT_SOURCE)
+    except ShaderError:
+        gl.glDeleteShader(vertex)
+        raise
+    program = gl.glCreateProgram()
+    gl.glAttachShader(program, vertex)
+    gl.glAttachShader(program, fragment)
+    for location, name in ((POSITION, "position"), (NORMAL, "normal"), (TEX_COORD, "tex_coord")):
+        gl.glBindAttribLocation(program, location, name)
+    gl.glLinkProgram(program)
+    # Los objetos de sombreador se liberan con el programa
+    gl.glDeleteShader(vertex)
+    gl.glDeleteShader(fragment)
+    if not gl.glGetProgramiv(program, gl.GL_LINK_STATUS):
+        log = gl.glGetProgramInfoLog(program)
+        gl.glDeleteProgram(program)
+        raise ShaderError(log.decode(errors="replace") if isinstance(log, bytes) else str(log))
+    return program
+
+
+class ShaderBackend(OpenGLBackend):
+    """
+    Backend que dibuja con los programas de PROGRAMS.
+
+    Texturas y matrices se heredan de OpenGLBackend; el color y la normal actuales se guardan
+    y se aplican al dibujar. Debe crearse con el contexto OpenGL ya activo.
+    """
+
+    def __init__(self, lighting=None, shininess=SHININESS):
+        """
+        Args:
+            lighting (dict): Configuración de iluminacion.setup_lighting (por defecto, esa).
+            shininess (float): Exponente del brillo especular.
+
+        Raises:
+            ShaderError: Si el contexto no admite GLSL 1.20 o un programa no compila.
+        """
+        super().__init__()
+        gl = self.gl
+        from OpenGL.error import GLError, NullFunctionError
+        if not bool(gl.glCreateShader) or not bool(gl.glGenBuffers):
+            raise ShaderError("El contexto no admite sombreadores ni buffer objects")
+        lighting = lighting if lighting is not None else setup_lighting()
+
+        self.programs = {}
+        self._uniforms = {}
+        try:
+            for name, defines in PROGRAMS.items():
+                program = build_program(gl, defines)
+                self.programs[name] = program
+                self._uniforms[program] = {u: gl.glGetUniformLocation(program, u) for u in _UNIFORMS}
+                self._upload_lighting(program, lighting, shininess)
+            gl.glUseProgram(0)
+            self.stream_buffer = gl.glGenBuffers(1)
+        except (GLError, NullFunctionError) as e:
+            self.release()
+            raise ShaderError(str(e)) from e
+        except ShaderError:
+            self.release()
+            raise
+        self._color = (1.0, 1.0, 1.0)
+        self._normal = (0.0, 1.0, 0.0)
+        self._texture = 0
+
+    def _upload_lighting(self, program, lighting, shininess):
+        """
+        Sube a `program` los uniforms que no cambian entre frames.
+        """
+        gl = self.gl
+        uniforms = self._uniforms[program]
+        gl.glUseProgram(program)
+        for uniform, key in (("u_ambient", "ambient_light"), ("u_diffuse", "diffuse_light"),
+                             ("u_specular", "specular_light"), ("u_light_position", "light_position")):
+            # Los uniforms que el programa no usa tienen ubicación -1 y se omiten
+            if uniforms[uniform] != -1:
+                gl.glUniform4fv(uniforms[uniform], 1, np.asarray(lighting[key], dtype=np.float32))
+        if uniforms["u_shininess"] != -1:
+            gl.glUniform1f(uniforms["u_shininess"], shininess)
+        if uniforms["u_texture"] != -1:
+            gl.glUniform1i(uniforms["u_texture"], 0)
+
+    def release(self):
+        """
+        Borra los programas y el buffer de streaming.
+        """
+        gl = self.gl
+        for program in self.programs.values():
+            gl.glDeleteProgram(program)
+        self.programs.clear()
+        self._uniforms.clear()
+        if getattr(self, "stream_buffer", None) is not None:
+            gl.glDeleteBuffers(1, [self.stream_buffer])
+            self.stream_buffer = None
+
+    def bind_texture(self, texture_id):
+        self._texture = texture_id
+        super().bind_texture(texture_id)
+
+    def set_color(self, r, g, b):
+        self._color = (r, g, b)
+
+    def set_normal(self, x, y, z):
+        self._normal = (x, y, z)
+
+    def _program_for(self, tex_coords, normals):
+        if normals is not None:
+            return self.programs["coche"]
+        if tex_coords is not None:
+            # Como en el pipeline clásico, sin textura (ID 0) la pista se dibuja sin ella
+            return self.programs["pista" if self._texture else "pista_sin_textura"]
+        return self.programs["plano"]
+
+    def draw_arrays(self, primitive, vertices, first=0, count=None, tex_coords=None, buffer=None,
+                    normals=None):
+        gl = self.gl
+        if count is None:
+            count = len(vertices) - first
+        if count <= 0:
+            return
+        program = self._program_for(tex_coords, normals)
+        gl.glUseProgram(program)
+        r, g, b = self._color
+        gl.glUniform3f(self._uniforms[program]["u_color"], r, g, b)
+
+        if buffer is None:
+            # Arrays del cliente: se copia solo el rango dibujado al buffer de streaming
+            # (glBufferData descarta el contenido anterior sin esperar a la GPU)
+            arrays = [(POSITION, 3, vertices)]
+            if normals is not None:
+                arrays.append((NORMAL, 3, normals))
+            if tex_coords is not None:
+                arrays.append((TEX_COORD, 2, tex_coords))
+            chunks = [np.ascontiguousarray(a[first:first + count], dtype=np.float32) for _, _, a in arrays]
+            gl.glBindBuffer(gl.GL_ARRAY_BUFFER, self.stream_buffer)
+            gl.glBufferData(gl.GL_ARRAY_BUFFER, sum(c.nbytes for c in chunks), None, gl.GL_STREAM_DRAW)
+            pointers = []
+            offset = 0
+            for (location, size, _), chunk in zip(arrays, chunks):
+                gl.glBufferSubData(gl.GL_ARRAY_BUFFER, offset, chunk.nbytes, chunk)
+                pointers.append((location, size, offset))
+                offset += chunk.nbytes
+            first = 0
+        else:
+            # En el VBO de CarMesh las normales van a continuación de las posiciones
+            gl.glBindBuffer(gl.GL_ARRAY_BUFFER, buffer)
+            pointers = [(POSITION, 3, 0)]
+            if normals is not None:
+                pointers.append((NORMAL, 3, len(vertices) * 12))
+
+        for location, size, offset in pointers:
+            gl.glEnableVertexAttribArray(location)
+            gl.glVertexAttribPointer(location, size, gl.GL_FLOAT, gl.GL_FALSE, 0, ctypes.c_void_p(offset))
+        if normals is None:
+            x, y, z = self._normal
+            gl.glVertexAttrib3f(NORMAL, x, y, z)
+
+        gl.glDrawArrays(self._modes[primitive], first, count)
+
+        for location, _, _ in pointers:
+            gl.glDisableVertexAttribArray(location)
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, 0)
+        # El HUD y la pantalla de fin de partida siguen en el pipeline fijo
+        gl.glUseProgram(0)
@@ -0,0 +1,160 @@
+import time
+import numpy as np
+
+
+class FixedTimestep:
+    """
+    Planificador de simulación con paso fijo.
+
+    Acumula el tiempo real transcurrido entre frames y lo convierte en un número entero de
+    ticks de duración `dt`, de modo que la simulación avanza igual sin importar lo rápido que
+    se dibuje. El resto que no llega a un tick completo queda en el acumulador y se expone como
+    `alpha` para interpolar el dibujo entre los dos últimos estados.
+    """
+
+    def __init__(self, tick_rate=60, max_steps=5):
+        """
+        Args:
+            tick_rate (float): Ticks de simulación por segundo.
+            max_steps (int): Máximo de ticks por frame; si un frame se retrasa más, el tiempo
+                sobrante se descarta para no entrar en una espiral de recuperación.
+        """
+        self.tick_rate = tick_rate
+        self.dt = 1.0 / tick_rate
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.dropped_time = 0.0  # Tiempo de simulación descartado por superar max_steps
+
+    def reset(self):
+        """
+        Vacía el acumulador (por ejemplo tras una pausa o la pantalla de fin de juego).
+        """
+        self.accumulator = 0.0
+
+    def advance(self, frame_time):
+        """
+        Añade el tiempo real de un frame y retorna cuántos ticks debe ejecutar la simulación.
+        """
+        self.accumulator += max(frame_time, 0.0)
+        steps = int(self.accumulator / self.dt)
+        if steps > self.max_steps:
+            self.dropped_time += (steps - self.max_steps) * self.dt
+            self.accumulator -= (steps - self.max_steps) * self.dt
+            steps = self.max_steps
+        self.accumulator -= steps * self.dt
+        return steps
+
+    @property
+    def alpha(self):
+        """
+        Fracción del siguiente tick ya transcurrida, en [0, 1).
+        """
+        return min(self.accumulator / self.dt, 1.0)
+
+
+class FramePacer:
+    """
+    Limitador de frames por segundo.
+
+    Al final de cada frame `wait()` espera hasta el instante en que debe empezar el siguiente:
+    duerme con time.sleep hasta poco antes y apura el resto con una espera activa corta, que
+    es más precisa que el sleep del sistema. Los plazos se encadenan (plazo += periodo), así
+    que los errores no se acumulan; si un frame llega tarde más de un periodo, se toma como
+    nuevo origen en lugar de intentar recuperar frames.
+
+    Con vsync la pantalla ya marca el ritmo al intercambiar buffers y no se espera; solo se
+    miden los tiempos. Guarda la duración de los últimos frames para informar de los FPS
+    conseguidos y de la variación del tiempo de frame.
+    """
+
+    def __init__(self, target_fps=60, vsync=False, spin_threshold=0.002, history=240,
+                 clock=time.perf_counter, sleep=time.sleep):
+        """
+        Args:
+            target_fps (float): FPS objetivo; None o 0 para no limitar.
+            vsync (bool): La pantalla sincroniza con el refresco vertical (no se espera).
+            spin_threshold (float): Segundos finales de cada espera que se hacen con espera
+                activa; 0 para usar solo sleep.
+            history (int): Número de frames para las estadísticas.
+            clock (callable): Reloj en segundos.
+            sleep (callable): Función para dormir.
+        """
+        self.target_fps = target_fps
+        self.period = 1.0 / target_fps if target_fps else 0.0
+        self.vsync = vsync
+        self.spin_threshold = spin_threshold
+        self.clock = clock
+        self.sleep = sleep
+        self.frame_times = np.zeros(history)
+        self.frames = 0
+        self.late_frames = 0  # Frames que terminaron después de su plazo
+        self._deadline = None
+        self._last = None
+
+    def reset(self):
+        """
+        Olvida el plazo actual (tras una pausa o una pantalla que bloquea esperando eventos).
+        """
+        self._deadline = None
+        self._last = None
+
+    def wait(self):
+        """
+        Espera hasta el plazo del siguiente frame y registra la duración del frame.
+
+        Retorna:
+            float: Segundos desde el final del frame anterior.
+        """
+        clock = self.clock
+        now = clock()
+        if self.period and not self.vsync:
+            if self._deadline is None:
+                self._deadline = now + self.period
+            remaining = self._deadline - now
+            if remaining > 0:
+                if remaining > self.spin_threshold:
+                    self.sleep(remaining - self.spin_threshold)
+                while clock() < self._deadline:
+                    pass
+                now = clock()
+            else:
+                self.late_frames += 1
+            self._deadline += self.period
+            if now - self._deadline > self.period:
+                self._deadline = now + self.period
+
+        frame_time = 0.0 if self._last is None else now - self._last
+        self._last = now
+        if frame_time > 0:
+            self.frame_times[self.frames % len(self.frame_times)] = frame_time
+            self.frames += 1
+        return frame_time
+
+    def stats(self):
+        """
+        Estadísticas de los últimos frames.
+
+        Retorna:
+            dict: fps, tiempo medio, desviación típica y p99 del tiempo de frame (en segundos)
+            y frames tardíos. Vacío si aún no hay frames.
+        """
+        n = min(self.frames, len(self.frame_times))
+        if not n:
+            return {}
+        times = self.frame_times[:n]
+        mean = float(times.mean())
+        return {
+            "fps": 1.0 / mean if mean > 0 else float("inf"),
+            "mean": mean,
+            "std": float(times.std()),
+            "p99": float(np.percentile(times, 99)),
+            "late_frames": self.late_frames,
+        }
+
+    def format_stats(self):
+        stats = self.stats()
+        if not stats:
+            return "Sin frames medidos"
+        return (f"FPS: {stats['fps']:.1f}  frame medio {stats['mean'] * 1000:.2f} ms  "
+                f"desviación {stats['std'] * 1000:.2f} ms  p99 {stats['p99'] * 1000:.2f} ms  "
+                f"tardíos {stats['late_frames']}")
@@ -0,0 +1,253 @@
+"""
+Gestión de texturas: carga, caché binaria de niveles de mipmap y texturas compartidas.
+
+La carga está dividida en dos pasos:
+    - `load_texture_data` decodifica la imagen y calcula la cadena de mipmaps (sin OpenGL, se
+      puede ejecutar en otro hilo). El resultado se guarda en una caché binaria junto a la
+      imagen (ver cache_binario), de modo que los arranques siguientes no decodifican el PNG
+      ni generan mipmaps: los niveles se leen como vistas sobre el archivo mapeado en memoria.
+    - `upload_texture` pasa esos arrays a glTexImage2D por el protocolo de buffer, sin copias
+      intermedias.
+
+`TextureManager` reúne ambos pasos con un contador de referencias por ruta, para que cargar
+la misma imagen varias veces comparta una sola textura de OpenGL.
+"""
+import os
+import numpy as np
+import pygame
+from OpenGL.GL import *
+from cache_binario import cache_path_for, describe_sources, read_cache, write_cache
+
+# Versión del formato de la caché de texturas; cambiarla invalida las cachés existentes
+TEXTURE_CACHE_VERSION = 1
+
+
+class TextureData:
+    """
+    Niveles de una textura ya decodificados, listos para subir.
+
+    Attributes:
+        levels (list): Arrays uint8 (alto, ancho, 3) contiguos, del nivel 0 al 1x1, con las
+            filas en el orden del archivo de imagen.
+        from_cache (bool): Si los niveles se leyeron de la caché binaria.
+    """
+
+    __slots__ = ("path", "levels", "from_cache")
+
+    def __init__(self, path, levels, from_cache=False):
+        self.path = path
+        self.levels = levels
+        self.from_cache = from_cache
+
+    @property
+    def size(self):
+        height, width = self.levels[0].shape[:2]
+        return width, height
+
+
+def _decode_rgb(path):
+    """
+    Decodifica la imagen como array RGB (alto, ancho, 3) con las filas en el orden del archivo.
+
+    Es la orientación con la que se ha subido siempre la textura de la pista: la versión
+    anterior de cargar_textura volteaba la superficie y volvía a voltearla en
+    pygame.image.tostring(..., 1).
+    """
+    surface = pygame.image.load(path)
+    if surface.get_bitsize() in (24, 32):
+        # Vista sobre los píxeles de la superficie (ancho, alto, 3); la única copia es la
+        # que empaqueta los canales RGB y descarta el relleno de cada fila
+        pixels = pygame.surfarray.pixels3d(surface)
+        rgb = np.ascontiguousarray(pixels.transpose(1, 0, 2))
+        del pixels  # libera el bloqueo de la superficie
+        return rgb
+    width, height = surface.get_size()
+    data = pygame.image.tobytes(surface, "RGB", False)
+    return np.frombuffer(data, dtype=np.uint8).reshape(height, width, 3)
+
+
+def build_mipmaps(level0):
+    """
+    Cadena de mipmaps por promedio de bloques de 2x2 hasta llegar a 1x1.
+
+    Retorna:
+        list: Arrays uint8 contiguos, empezando por `level0`.
+    """
+    levels = [level0]
+    current = level0
+    while current.shape[0] > 1 or current.shape[1] > 1:
+        height, width = current.shape[:2]
+        h2, w2 = max(height // 2, 1), max(width // 2, 1)
+        # En dimensiones impares se descarta la última fila o columna
+        block = current[:h2 * 2 if height > 1 else 1, :w2 * 2 if width > 1 else 1].astype(np.float32)
+        if height > 1:
+            block = (block[0::2] + block[1::2]) * 0.5
+        if width > 1:
+            block = (block[:, 0::2] + block[:, 1::2]) * 0.5
+        current = np.ascontiguousarray(np.rint(block).astype(np.uint8))
+        levels.append(current)
+    return levels
+
+
+def load_texture_data(path, use_cache=True, mipmaps=True):
+    """
+    Decodifica una imagen y calcula sus mipmaps, o los lee de la caché si está al día.
+    No usa OpenGL.
+
+    Args:
+        path (str): Ruta de la imagen.
+        use_cache (bool): Leer y escribir la caché binaria junto a la imagen.
+        mipmaps (bool): Calcular la cadena de mipmaps (si no, solo el nivel 0).
+
+    Retorna:
+        TextureData
+    """
+    cache_path = cache_path_for(path)
+    if use_cache:
+        cached = read_cache(cache_path)
+        if cached is not None:
+            meta, arrays = cached
+            if (meta.get("kind") == "texture" and meta.get("version") == TEXTURE_CACHE_VERSION
+                    and meta.get("mipmaps") == mipmaps):
+                levels = [arrays[f"level{i}"] for i in range(meta["levels"])]
+                return TextureData(path, levels, from_cache=True)
+
+    level0 = _decode_rgb(path)
+    levels = build_mipmaps(level0) if mipmaps else [level0]
+    if use_cache:
+        try:
+            write_cache(
+                cache_path,
+                {f"level{i}": level for i, level in enumerate(levels)},
+                describe_sources([path]),
+                meta={"kind": "texture", "version": TEXTURE_CACHE_VERSION, "mipmaps": mipmaps,
+                      "levels": len(levels)},
+            )
+        except OSError as e:
+            print(f"No se pudo escribir la caché de {path}: {e}")
+    return TextureData(path, levels)
+
+
+def upload_texture(data):
+    """
+    Crea una textura de OpenGL con todos los niveles de `data`.
+
+    Retorna:
+        int: ID de la textura.
+    """
+    tex_id = glGenTextures(1)
+    glBindTexture(GL_TEXTURE_2D, tex_id)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_REPEAT)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_REPEAT)
+    has_mipmaps = len(data.levels) > 1
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR_MIPMAP_LINEAR if has_mipmaps else GL_LINEAR)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAX_LEVEL, len(data.levels) - 1)
+    # Las filas RGB no están alineadas a 4 bytes en general
+    glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+    for level, pixels in enumerate(data.levels):
+        height, width = pixels.shape[:2]
+        glTexImage2D(GL_TEXTURE_2D, level, GL_RGB, width, height, 0, GL_RGB, GL_UNSIGNED_BYTE, pixels)
+    glPixelStorei(GL_UNPACK_ALIGNMENT, 4)
+    return tex_id
+
+
+class TextureManager:
+    """
+    Texturas compartidas por ruta con contador de referencias.
+
+    Cada `acquire` de una ruta ya cargada devuelve el mismo ID e incrementa su contador;
+    la textura se borra de la GPU cuando `release` lo deja a cero.
+    """
+
+    def __init__(self, use_cache=True, mipmaps=True):
+        self.use_cache = use_cache
+        self.mipmaps = mipmaps
+        self._textures = {}  # ruta absoluta -> [id, referencias]
+        self._paths = {}  # id -> ruta absoluta
+
+    @staticmethod
+    def _key(path):
+        return os.path.abspath(path)
+
+    def acquire(self, path):
+        """
+        ID de la textura de `path`, cargándola si es la primera referencia.
+
+        Retorna:
+            int: ID de la textura, o None si no se pudo cargar.
+        """
+        key = self._key(path)
+        entry = self._textures.get(key)
+        if entry is not None:
+            entry[1] += 1
+            return entry[0]
+        try:
+            data = load_texture_data(path, self.use_cache, self.mipmaps)
+        except Exception as e:
+            print(f"Error cargando textura {path}: {e}")
+            return None
+        return self.adopt(path, data)
+
+    def adopt(self, path, data):
+        """
+        Sube `data` (ya decodificada, ver load_texture_data) como la textura de `path`. Si la
+        ruta ya tiene textura, solo se añade una referencia.
+
+        Retorna:
+            int: ID de la textura.
+        """
+        key = self._key(path)
+        entry = self._textures.get(key)
+        if entry is not None:
+            entry[1] += 1
+            return entry[0]
+        tex_id = upload_texture(data)
+        self._textures[key] = [tex_id, 1]
+        self._paths[tex_id] = key
+        return tex_id
+
+    def release(self, path_or_id):
+        """
+        Quita una referencia (por ruta o por ID) y borra la textura si era la última.
+
+        Retorna:
+            int: Referencias restantes.
+        """
+        key = self._paths.get(path_or_id) if not isinstance(path_or_id, str) else self._key(path_or_id)
+        entry = self._textures.get(key)
+        if entry is None:
+            return 0
+        entry[1] -= 1
+        if entry[1] > 0:
+            return entry[1]
+        del self._textures[key]
+        del self._paths[entry[0]]
+        glDeleteTextures([entry[0]])
+        return 0
+
+    def release_all(self):
+        for tex_id, _ in list(self._textures.values()):
+            glDeleteTextures([tex_id])
+        self._textures.clear()
+        self._paths.clear()
+
+    def refcount(self, path):
+        entry = self._textures.get(self._key(path))
+        return entry[1] if entry is not None else 0
+
+    def __len__(self):
+        return len(self._textures)
+
+
+_default_manager = None
+
+
+def default_manager():
+    """
+    Gestor de texturas compartido por todo el juego.
+    """
+    global _default_manager
+    if _default_manager is None:
+        _default_manager = TextureManager()
+    return _default_manager